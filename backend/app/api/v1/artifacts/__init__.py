@@ -0,0 +1,8 @@
+"""
+Artifacts Domain
+Serves generated documents from the artifact store through signed download URLs
+"""
+
+from .downloads import router as artifact_router
+
+__all__ = ['artifact_router']
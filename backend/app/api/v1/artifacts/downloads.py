@@ -0,0 +1,121 @@
+"""
+Artifact Downloads
+Resumable, browser-cacheable downloads of stored artifacts
+"""
+
+import os
+import time
+from typing import Iterator, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from app.services.artifact_store import artifact_store
+
+# Initialize router
+router = APIRouter(tags=["Artifacts"])
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range`` header into an inclusive (start, end)
+
+    Returns None for headers we serve in full (multiple ranges or another
+    unit); raises 416 for a range outside the file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(0, size - int(last))
+            end = size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, min(end, size - 1)
+
+
+def _read_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+@router.get("/{artifact_id}", responses={
+    200: {"description": "The whole artifact"},
+    206: {"description": "The requested byte range"},
+    304: {"description": "Not modified"},
+    403: {"description": "Missing, invalid or expired signature"},
+    404: {"description": "Artifact expired or evicted"},
+    416: {"description": "Requested range not satisfiable"},
+})
+async def download_artifact(
+    request: Request,
+    artifact_id: str,
+    filename: str = Query(...),
+    expires: int = Query(...),
+    signature: str = Query(...)
+):
+    """
+    Download a generated document through a signed URL
+
+    URLs come from generation responses with `delivery=url` and stop
+    working after `ARTIFACT_URL_TTL_SECONDS`. Supports `Range` /
+    `If-Range` for resumable downloads; artifacts are immutable, so the
+    browser may cache them (`ETag` / `If-None-Match`) until the URL expires.
+    """
+    if not artifact_store.verify(artifact_id, filename, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired download link")
+
+    path = artifact_store.path_for(artifact_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artifact expired or no longer available")
+
+    etag = f'"{artifact_id}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": f"private, max-age={max(0, expires - int(time.time()))}, immutable",
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    media_type = artifact_store.media_type(filename)
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if range_header and (if_range is None or if_range == etag):
+        byte_range = _parse_range(range_header, os.path.getsize(path))
+
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
+
+    start, end = byte_range
+    size = os.path.getsize(path)
+    headers.update({
+        "Content-Range": f"bytes {start}-{end}/{size}",
+        "Content-Length": str(end - start + 1),
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    })
+    return StreamingResponse(_read_range(path, start, end), status_code=206, media_type=media_type, headers=headers)
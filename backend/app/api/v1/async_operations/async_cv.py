@@ -1,19 +1,59 @@
 """
 Async CV generation endpoints
 """
+import base64
+
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from app.api.v1.negotiation import DELIVERY_QUERY
 from app.schemas.models import CVFormData, CVUploadRequest
+from app.services.artifact_store import artifact_store
 from app.services.generator_service import cv_service
 from app.services.background_tasks import task_manager, start_background_task
+from app.services.llm_limiter import LLM_RETRY_AFTER_SECONDS, PRIORITY_BACKGROUND, llm_limiter
 
 router = APIRouter(tags=["Async Operations"])
 
+# Artifact link fields in a task result -> their inline base64 / filename fields
+RESULT_DOCUMENTS = {
+    "cv_pdf": ("cv_pdf_base64", "filename_cv"),
+    "cover_letter_pdf": ("cover_letter_pdf_base64", "filename_cover_letter"),
+}
+
+
+def _deliver_result(result: dict, delivery: str) -> dict:
+    """Re-sign a task result's download URLs, or inline its PDFs from the artifact store"""
+    result = dict(result)
+    for key, (base64_key, filename_key) in RESULT_DOCUMENTS.items():
+        link = result.get(key)
+        if not link:
+            continue
+        
+        if delivery == "url":
+            result[key] = {**link, **artifact_store.sign(link["artifact_id"], link["filename"])}
+            continue
+        
+        pdf = artifact_store.get(link["artifact_id"])
+        if pdf is None:
+            raise HTTPException(status_code=410, detail="Task result has expired")
+        del result[key]
+        result[base64_key] = base64.b64encode(pdf).decode()
+        result[filename_key] = link["filename"]
+    return result
+
 @router.post("/generate-from-form-async")
 async def generate_cv_from_form_async(form_data: CVFormData):
     """
     Start CV generation from form data in background
     Returns task ID for polling status
     """
+    # Refuse new jobs up front rather than failing them once the AI queue is deep
+    if not llm_limiter.accepting(PRIORITY_BACKGROUND):
+        raise HTTPException(
+            status_code=503,
+            detail="AI generation is at capacity. Please try again shortly.",
+            headers={"Retry-After": str(LLM_RETRY_AFTER_SECONDS)}
+        )
+    
     try:
         # Start background task
         task_id = start_background_task(
@@ -33,9 +73,12 @@ async def generate_cv_from_form_async(form_data: CVFormData):
         raise HTTPException(status_code=500, detail=f"Failed to start CV generation: {str(e)}")
 
 @router.get("/task-status/{task_id}")
-async def get_task_status(task_id: str):
+async def get_task_status(task_id: str, delivery: str = DELIVERY_QUERY):
     """
     Get task status and progress
+    
+    Completed results inline their PDFs as base64 by default, or carry
+    freshly signed download URLs with `?delivery=url`.
     """
     try:
         status = task_manager.get_task_status(task_id)
@@ -53,7 +96,10 @@ async def get_task_status(task_id: str):
         
         # Add result if completed
         if status["status"] == "completed" and "result" in status:
-            response["result"] = status["result"]
+            response["result"] = _deliver_result(status["result"], delivery)
+        
+        if "stage_timings_ms" in status:
+            response["stage_timings_ms"] = status["stage_timings_ms"]
         
         # Add error if failed
         if status["status"] == "failed" and "error" in status:
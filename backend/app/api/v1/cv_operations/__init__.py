@@ -4,5 +4,6 @@ Handles core CV generation functionality
 """
 
 from .basic_generation import router as basic_router
+from .batch_rendering import router as batch_router
 
-__all__ = ['basic_router']
\ No newline at end of file
+__all__ = ['basic_router', 'batch_router']
\ No newline at end of file
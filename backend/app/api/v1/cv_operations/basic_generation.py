@@ -3,75 +3,395 @@ Basic CV Generation Operations
 Core CV creation functionality
 """
 
-from fastapi import APIRouter, HTTPException, Request
+import logging
+import time
+from typing import Optional, Union
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from app.api.v1.negotiation import (
+    BINARY_DOCUMENT_RESPONSES, DELIVERY_QUERY, DOCUMENT_QUERY, EVENT_STREAM_MEDIA_TYPE, FORMAT_QUERY,
+    JSON_MEDIA_TYPE, LLM_CACHE_QUERY, PDF_MEDIA_TYPE, ZIP_MEDIA_TYPE, artifact_links, event_stream,
+    negotiate_media_type, document_download, pdf_download, wants_event_stream
+)
 from app.core.config import settings
-from app.schemas.models import CVFormData, PDFResponse
+from app.schemas.models import ArtifactPDFResponse, CVFormData, HTMLPreviewRequest, PDFResponse
 from app.services.generator_service import cv_service
+from app.services.llm_limiter import LLM_RETRY_AFTER_SECONDS, LLMQueueFullError, llm_limiter
+from app.services.render_pool import RenderQueueFullError, RenderTimeoutError
+from app.services.stage_graph import server_timing, stage_trace
 
 # Initialize router and rate limiter
 router = APIRouter(tags=["CV Generation"])
 limiter = Limiter(key_func=get_remote_address)
+logger = logging.getLogger(__name__)
 
 
-@router.post("/generate-from-form", response_model=PDFResponse)
+@router.post("/generate-from-form", response_model=Union[PDFResponse, ArtifactPDFResponse],
+             responses=BINARY_DOCUMENT_RESPONSES)
 @limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_WINDOW}")
 async def generate_cv_from_form(
     request: Request,
-    form_data: CVFormData
-) -> PDFResponse:
+    response: Response,
+    form_data: CVFormData,
+    background_tasks: BackgroundTasks,
+    format: Optional[str] = FORMAT_QUERY,
+    document: str = DOCUMENT_QUERY,
+    delivery: str = DELIVERY_QUERY,
+    use_cache: bool = LLM_CACHE_QUERY
+):
     """
     Generate CV from form data (Creator flow)
     
     Creates a professional CV and cover letter optimized for Dublin/Irish job market
     using AI-powered content generation with ATS optimization.
+    
+    Returns base64 JSON by default. Send `Accept: application/pdf`,
+    `application/zip` or `multipart/mixed` (or `?format=`) to download the
+    documents directly. `?delivery=url` keeps the JSON small by returning
+    signed, short-lived download URLs instead of base64 PDFs.
+    
+    With `SPECULATIVE_THEME_RENDER` enabled, the cover letter is pre-rendered
+    in the other themes after the response is sent, so a theme switch via
+    `/generate-cover-letter-pdf` is served from cache.
+    
+    Per-stage wall times (Gemini calls, parsing, each PDF) are returned in
+    the `Server-Timing` header. Identical requests reuse cached Gemini
+    responses; `?use_cache=false` forces fresh generation.
     """
     try:
-        # Generate CV and cover letter
-        result = await cv_service.generate_from_form(form_data)
-        return result
+        media_type = negotiate_media_type(request, format)
+        theme = form_data.theme or "classic"
+        with stage_trace() as trace:
+            if media_type == JSON_MEDIA_TYPE:
+                # Generate CV and cover letter
+                result = await cv_service.generate_from_form(form_data, delivery, use_cache)
+                background_tasks.add_task(cv_service.prerender_other_themes, result.cv_data, theme)
+                response.headers["Server-Timing"] = server_timing(trace)
+                return result
+            
+            cv_pdf, cover_letter_pdf, complete_data = await cv_service.generate_documents_from_form(form_data, use_cache)
         
+        background_tasks.add_task(cv_service.prerender_other_themes, complete_data, theme)
+        filename_cv, filename_cover_letter = cv_service.document_filenames()
+        download = document_download(
+            media_type, cv_pdf, cover_letter_pdf, filename_cv, filename_cover_letter, document
+        )
+        download.headers["Server-Timing"] = server_timing(trace)
+        return download
+        
+    except HTTPException:
+        raise
+    except RenderQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LLMQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(LLM_RETRY_AFTER_SECONDS)})
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         # Log error for monitoring (without exposing sensitive data)
         error_msg = f"CV generation failed: {type(e).__name__}"
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/generate-cv-pdf")
+@router.post("/generate-cv-pdf", responses=BINARY_DOCUMENT_RESPONSES)
 @limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_WINDOW}")
 async def generate_cv_pdf(
     request: Request,
-    cv_data: dict
+    response: Response,
+    cv_data: dict,
+    format: Optional[str] = FORMAT_QUERY,
+    delivery: str = DELIVERY_QUERY
 ):
     """
     Generate CV PDF from structured data
+    
+    Returns base64 JSON by default (a signed download URL with
+    `?delivery=url`), or the PDF itself for `Accept: application/pdf`.
     """
     try:
-        # Generate only CV PDF
-        cv_pdf, _ = await cv_service._generate_pdfs(cv_data)
+        media_type = negotiate_media_type(request, format)
+        
+        # Generate only CV PDF (no cover letter render, no second pool slot)
+        with stage_trace() as trace:
+            cv_pdf = await cv_service.render_document(cv_data, cv_data.get("theme") or "classic", "cv")
+        filename_cv, _ = cv_service.document_filenames()
+        
+        if media_type != JSON_MEDIA_TYPE:
+            download = document_download(media_type, cv_pdf, None, filename_cv, "", "cv")
+            download.headers["Server-Timing"] = server_timing(trace)
+            return download
+        
+        response.headers["Server-Timing"] = server_timing(trace)
+        
+        if delivery == "url":
+            return await artifact_links([("cv_pdf", filename_cv, cv_pdf)])
         
         import base64
-        from datetime import datetime
         
         return {
             "cv_pdf_base64": base64.b64encode(cv_pdf).decode(),
-            "filename_cv": f"cv_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            "filename_cv": filename_cv
         }
         
+    except HTTPException:
+        raise
+    except RenderQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"CV PDF generation failed: {str(e)}")
 
 
-@router.post("/generate-cover-letter")
+@router.post("/generate-cv-pdf-fitted", responses=BINARY_DOCUMENT_RESPONSES)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_WINDOW}")
+async def generate_cv_pdf_fitted(
+    request: Request,
+    cv_data: dict,
+    max_pages: int = Query(default=2, ge=1, le=settings.PAGE_FIT_MAX_PAGES, description="Page budget"),
+    format: Optional[str] = FORMAT_QUERY,
+    delivery: str = DELIVERY_QUERY
+):
+    """
+    Generate a CV PDF auto-fitted to a page budget
+
+    Font size, line spacing and margins are tightened just enough for the
+    CV to fit in `max_pages`. The JSON response includes the chosen
+    parameters under `fit` (with a signed download URL instead of base64
+    for `?delivery=url`); binary responses carry them in `X-Fit-*` headers.
+    """
+    try:
+        media_type = negotiate_media_type(request, format)
+
+        fit = await cv_service.fit_cv_to_pages(cv_data, max_pages)
+        cv_pdf = fit.pop("pdf")
+        filename_cv, _ = cv_service.document_filenames()
+
+        if media_type != JSON_MEDIA_TYPE:
+            response = document_download(media_type, cv_pdf, None, filename_cv, "", "cv")
+            parameters = fit["parameters"]
+            response.headers["X-Fit-Pages"] = f"{fit['pages']}/{max_pages}"
+            response.headers["X-Fit-Fitted"] = str(fit["fitted"]).lower()
+            response.headers["X-Fit-Parameters"] = (
+                f"font_size_px={parameters['body_font_size_px']}; "
+                f"line_height_scale={parameters['line_height_scale']}; "
+                f"spacing_scale={parameters['spacing_scale']}; "
+                f"margin_px={parameters['margin_px']}"
+            )
+            return response
+
+        if delivery == "url":
+            return {**await artifact_links([("cv_pdf", filename_cv, cv_pdf)]), "fit": fit}
+
+        import base64
+
+        return {
+            "cv_pdf_base64": base64.b64encode(cv_pdf).decode(),
+            "filename_cv": filename_cv,
+            "fit": fit
+        }
+
+    except HTTPException:
+        raise
+    except RenderQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fitted CV PDF generation failed: {str(e)}")
+
+
+@router.post("/generate-bundle-pdf", responses=BINARY_DOCUMENT_RESPONSES)
+@limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_WINDOW}")
+async def generate_bundle_pdf(
+    request: Request,
+    cv_data: dict,
+    theme: str = Query(default="classic", pattern=r'^(classic|modern|academic)$'),
+    format: Optional[str] = FORMAT_QUERY,
+    delivery: str = DELIVERY_QUERY
+):
+    """
+    Generate the CV and cover letter in a single layout pass
+    
+    `application/pdf` (and the base64 JSON default) return one combined PDF
+    with the CV followed by the cover letter; `application/zip` or
+    `multipart/mixed` return the two documents split from the same pass.
+    `?delivery=url` returns a signed download URL instead of base64.
+    """
+    try:
+        media_type = negotiate_media_type(request, format)
+        filename_cv, filename_cover_letter = cv_service.document_filenames()
+        filename_bundle = filename_cv.replace("cv_", "cv_and_cover_letter_", 1)
+        
+        if media_type in (JSON_MEDIA_TYPE, PDF_MEDIA_TYPE):
+            bundle_pdf, = await cv_service.generate_bundle(cv_data, theme, combined=True)
+            if media_type == PDF_MEDIA_TYPE:
+                return pdf_download(bundle_pdf, filename_bundle)
+            if delivery == "url":
+                return await artifact_links([("bundle_pdf", filename_bundle, bundle_pdf)])
+            
+            import base64
+            
+            return {
+                "bundle_pdf_base64": base64.b64encode(bundle_pdf).decode(),
+                "filename_bundle": filename_bundle
+            }
+        
+        cv_pdf, cover_letter_pdf = await cv_service.generate_bundle(cv_data, theme, combined=False)
+        return document_download(media_type, cv_pdf, cover_letter_pdf, filename_cv, filename_cover_letter)
+        
+    except HTTPException:
+        raise
+    except RenderQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Bundle PDF generation failed: {str(e)}")
+
+
+@router.post("/preview", responses={200: {"content": {PDF_MEDIA_TYPE: {}}, "description": "Draft-quality PDF preview"}})
+@limiter.limit(settings.PREVIEW_RATE_LIMIT)
+async def preview_document(
+    request: Request,
+    cv_data: dict,
+    document: str = DOCUMENT_QUERY,
+    theme: str = Query(default="classic", pattern=r'^(classic|modern|academic)$')
+):
+    """
+    Render a fast draft preview of the CV or cover letter
+    
+    Uses the draft pipeline (system fonts, no images or watermark, first
+    page only) for live editor previews. Target latency is
+    `PREVIEW_LATENCY_TARGET_MS` (300 ms p95 on a warm worker); the actual
+    render time is returned in the `Server-Timing` header.
+    """
+    try:
+        start = time.perf_counter()
+        pdf = await cv_service.render_preview(cv_data, theme, document)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        if elapsed_ms > settings.PREVIEW_LATENCY_TARGET_MS:
+            logger.warning(
+                f"Preview render took {elapsed_ms:.0f}ms (target {settings.PREVIEW_LATENCY_TARGET_MS}ms)"
+            )
+        
+        return Response(
+            content=pdf,
+            media_type=PDF_MEDIA_TYPE,
+            headers={
+                "Content-Disposition": f'inline; filename="{document}_preview.pdf"',
+                "Cache-Control": "no-store",
+                "Server-Timing": f"render;dur={elapsed_ms:.1f}"
+            }
+        )
+        
+    except RenderQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Preview generation failed: {str(e)}")
+
+
+@router.post("/preview-html")
+@limiter.limit(settings.HTML_PREVIEW_RATE_LIMIT)
+async def preview_html(request: Request, preview: HTMLPreviewRequest):
+    """
+    Render the CV or themed cover letter as HTML for live editor previews
+    
+    Returns the full document (styles inlined, each CV section wrapped in
+    `<div data-section="...">`) plus a digest per section. Send those
+    digests back as `known_sections` to receive only the sections that
+    changed. Target latency is `HTML_PREVIEW_LATENCY_TARGET_MS` (50 ms p95);
+    the measured time is in the `Server-Timing` header.
+    """
+    try:
+        start = time.perf_counter()
+        result = cv_service.render_html_preview(
+            preview.cv_data, preview.theme, preview.document, preview.known_sections
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        if elapsed_ms > settings.HTML_PREVIEW_LATENCY_TARGET_MS:
+            logger.warning(
+                f"HTML preview took {elapsed_ms:.0f}ms (target {settings.HTML_PREVIEW_LATENCY_TARGET_MS}ms)"
+            )
+        
+        return JSONResponse(
+            content=result,
+            headers={"Cache-Control": "no-store", "Server-Timing": f"render;dur={elapsed_ms:.1f}"}
+        )
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"HTML preview failed: {str(e)}")
+
+
+@router.post("/thumbnails", responses={
+    200: {"content": {"image/png": {}, "image/webp": {}, ZIP_MEDIA_TYPE: {}}, "description": "Page thumbnail(s)"},
+    304: {"description": "Thumbnail unchanged (If-None-Match)"}
+})
+@limiter.limit(settings.PREVIEW_RATE_LIMIT)
+async def generate_thumbnails(
+    request: Request,
+    cv_data: dict,
+    document: str = DOCUMENT_QUERY,
+    theme: str = Query(default="classic", pattern=r'^(classic|modern|academic)$'),
+    pages: str = Query(default="first", pattern=r'^(first|all)$', description="Page 1 only, or every page as a zip"),
+    dpi: int = Query(default=72, ge=24, le=300),
+    image_format: str = Query(default="png", pattern=r'^(png|webp)$')
+):
+    """
+    Rasterise the CV or cover letter into PNG/WebP page thumbnails
+    
+    Returns the page 1 image, or a zip of every page for `pages=all`.
+    Thumbnails are cached by content hash and carry an `ETag`, so clients
+    can revalidate with `If-None-Match` instead of downloading again.
+    """
+    try:
+        digest, content = await cv_service.render_thumbnails(
+            cv_data, theme, document, pages == "all", dpi, image_format
+        )
+        
+        etag = f'"{digest}"'
+        headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        
+        if pages == "all":
+            headers["Content-Disposition"] = f'attachment; filename="{document}_thumbnails.zip"'
+            return Response(content=content, media_type=ZIP_MEDIA_TYPE, headers=headers)
+        return Response(content=content, media_type=f"image/{image_format}", headers=headers)
+        
+    except RenderQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Thumbnail generation failed: {str(e)}")
+
+
+@router.post("/generate-cover-letter", responses={
+    200: {"content": {EVENT_STREAM_MEDIA_TYPE: {}}, "description": "Cover letter JSON, or Server-Sent Events when streaming"}
+})
 @limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_WINDOW}")
 async def generate_cover_letter_only(
     request: Request,
-    data: dict
+    data: dict,
+    use_cache: bool = LLM_CACHE_QUERY,
+    stream: bool = Query(default=False, description="Stream tokens as Server-Sent Events")
 ):
     """
     Generate cover letter content only (JSON response)
+    
+    With `?stream=true` (or `Accept: text/event-stream`) the letter is
+    streamed as Server-Sent Events while Gemini writes it: `start`, then a
+    `token` event per chunk (`{"text": ...}`), then `result` with the same
+    parsed cover letter the JSON response returns, or `error`.
     """
     try:
         # Extract required data
@@ -79,34 +399,67 @@ async def generate_cover_letter_only(
         job_description = data.get("job_description", "")
         company_name = data.get("company_name", "")
         
+        if wants_event_stream(request, stream):
+            # Once the stream starts the status is 200, so refuse while we still can
+            if not llm_limiter.accepting():
+                raise LLMQueueFullError("AI generation is at capacity. Please try again shortly.")
+            return event_stream(
+                cv_service.stream_cover_letter_only(cv_data, job_description, company_name, use_cache)
+            )
+        
         # Generate cover letter content
-        result = await cv_service.generate_cover_letter_only(cv_data, job_description, company_name)
+        result = await cv_service.generate_cover_letter_only(cv_data, job_description, company_name, use_cache)
         return result
         
+    except LLMQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(LLM_RETRY_AFTER_SECONDS)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Cover letter generation failed: {str(e)}")
 
 
-@router.post("/generate-cover-letter-pdf")
+@router.post("/generate-cover-letter-pdf", responses=BINARY_DOCUMENT_RESPONSES)
 @limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_WINDOW}")
 async def generate_cover_letter_pdf(
     request: Request,
-    cover_letter_data: dict
+    cover_letter_data: dict,
+    format: Optional[str] = FORMAT_QUERY,
+    delivery: str = DELIVERY_QUERY
 ):
     """
     Generate cover letter PDF from structured data
+    
+    Renders in the data's `theme` (default classic). Returns base64 JSON by
+    default (a signed download URL with `?delivery=url`), or the PDF itself
+    for `Accept: application/pdf`.
     """
     try:
+        media_type = negotiate_media_type(request, format)
+        theme = cover_letter_data.get("theme") or "classic"
+        
         # Generate only cover letter PDF
-        _, cover_letter_pdf = await cv_service._generate_pdfs(cover_letter_data)
+        cover_letter_pdf = await cv_service.render_document(cover_letter_data, theme, "cover_letter")
+        _, filename_cover_letter = cv_service.document_filenames()
+        
+        if media_type != JSON_MEDIA_TYPE:
+            return document_download(
+                media_type, None, cover_letter_pdf, "", filename_cover_letter, "cover_letter"
+            )
+        
+        if delivery == "url":
+            return await artifact_links([("cover_letter_pdf", filename_cover_letter, cover_letter_pdf)])
         
         import base64
-        from datetime import datetime
         
         return {
             "cover_letter_pdf_base64": base64.b64encode(cover_letter_pdf).decode(),
-            "filename_cover_letter": f"cover_letter_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            "filename_cover_letter": filename_cover_letter
         }
         
+    except HTTPException:
+        raise
+    except RenderQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Cover letter PDF generation failed: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+Batch Rendering Operations
+Renders many structured CVs in one request, streaming each document back as it finishes
+"""
+
+import base64
+import json
+import logging
+import time
+import zipfile
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from app.api.v1.negotiation import ZIP_MEDIA_TYPE
+from app.core.config import settings
+from app.schemas.models import BatchRenderRequest
+from app.services.generator_service import cv_service
+from app.services.render_pool import render_pool
+
+# Initialize router and rate limiter
+router = APIRouter(tags=["Batch Rendering"])
+limiter = Limiter(key_func=get_remote_address)
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class _ChunkWriter:
+    """Write-only file object that hands zip output back in chunks"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def _default_concurrency(document: str) -> int:
+    """
+    Documents rendered at once when BATCH_RENDER_CONCURRENCY is unset
+
+    A batch may fill half of the render workers, so interactive requests
+    always find a free one; ``both`` renders two PDFs per document.
+    """
+    renders_per_document = 2 if document == "both" else 1
+    return max(1, render_pool.max_workers // 2 // renders_per_document)
+
+
+def _batch_filenames(index: int) -> Dict[str, str]:
+    return {
+        "cv_pdf": f"cv_{index:04d}.pdf",
+        "cover_letter_pdf": f"cover_letter_{index:04d}.pdf",
+    }
+
+
+def _summary(total: int, succeeded: int, failed: int, started: float) -> Dict[str, Any]:
+    elapsed = time.perf_counter() - started
+    return {
+        "total": total,
+        "succeeded": succeeded,
+        "failed": failed,
+        "elapsed_seconds": round(elapsed, 3),
+        "docs_per_sec": round(succeeded / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+async def _stream_ndjson(results: AsyncIterator[Dict[str, Any]], total: int) -> AsyncIterator[bytes]:
+    started = time.perf_counter()
+    succeeded = failed = 0
+
+    async for result in results:
+        line = {"index": result["index"], "render_ms": result["render_ms"]}
+        if result["error"]:
+            failed += 1
+            line.update(status="error", error=result["error"])
+        else:
+            succeeded += 1
+            line["status"] = "ok"
+            for key, filename in _batch_filenames(result["index"]).items():
+                if result[key] is not None:
+                    line[f"{key}_base64"] = base64.b64encode(result[key]).decode()
+                    line[f"filename_{key[:-4]}"] = filename
+        line["docs_per_sec"] = _summary(total, succeeded, failed, started)["docs_per_sec"]
+        yield (json.dumps(line) + "\n").encode()
+
+    summary = _summary(total, succeeded, failed, started)
+    logger.info(f"Batch render finished: {summary}")
+    yield (json.dumps({"summary": summary}) + "\n").encode()
+
+
+async def _stream_zip(results: AsyncIterator[Dict[str, Any]], total: int) -> AsyncIterator[bytes]:
+    started = time.perf_counter()
+    succeeded = failed = 0
+    errors = []
+    writer = _ChunkWriter()
+
+    # PDFs are already compressed, so store them as-is
+    with zipfile.ZipFile(writer, "w", compression=zipfile.ZIP_STORED) as archive:
+        async for result in results:
+            if result["error"]:
+                failed += 1
+                errors.append({"index": result["index"], "error": result["error"]})
+                continue
+
+            succeeded += 1
+            for key, filename in _batch_filenames(result["index"]).items():
+                if result[key] is not None:
+                    archive.writestr(filename, result[key])
+            yield writer.drain()
+
+        summary = _summary(total, succeeded, failed, started)
+        logger.info(f"Batch render finished: {summary}")
+        archive.writestr("summary.json", json.dumps({"summary": summary, "errors": errors}, indent=2))
+    yield writer.drain()
+
+
+@router.post("/batch-render", responses={
+    200: {"content": {NDJSON_MEDIA_TYPE: {}, ZIP_MEDIA_TYPE: {}},
+          "description": "One NDJSON line (or zip entry) per document, in completion order"}
+})
+@limiter.limit(settings.BATCH_RENDER_RATE_LIMIT)
+async def batch_render(
+    request: Request,
+    batch: BatchRenderRequest,
+    format: Optional[str] = Query(default=None, pattern=r'^(ndjson|zip)$',
+                                  description="ndjson (default) or zip; overrides the Accept header")
+):
+    """
+    Render many CVs and/or cover letters in one request
+
+    Documents are fanned out across the render worker pool and streamed back
+    as each one finishes: NDJSON lines with base64 PDFs, or a zip archive
+    (`Accept: application/zip` or `?format=zip`). The last NDJSON line (or
+    `summary.json` in the zip) reports totals and throughput in docs/sec.
+    """
+    if len(batch.documents) > settings.BATCH_RENDER_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large: {len(batch.documents)} documents (max {settings.BATCH_RENDER_MAX_DOCUMENTS})"
+        )
+
+    if format is None:
+        format = "zip" if ZIP_MEDIA_TYPE in request.headers.get("accept", "") else "ndjson"
+
+    try:
+        concurrency = settings.BATCH_RENDER_CONCURRENCY or _default_concurrency(batch.document)
+        results = cv_service.render_batch(batch.documents, batch.theme, batch.document, concurrency)
+
+        if format == "zip":
+            return StreamingResponse(
+                _stream_zip(results, len(batch.documents)),
+                media_type=ZIP_MEDIA_TYPE,
+                headers={"Content-Disposition": 'attachment; filename="batch_render.zip"'}
+            )
+        return StreamingResponse(_stream_ndjson(results, len(batch.documents)), media_type=NDJSON_MEDIA_TYPE)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch rendering failed: {str(e)}")
@@ -3,34 +3,57 @@ File Upload Handler
 Manages CV file uploads and processing
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
+from typing import Optional, Union
+
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request, Response
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from app.api.v1.negotiation import (
+    BINARY_DOCUMENT_RESPONSES, DELIVERY_QUERY, DOCUMENT_QUERY, FORMAT_QUERY, JSON_MEDIA_TYPE, LLM_CACHE_QUERY,
+    negotiate_media_type, document_download
+)
 from app.core.config import settings
-from app.schemas.models import PDFResponse
+from app.schemas.models import ArtifactPDFResponse, PDFResponse
 from app.services.generator_service import cv_service
+from app.services.llm_limiter import LLM_RETRY_AFTER_SECONDS, LLMQueueFullError
+from app.services.render_pool import RenderQueueFullError, RenderTimeoutError
+from app.services.stage_graph import server_timing, stage_trace
 
 # Initialize router and rate limiter
 router = APIRouter(tags=["File Management"])
 limiter = Limiter(key_func=get_remote_address)
 
 
-@router.post("/generate-from-upload", response_model=PDFResponse)
+@router.post("/generate-from-upload", response_model=Union[PDFResponse, ArtifactPDFResponse],
+             responses=BINARY_DOCUMENT_RESPONSES)
 @limiter.limit(f"{settings.RATE_LIMIT_REQUESTS}/{settings.RATE_LIMIT_WINDOW}")
 async def generate_cv_from_upload(
     request: Request,
+    response: Response,
     file: UploadFile = File(...),
     job_description: str = Form(...),
-    theme: str = Form(default="classic")
-) -> PDFResponse:
+    theme: str = Form(default="classic"),
+    format: Optional[str] = FORMAT_QUERY,
+    document: str = DOCUMENT_QUERY,
+    delivery: str = DELIVERY_QUERY,
+    use_cache: bool = LLM_CACHE_QUERY
+):
     """
     Generate CV from uploaded file (Updater flow)
     
     Accepts PDF or DOCX CV files, extracts content, and generates
     an optimized version based on the provided job description.
+    
+    Returns base64 JSON by default. Send `Accept: application/pdf`,
+    `application/zip` or `multipart/mixed` (or `?format=`) to download the
+    documents directly. `?delivery=url` returns signed, short-lived
+    download URLs instead of base64 PDFs. `?use_cache=false` skips the
+    Gemini response cache.
     """
     try:
+        media_type = negotiate_media_type(request, format)
+        
         # Validate file type
         if not file.filename:
             raise HTTPException(status_code=400, detail="No file provided")
@@ -64,11 +87,31 @@ async def generate_cv_from_upload(
             )
         
         # Generate updated CV
-        result = await cv_service.generate_from_upload(cv_text, job_description, theme)
-        return result
+        with stage_trace() as trace:
+            if media_type == JSON_MEDIA_TYPE:
+                result = await cv_service.generate_from_upload(cv_text, job_description, theme, delivery, use_cache)
+                response.headers["Server-Timing"] = server_timing(trace)
+                return result
+            
+            cv_pdf, cover_letter_pdf, _ = await cv_service.generate_documents_from_upload(
+                cv_text, job_description, theme, use_cache
+            )
+        
+        filename_cv, filename_cover_letter = cv_service.document_filenames("updated_cv")
+        download = document_download(
+            media_type, cv_pdf, cover_letter_pdf, filename_cv, filename_cover_letter, document
+        )
+        download.headers["Server-Timing"] = server_timing(trace)
+        return download
         
     except HTTPException:
         raise
+    except RenderQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LLMQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(LLM_RETRY_AFTER_SECONDS)})
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         error_msg = f"File processing failed: {type(e).__name__}"
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+Content Negotiation
+Returns generated documents as binary downloads instead of base64-in-JSON when the client asks for it
+"""
+
+import asyncio
+import io
+import json
+import uuid
+import zipfile
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.services.artifact_store import artifact_store
+
+PDF_MEDIA_TYPE = "application/pdf"
+ZIP_MEDIA_TYPE = "application/zip"
+MULTIPART_MEDIA_TYPE = "multipart/mixed"
+JSON_MEDIA_TYPE = "application/json"
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+# Short names accepted in the ?format= query parameter
+FORMAT_MEDIA_TYPES = {
+    "json": JSON_MEDIA_TYPE,
+    "pdf": PDF_MEDIA_TYPE,
+    "zip": ZIP_MEDIA_TYPE,
+    "multipart": MULTIPART_MEDIA_TYPE,
+}
+
+# OpenAPI description of the binary variants
+BINARY_DOCUMENT_RESPONSES = {
+    200: {
+        "content": {
+            PDF_MEDIA_TYPE: {},
+            ZIP_MEDIA_TYPE: {},
+            MULTIPART_MEDIA_TYPE: {},
+        },
+        "description": "Base64 JSON by default, or binary PDF / zip / multipart when requested via Accept or ?format=",
+    }
+}
+
+
+# Binary downloads: the requested format (overrides Accept) and which document a single PDF carries
+FORMAT_QUERY = Query(default=None, description="json, pdf, zip or multipart (overrides the Accept header)")
+DOCUMENT_QUERY = Query(default="cv", pattern=r'^(cv|cover_letter)$', description="Document returned for application/pdf")
+
+# JSON responses: inline base64 documents (default) or signed artifact download URLs
+DELIVERY_QUERY = Query(default="inline", pattern=r'^(inline|url)$',
+                       description="JSON only: inline base64 PDFs, or url for signed short-lived download URLs")
+
+# Generation endpoints: replay cached Gemini responses for identical prompts (default) or always call Gemini
+LLM_CACHE_QUERY = Query(default=True, description="Set false to skip the Gemini response cache and generate fresh content")
+
+
+async def artifact_links(documents: List[Tuple[str, str, Optional[bytes]]]) -> dict:
+    """Publish ``(key, filename, pdf)`` documents to the artifact store, keyed by their signed download link"""
+    # Publishing writes files, so keep it off the event loop
+    return {
+        key: await asyncio.to_thread(artifact_store.publish, pdf, filename)
+        for key, filename, pdf in documents
+        if pdf is not None
+    }
+
+
+def negotiate_media_type(request: Request, format: Optional[str] = None) -> str:
+    """
+    Pick the response media type for a document endpoint
+
+    An explicit ``format`` query value wins; otherwise the highest-q match in
+    the Accept header is used. Anything else falls back to JSON so existing
+    clients keep working.
+    """
+    if format:
+        media_type = FORMAT_MEDIA_TYPES.get(format.lower())
+        if not media_type:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported format '{format}'. Use one of: {', '.join(FORMAT_MEDIA_TYPES)}"
+            )
+        return media_type
+
+    best_type, best_q = JSON_MEDIA_TYPE, 0.0
+    for part in request.headers.get("accept", "").split(","):
+        fields = [field.strip() for field in part.split(";")]
+        media_type = fields[0].lower()
+        if media_type not in FORMAT_MEDIA_TYPES.values():
+            continue
+
+        q = 1.0
+        for param in fields[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+
+        if q > best_q:
+            best_type, best_q = media_type, q
+
+    return best_type
+
+
+def wants_event_stream(request: Request, stream: bool = False) -> bool:
+    """Stream Server-Sent Events for ``?stream=true`` or ``Accept: text/event-stream``"""
+    return stream or EVENT_STREAM_MEDIA_TYPE in request.headers.get("accept", "").lower()
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> bytes:
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n".encode("utf-8")
+
+
+def event_stream(events: AsyncIterator[Tuple[str, Dict[str, Any]]]) -> StreamingResponse:
+    """Send (event, data) pairs as they are produced, unbuffered by proxies"""
+    async def body():
+        async for event, data in events:
+            yield sse_event(event, data)
+
+    return StreamingResponse(
+        body(),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def pdf_download(pdf: bytes, filename: str) -> Response:
+    """Return a single PDF as a binary download"""
+    return Response(
+        content=pdf,
+        media_type=PDF_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def bundle_download(documents: List[Tuple[str, bytes]], media_type: str,
+                    bundle_name: str = "documents") -> Response:
+    """Return several PDFs as one zip archive or multipart/mixed body"""
+    if media_type == ZIP_MEDIA_TYPE:
+        buffer = io.BytesIO()
+        # PDFs are already compressed, so store them as-is
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+            for filename, pdf in documents:
+                archive.writestr(filename, pdf)
+        return Response(
+            content=buffer.getvalue(),
+            media_type=ZIP_MEDIA_TYPE,
+            headers={"Content-Disposition": f'attachment; filename="{bundle_name}.zip"'}
+        )
+
+    boundary = uuid.uuid4().hex
+    parts = []
+    for filename, pdf in documents:
+        parts.append(
+            f"--{boundary}\r\n"
+            f"Content-Type: {PDF_MEDIA_TYPE}\r\n"
+            f'Content-Disposition: attachment; filename="{filename}"\r\n'
+            f"Content-Length: {len(pdf)}\r\n\r\n".encode()
+        )
+        parts.append(pdf)
+        parts.append(b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+
+    return Response(
+        content=b"".join(parts),
+        media_type=f"{MULTIPART_MEDIA_TYPE}; boundary={boundary}"
+    )
+
+
+def document_download(media_type: str, cv_pdf: Optional[bytes], cover_letter_pdf: Optional[bytes],
+                      filename_cv: str, filename_cover_letter: str,
+                      document: str = "cv") -> Response:
+    """
+    Build the binary response for a negotiated media type
+
+    ``application/pdf`` returns the document named by ``document``
+    (``cv`` or ``cover_letter``); zip and multipart bundle every document
+    that was generated.
+    """
+    if media_type == PDF_MEDIA_TYPE:
+        if document == "cover_letter" and cover_letter_pdf is not None:
+            return pdf_download(cover_letter_pdf, filename_cover_letter)
+        if document == "cv" and cv_pdf is not None:
+            return pdf_download(cv_pdf, filename_cv)
+        raise HTTPException(status_code=400, detail=f"Unknown document '{document}'. Use 'cv' or 'cover_letter'")
+
+    documents = []
+    if cv_pdf is not None:
+        documents.append((filename_cv, cv_pdf))
+    if cover_letter_pdf is not None:
+        documents.append((filename_cover_letter, cover_letter_pdf))
+    return bundle_download(documents, media_type)
@@ -6,9 +6,10 @@ Orchestrates all domain routers for v1 API
 from fastapi import APIRouter
 
 # Import domain routers
-from .cv_operations import basic_router
+from .cv_operations import basic_router, batch_router
 from .file_management import upload_router, format_router
 from .async_operations import async_router
+from .artifacts import artifact_router
 from .system import health_router
 
 # Create main v1 router
@@ -16,9 +17,11 @@ router = APIRouter()
 
 # Include domain routers with appropriate prefixes
 router.include_router(basic_router, prefix="/cv", tags=["CV Generation"])
+router.include_router(batch_router, prefix="/cv", tags=["Batch Rendering"])
 router.include_router(upload_router, prefix="/files", tags=["File Management"])
 router.include_router(format_router, prefix="/files", tags=["File Support"])
 router.include_router(async_router, prefix="/async", tags=["Async Operations"])
+router.include_router(artifact_router, prefix="/artifacts", tags=["Artifacts"])
 router.include_router(health_router, prefix="", tags=["System Health"])
 
 # Legacy endpoint support (for backward compatibility)
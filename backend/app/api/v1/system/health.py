@@ -4,10 +4,20 @@ System health checks and status endpoints
 """
 
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from datetime import datetime
 
 from app.core.config import settings
+from app.services.artifact_store import artifact_store
+from app.services.gemini_client import gemini_client
 from app.services.generator_service import cv_service
+from app.services.llm_cache import llm_cache
+from app.services.llm_limiter import llm_limiter
+from app.services.llm_retry import gemini_retry
+from app.services.fragment_renderer import fragment_cache
+from app.services.render_cache import render_cache
+from app.services.render_pool import render_pool
+from app.services.stage_graph import stage_executor
 
 # Initialize router
 router = APIRouter(tags=["System Health"])
@@ -27,6 +37,22 @@ async def health_check():
     }
 
 
+@router.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness check - reports ready once PDF render workers are warm
+    """
+    ready = render_pool.warmed or not settings.PDF_WARMUP_ON_STARTUP
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "warming_up",
+            "timestamp": datetime.now().isoformat(),
+            "render_workers": render_pool.max_workers
+        }
+    )
+
+
 @router.get("/health/detailed")
 async def detailed_health_check():
     """
@@ -77,6 +103,45 @@ async def detailed_health_check():
     return health_status
 
 
+@router.get("/metrics/rendering")
+async def get_rendering_metrics():
+    """
+    PDF render pool load, queue-wait and render-time metrics
+    """
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "render_pool": render_pool.get_stats(),
+        "render_cache": render_cache.get_stats(),
+        "fragment_cache": fragment_cache.get_stats(),
+        "artifact_store": artifact_store.get_stats()
+    }
+
+
+@router.get("/metrics/pipeline")
+async def get_pipeline_metrics():
+    """
+    Wall-time metrics for every generation pipeline and stage
+    """
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **stage_executor.metrics.snapshot()
+    }
+
+
+@router.get("/metrics/gemini")
+async def get_gemini_metrics():
+    """
+    Gemini client pool, connection reuse, response cache, limiter queue and retry/hedging metrics
+    """
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "client": gemini_client.get_stats(),
+        "response_cache": llm_cache.get_stats(),
+        "limiter": llm_limiter.get_stats(),
+        "retries": gemini_retry.get_stats()
+    }
+
+
 @router.get("/status")
 async def get_system_status():
     """
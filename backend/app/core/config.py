@@ -3,6 +3,7 @@ Configuration settings for CVGenius backend
 """
 
 import os
+import tempfile
 from typing import List
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
@@ -39,6 +40,38 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     VERTEX_AI_LOCATION: str = os.getenv("VERTEX_AI_LOCATION", "us-central1")
     
+    # Gemini HTTP client (one pooled client for the app lifetime)
+    GEMINI_HTTP2: bool = os.getenv("GEMINI_HTTP2", "true").lower() == "true"  # needs the h2 package
+    GEMINI_MAX_CONNECTIONS: int = int(os.getenv("GEMINI_MAX_CONNECTIONS", "20"))
+    GEMINI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("GEMINI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    GEMINI_KEEPALIVE_EXPIRY: float = float(os.getenv("GEMINI_KEEPALIVE_EXPIRY", "120"))  # seconds idle before closing
+    GEMINI_TIMEOUT: float = float(os.getenv("GEMINI_TIMEOUT", "180"))  # seconds
+    GEMINI_CONNECT_TIMEOUT: float = float(os.getenv("GEMINI_CONNECT_TIMEOUT", "10"))  # seconds
+    GEMINI_PRECONNECT_ON_STARTUP: bool = os.getenv("GEMINI_PRECONNECT_ON_STARTUP", "true").lower() == "true"
+    
+    # Gemini response cache
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_MEMORY_MB: int = int(os.getenv("LLM_CACHE_MEMORY_MB", "16"))
+    LLM_CACHE_DB_MB: int = int(os.getenv("LLM_CACHE_DB_MB", "256"))  # 0 disables the SQLite tier
+    LLM_CACHE_DB_PATH: str = os.getenv("LLM_CACHE_DB_PATH", os.path.join(tempfile.gettempdir(), "cvgenius-llm-cache.sqlite3"))
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    
+    # Gemini call limits (process-wide)
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))  # 0 disables the token-rate cap
+    LLM_MAX_QUEUE_DEPTH: int = int(os.getenv("LLM_MAX_QUEUE_DEPTH", "64"))  # waiting calls before 503s
+    LLM_BACKGROUND_QUEUE_DEPTH: int = int(os.getenv("LLM_BACKGROUND_QUEUE_DEPTH", "32"))  # /async jobs stop queueing here
+    
+    # Gemini retries and hedging
+    GEMINI_MAX_ATTEMPTS: int = int(os.getenv("GEMINI_MAX_ATTEMPTS", "3"))  # 1 disables retries
+    GEMINI_RETRY_BASE_DELAY: float = float(os.getenv("GEMINI_RETRY_BASE_DELAY", "0.5"))  # seconds, doubled per retry
+    GEMINI_RETRY_MAX_DELAY: float = float(os.getenv("GEMINI_RETRY_MAX_DELAY", "8"))  # seconds
+    GEMINI_RETRY_DEADLINE: float = float(os.getenv("GEMINI_RETRY_DEADLINE", "180"))  # seconds for a call and all its retries
+    GEMINI_RETRY_BUDGET_RATIO: float = float(os.getenv("GEMINI_RETRY_BUDGET_RATIO", "0.1"))  # extra attempts per call
+    GEMINI_RETRY_BUDGET_MIN: int = int(os.getenv("GEMINI_RETRY_BUDGET_MIN", "10"))  # extra attempts always allowed per minute
+    GEMINI_HEDGING: bool = os.getenv("GEMINI_HEDGING", "false").lower() == "true"
+    GEMINI_HEDGE_MIN_DELAY: float = float(os.getenv("GEMINI_HEDGE_MIN_DELAY", "2"))  # never hedge sooner than this
+    
     # Rate limiting
     RATE_LIMIT_REQUESTS: int = int(os.getenv("RATE_LIMIT_REQUESTS", "15"))
     RATE_LIMIT_WINDOW: str = os.getenv("RATE_LIMIT_WINDOW", "1 hour")
@@ -49,6 +82,44 @@ class Settings(BaseSettings):
     
     # PDF generation settings
     PDF_TIMEOUT: int = int(os.getenv("PDF_TIMEOUT", "30"))  # seconds
+    PDF_RENDER_WORKERS: int = int(os.getenv("PDF_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))  # 0 = render in a thread
+    PDF_RENDER_QUEUE_DEPTH: int = int(os.getenv("PDF_RENDER_QUEUE_DEPTH", "16"))  # renders allowed to wait for a worker
+    PDF_RENDER_START_METHOD: str = os.getenv("PDF_RENDER_START_METHOD", "spawn")
+    PDF_WARMUP_ON_STARTUP: bool = os.getenv("PDF_WARMUP_ON_STARTUP", "true").lower() == "true"
+    DIRECT_RENDER_THEMES: str = os.getenv("DIRECT_RENDER_THEMES", "")  # comma-separated themes drawn without HTML, e.g. "classic"
+    SPECULATIVE_THEME_RENDER: bool = os.getenv("SPECULATIVE_THEME_RENDER", "false").lower() == "true"  # pre-render other letter themes
+    PDF_BUNDLE_RENDER: bool = os.getenv("PDF_BUNDLE_RENDER", "false").lower() == "true"  # CV + letter in one worker pass
+
+    # Live preview (draft-quality renders)
+    PREVIEW_RATE_LIMIT: str = os.getenv("PREVIEW_RATE_LIMIT", "120/minute")
+    PREVIEW_LATENCY_TARGET_MS: int = int(os.getenv("PREVIEW_LATENCY_TARGET_MS", "300"))  # p95 on a warm worker
+    HTML_PREVIEW_RATE_LIMIT: str = os.getenv("HTML_PREVIEW_RATE_LIMIT", "600/minute")
+    HTML_PREVIEW_LATENCY_TARGET_MS: int = int(os.getenv("HTML_PREVIEW_LATENCY_TARGET_MS", "50"))  # p95
+
+    # Batch rendering
+    BATCH_RENDER_MAX_DOCUMENTS: int = int(os.getenv("BATCH_RENDER_MAX_DOCUMENTS", "500"))
+    BATCH_RENDER_CONCURRENCY: int = int(os.getenv("BATCH_RENDER_CONCURRENCY", "0"))  # 0 = half the render workers
+    BATCH_RENDER_RATE_LIMIT: str = os.getenv("BATCH_RENDER_RATE_LIMIT", "10/hour")
+    BATCH_RENDER_QUEUE_WAIT_SECONDS: int = int(os.getenv("BATCH_RENDER_QUEUE_WAIT_SECONDS", "120"))  # per document, while the queue is full
+
+    # Page fitting
+    PAGE_FIT_MAX_PAGES: int = int(os.getenv("PAGE_FIT_MAX_PAGES", "4"))  # largest page budget a client may ask for
+
+    # Template settings
+    TEMPLATE_BYTECODE_CACHE_DIR: str = os.getenv("TEMPLATE_BYTECODE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "cvgenius-jinja-cache"))  # empty disables
+
+    # Artifact store (generated documents served through signed download URLs)
+    ARTIFACT_STORE_DIR: str = os.getenv("ARTIFACT_STORE_DIR", os.path.join(tempfile.gettempdir(), "cvgenius-artifacts"))
+    ARTIFACT_STORE_MAX_MB: int = int(os.getenv("ARTIFACT_STORE_MAX_MB", "1024"))
+    ARTIFACT_TTL_SECONDS: int = int(os.getenv("ARTIFACT_TTL_SECONDS", "86400"))  # since last publish
+    ARTIFACT_URL_TTL_SECONDS: int = int(os.getenv("ARTIFACT_URL_TTL_SECONDS", "900"))  # download URL lifetime
+
+    # Render cache settings
+    RENDER_CACHE_ENABLED: bool = os.getenv("RENDER_CACHE_ENABLED", "true").lower() == "true"
+    RENDER_CACHE_MEMORY_MB: int = int(os.getenv("RENDER_CACHE_MEMORY_MB", "64"))
+    RENDER_CACHE_DISK_MB: int = int(os.getenv("RENDER_CACHE_DISK_MB", "512"))  # 0 disables the disk tier
+    RENDER_CACHE_DIR: str = os.getenv("RENDER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "cvgenius-render-cache"))
+    FRAGMENT_CACHE_MEMORY_MB: int = int(os.getenv("FRAGMENT_CACHE_MEMORY_MB", "8"))  # per-section CV HTML fragments
 
     class Config:
         env_file = ".env"
@@ -66,6 +66,21 @@ class CVUploadRequest(BaseModel):
         return v
 
 
+class BatchRenderRequest(BaseModel):
+    """Request model for bulk rendering of structured CV data"""
+    documents: List[Dict[str, Any]] = Field(..., min_items=1)
+    theme: str = Field(default="classic", pattern=r'^(classic|modern|academic)$')
+    document: str = Field(default="cv", pattern=r'^(cv|cover_letter|both)$')
+
+
+class HTMLPreviewRequest(BaseModel):
+    """Request model for the HTML live preview"""
+    cv_data: Dict[str, Any]
+    document: str = Field(default="cv", pattern=r'^(cv|cover_letter)$')
+    theme: str = Field(default="classic", pattern=r'^(classic|modern|academic)$')
+    known_sections: Optional[Dict[str, str]] = None  # section -> digest the client already has
+
+
 class GeneratedCVResponse(BaseModel):
     """Response model for generated CV content"""
     personal_details: Dict[str, Any]
@@ -87,6 +102,23 @@ class PDFResponse(BaseModel):
     cv_data: Optional[Dict[str, Any]] = None  # Include parsed CV data for editing
 
 
+class ArtifactLink(BaseModel):
+    """Signed, short-lived download URL for a stored artifact"""
+    artifact_id: str
+    filename: str
+    size_bytes: int
+    download_url: str
+    expires_at: int  # Unix timestamp
+
+
+class ArtifactPDFResponse(BaseModel):
+    """Response model for PDF generation with delivery=url"""
+    cv_pdf: ArtifactLink
+    cover_letter_pdf: ArtifactLink
+    generation_timestamp: datetime
+    cv_data: Optional[Dict[str, Any]] = None
+
+
 class ErrorResponse(BaseModel):
     """Standard error response model"""
     error: str
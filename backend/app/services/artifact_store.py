@@ -0,0 +1,235 @@
+"""
+Artifact Store
+Content-addressed, size-capped and TTL-evicted directory of generated documents, downloaded through signed short-lived URLs
+"""
+
+import hashlib
+import hmac
+import logging
+import mimetypes
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_URL_PREFIX = "/api/v1/artifacts"
+
+# How often a publish may trigger a sweep for expired artifacts
+SWEEP_INTERVAL_SECONDS = 60
+
+
+class ArtifactStore:
+    """
+    Filesystem store for generated PDFs and archives
+
+    Artifacts are named by the SHA-256 of their bytes, so publishing the
+    same document twice stores it once. Artifacts expire ``ttl_seconds``
+    after they were last published, and the oldest are evicted first once
+    the directory grows past ``max_bytes``. Download URLs carry an HMAC of
+    the artifact id, filename and expiry signed with ``secret_key``.
+
+    Publishing blocks on file I/O and is safe to call from several threads.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl_seconds: int,
+                 url_ttl_seconds: int, secret_key: str):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.url_ttl_seconds = url_ttl_seconds
+        self._secret = secret_key.encode("utf-8")
+        self._total_bytes: Optional[int] = None
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+        # Counters
+        self.published = 0
+        self.deduplicated = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def put(self, data: bytes) -> str:
+        """Store bytes and return their artifact id"""
+        artifact_id = hashlib.sha256(data).hexdigest()
+        path = self._path(artifact_id)
+        self.published += 1
+
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            # Re-publishing restarts the TTL
+            os.utime(path)
+            self.deduplicated += 1
+        except FileNotFoundError:
+            self._write(path, data)
+
+        now = time.time()
+        if (self._total_bytes or 0) > self.max_bytes or now - self._last_sweep > SWEEP_INTERVAL_SECONDS:
+            self.sweep(now)
+        return artifact_id
+
+    def get(self, artifact_id: str) -> Optional[bytes]:
+        """Read an artifact's bytes, or None if it is missing or expired"""
+        path = self.path_for(artifact_id)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def path_for(self, artifact_id: str) -> Optional[str]:
+        """Get the file path of a live artifact, or None if it is missing or expired"""
+        if not _is_artifact_id(artifact_id):
+            return None
+
+        path = self._path(artifact_id)
+        try:
+            modified = os.path.getmtime(path)
+        except OSError:
+            return None
+        if time.time() - modified > self.ttl_seconds:
+            return None
+        return path
+
+    def publish(self, data: bytes, filename: str) -> Dict[str, Any]:
+        """Store bytes and describe them with a signed download URL"""
+        artifact_id = self.put(data)
+        return {
+            "artifact_id": artifact_id,
+            "filename": filename,
+            "size_bytes": len(data),
+            **self.sign(artifact_id, filename),
+        }
+
+    def sign(self, artifact_id: str, filename: str, expires_in: Optional[int] = None) -> Dict[str, Any]:
+        """Build a signed download URL for an artifact"""
+        expires = int(time.time()) + (expires_in or self.url_ttl_seconds)
+        query = urlencode({
+            "filename": filename,
+            "expires": expires,
+            "signature": self._signature(artifact_id, filename, expires),
+        })
+        return {
+            "download_url": f"{ARTIFACT_URL_PREFIX}/{artifact_id}?{query}",
+            "expires_at": expires,
+        }
+
+    def verify(self, artifact_id: str, filename: str, expires: int, signature: str) -> bool:
+        """Check a download URL's signature and expiry"""
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self._signature(artifact_id, filename, expires), signature)
+
+    def sweep(self, now: Optional[float] = None):
+        """Delete expired artifacts, then the oldest ones until the store fits its size cap"""
+        with self._lock:
+            self._sweep(now or time.time())
+
+    def _sweep(self, now: float):
+        self._last_sweep = now
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if not _is_artifact_id(name):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                self._remove_file(path)
+                self.expirations += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        if total > self.max_bytes:
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                self._remove_file(path)
+                total -= size
+                self.evictions += 1
+        self._total_bytes = total
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get publish/eviction counters and store size"""
+        return {
+            "published": self.published,
+            "deduplicated": self.deduplicated,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "total_bytes": self._total_bytes or 0,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "url_ttl_seconds": self.url_ttl_seconds,
+        }
+
+    @staticmethod
+    def media_type(filename: str) -> str:
+        return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    def _signature(self, artifact_id: str, filename: str, expires: int) -> str:
+        message = f"{artifact_id}\n{filename}\n{expires}".encode("utf-8")
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def _path(self, artifact_id: str) -> str:
+        return os.path.join(self.directory, artifact_id)
+
+    def _write(self, path: str, data: bytes):
+        # Write atomically so concurrent downloads never see partial files. Each
+        # writer gets its own temp file and the first one to finish publishes it.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            with self._lock:
+                if self._total_bytes is None:
+                    self._total_bytes = self._scan_bytes()
+                if os.path.exists(path):
+                    self.deduplicated += 1
+                else:
+                    os.replace(tmp_path, path)
+                    self._total_bytes += len(data)
+        finally:
+            self._remove_file(tmp_path)
+
+    def _scan_bytes(self) -> int:
+        total = 0
+        for name in os.listdir(self.directory):
+            if _is_artifact_id(name):
+                try:
+                    total += os.path.getsize(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+        return total
+
+    def _remove_file(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _is_artifact_id(value: str) -> bool:
+    return len(value) == 64 and all(c in "0123456789abcdef" for c in value)
+
+
+# Global artifact store instance
+artifact_store = ArtifactStore(
+    directory=settings.ARTIFACT_STORE_DIR,
+    max_bytes=settings.ARTIFACT_STORE_MAX_MB * 1024 * 1024,
+    ttl_seconds=settings.ARTIFACT_TTL_SECONDS,
+    url_ttl_seconds=settings.ARTIFACT_URL_TTL_SECONDS,
+    secret_key=settings.SECRET_KEY
+)
@@ -8,6 +8,9 @@ from datetime import datetime, timedelta
 import json
 import redis
 
+from app.services.llm_limiter import PRIORITY_BACKGROUND, llm_priority
+from app.services.stage_graph import stage_trace
+
 # Simple in-memory task storage (Redis alternative for development)
 class TaskManager:
     def __init__(self):
@@ -87,7 +90,13 @@ async def process_cv_generation_background(task_id: str, cv_service, form_data,
         # Step 1: Form processing (if provided)
         if form_data:
             task_manager.update_task_progress(task_id, 30, "generating_cv")
-            result = await cv_service.generate_from_form(form_data)
+            # PDFs go to the artifact store; the task result only keeps their links
+            # Gemini calls queue behind interactive requests
+            with stage_trace() as trace, llm_priority(PRIORITY_BACKGROUND):
+                result = await cv_service.generate_from_form(form_data, delivery="url")
+            task_manager.tasks[task_id]["stage_timings_ms"] = {
+                stage: round(wall_ms, 1) for stage, wall_ms in trace.items()
+            }
         else:
             task_manager.update_task_progress(task_id, 30, "updating_cv")
             # This would be for file upload case
@@ -0,0 +1,294 @@
+"""
+Direct PDF Renderer
+Draws simple single-column documents straight to PDF with pydyf, skipping HTML layout
+"""
+
+import io
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Advance widths (1/1000 em) of the standard PDF Times fonts for WinAnsi
+# codes 32-255, from Adobe's Core 14 AFM metrics
+TIMES_ROMAN_WIDTHS = (
+    250, 333, 408, 500, 500, 833, 778, 180, 333, 333, 500, 564, 250, 333, 250, 278,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 278, 278, 564, 564, 564, 444,
+    921, 722, 667, 667, 722, 611, 556, 722, 722, 333, 389, 722, 611, 889, 722, 722,
+    556, 722, 667, 556, 611, 722, 722, 944, 722, 722, 611, 333, 278, 333, 469, 500,
+    333, 444, 500, 444, 500, 444, 333, 500, 500, 278, 278, 500, 278, 778, 500, 500,
+    500, 500, 333, 389, 278, 500, 500, 722, 500, 500, 444, 480, 200, 480, 541, 350,
+    500, 350, 333, 500, 444, 1000, 500, 500, 333, 1000, 556, 333, 889, 350, 611, 350,
+    350, 333, 333, 444, 444, 350, 500, 1000, 333, 980, 389, 333, 722, 350, 444, 722,
+    250, 333, 500, 500, 500, 500, 200, 500, 333, 760, 276, 500, 564, 333, 760, 333,
+    400, 564, 300, 300, 333, 500, 453, 250, 333, 300, 310, 500, 750, 750, 750, 444,
+    722, 722, 722, 722, 722, 722, 889, 667, 611, 611, 611, 611, 333, 333, 333, 333,
+    722, 722, 722, 722, 722, 722, 722, 564, 722, 722, 722, 722, 722, 722, 556, 500,
+    444, 444, 444, 444, 444, 444, 667, 444, 444, 444, 444, 444, 278, 278, 278, 278,
+    500, 500, 500, 500, 500, 500, 500, 564, 500, 500, 500, 500, 500, 500, 500, 500,
+)
+TIMES_BOLD_WIDTHS = (
+    250, 333, 555, 500, 500, 1000, 833, 278, 333, 333, 500, 570, 250, 333, 250, 278,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 333, 333, 570, 570, 570, 500,
+    930, 722, 667, 722, 722, 667, 611, 778, 778, 389, 500, 778, 667, 944, 722, 778,
+    611, 778, 722, 556, 667, 722, 722, 1000, 722, 722, 667, 333, 278, 333, 581, 500,
+    333, 500, 556, 444, 556, 444, 333, 500, 556, 278, 333, 556, 278, 833, 556, 500,
+    556, 556, 444, 389, 333, 556, 500, 722, 500, 500, 444, 394, 220, 394, 520, 350,
+    500, 350, 333, 500, 500, 1000, 500, 500, 333, 1000, 556, 333, 1000, 350, 667, 350,
+    350, 333, 333, 500, 500, 350, 500, 1000, 333, 1000, 389, 333, 722, 350, 444, 722,
+    250, 333, 500, 500, 500, 500, 220, 500, 333, 747, 300, 500, 570, 333, 747, 333,
+    400, 570, 300, 300, 333, 556, 540, 250, 333, 300, 330, 500, 750, 750, 750, 500,
+    722, 722, 722, 722, 722, 722, 1000, 722, 667, 667, 667, 667, 389, 389, 389, 389,
+    722, 722, 778, 778, 778, 778, 778, 570, 778, 722, 722, 722, 722, 722, 611, 556,
+    500, 500, 500, 500, 500, 500, 722, 444, 444, 444, 444, 444, 278, 278, 278, 278,
+    500, 556, 500, 500, 500, 500, 500, 570, 500, 556, 556, 556, 556, 500, 556, 500,
+)
+
+FONTS = {
+    "regular": ("Times-Roman", TIMES_ROMAN_WIDTHS),
+    "bold": ("Times-Bold", TIMES_BOLD_WIDTHS),
+}
+
+# Times New Roman vertical metrics (em), used to place baselines in line boxes
+# the way the HTML template's layout does
+ASCENT = 0.891
+DESCENT = 0.216
+
+PX = 0.75  # CSS px in PDF points
+MM = 72 / 25.4
+PAGE_WIDTH = 210 * MM
+PAGE_HEIGHT = 297 * MM
+
+
+class UnsupportedContent(Exception):
+    """Raised when content needs the full HTML renderer (rich markup, non-Latin text, overflow)"""
+
+
+def _encode(text: str) -> bytes:
+    try:
+        return text.encode("cp1252")
+    except UnicodeEncodeError:
+        raise UnsupportedContent("Text outside the WinAnsi character set")
+
+
+def text_width(text: str, size: float, font: str = "regular") -> float:
+    """Width of a single line of text in points"""
+    widths = FONTS[font][1]
+    return sum(widths[code - 32] if code >= 32 else 0 for code in _encode(text)) * size / 1000
+
+
+class _ParagraphParser(HTMLParser):
+    """Collect the plain-text paragraphs of a letter body; reject any other markup"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs: List[str] = []
+        self._current: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "p":
+            raise UnsupportedContent(f"<{tag}> in letter body")
+        self._flush()
+
+    def handle_endtag(self, tag):
+        if tag != "p":
+            raise UnsupportedContent(f"</{tag}> in letter body")
+        self._flush()
+
+    def handle_data(self, data):
+        self._current.append(data)
+
+    def _flush(self):
+        text = " ".join("".join(self._current).split())
+        if text:
+            self.paragraphs.append(text)
+        self._current = []
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def letter_paragraphs(body_html: str) -> List[str]:
+    """Split an HTML letter body into whitespace-collapsed paragraphs"""
+    parser = _ParagraphParser()
+    parser.feed(body_html or "")
+    parser.close()
+    return parser.paragraphs
+
+
+class _Page:
+    """Single A4 page laid out top-down, in points from the top-left corner"""
+
+    def __init__(self, padding: float):
+        self.left = padding
+        self.right = PAGE_WIDTH - padding
+        self.bottom = PAGE_HEIGHT - padding
+        self.y = padding
+        self.lines: List[Tuple[str, float, float, float, bytes, float]] = []
+
+    @property
+    def width(self) -> float:
+        return self.right - self.left
+
+    def line(self, text: str, size: float, line_height: float, font: str = "regular",
+             align: str = "left", word_spacing: float = 0.0, width: Optional[float] = None):
+        """Place one line box and advance the cursor past it"""
+        if width is None:
+            width = text_width(text, size, font)
+        x = self.right - width if align == "right" else self.left
+
+        # Half-leading above the font's content area, as in CSS inline layout
+        baseline = self.y + (line_height * size - (ASCENT + DESCENT) * size) / 2 + ASCENT * size
+        self.lines.append((font, size, x, baseline, _encode(text), word_spacing))
+        self.y += line_height * size
+        if self.y > self.bottom:
+            raise UnsupportedContent("Content does not fit on one page")
+
+    def paragraph(self, text: str, size: float, line_height: float, font: str = "regular"):
+        """Place a justified paragraph, breaking lines greedily at spaces"""
+        space = text_width(" ", size, font)
+        words = text.split(" ")
+        current: List[str] = []
+        current_width = 0.0
+
+        for word in words:
+            word_width = text_width(word, size, font)
+            added = word_width if not current else space + word_width
+            if current and current_width + added > self.width:
+                # Stretch the spaces so the line fills the measure
+                extra = (self.width - current_width) / (len(current) - 1) if len(current) > 1 else 0.0
+                self.line(" ".join(current), size, line_height, font, word_spacing=extra,
+                          width=current_width)
+                current, current_width = [word], word_width
+            else:
+                current.append(word)
+                current_width += added
+
+        if current:
+            # The last line of a justified paragraph stays left-aligned
+            self.line(" ".join(current), size, line_height, font, width=current_width)
+
+    def space(self, points: float):
+        self.y += points
+
+
+def _write_pdf(pages: List[_Page], title: str) -> bytes:
+    import pydyf
+
+    document = pydyf.PDF()
+    fonts = pydyf.Dictionary()
+    for key, (base_font, _) in FONTS.items():
+        font = pydyf.Dictionary({
+            "Type": "/Font",
+            "Subtype": "/Type1",
+            "BaseFont": f"/{base_font}",
+            "Encoding": "/WinAnsiEncoding",
+        })
+        document.add_object(font)
+        fonts[key] = font.reference
+
+    for page in pages:
+        stream = pydyf.Stream(compress=True)
+        stream.begin_text()
+        current_font = current_spacing = None
+        for font, size, x, baseline, text, word_spacing in page.lines:
+            if (font, size) != current_font:
+                stream.set_font_size(font, size)
+                current_font = (font, size)
+            if word_spacing != current_spacing:
+                stream.stream.append(f"{word_spacing:.4f} Tw".encode())
+                current_spacing = word_spacing
+            stream.text_matrix(1, 0, 0, 1, round(x, 3), round(PAGE_HEIGHT - baseline, 3))
+            stream.show_text_string(text)
+        stream.end_text()
+        document.add_object(stream)
+
+        pdf_page = pydyf.Dictionary({
+            "Type": "/Page",
+            "Parent": document.pages.reference,
+            "MediaBox": pydyf.Array([0, 0, round(PAGE_WIDTH, 3), round(PAGE_HEIGHT, 3)]),
+            "Contents": stream.reference,
+            "Resources": pydyf.Dictionary({"Font": fonts}),
+        })
+        document.add_page(pdf_page)
+
+    document.info["Title"] = pydyf.String(title)
+    output = io.BytesIO()
+    document.write(output, compress=True)
+    return output.getvalue()
+
+
+def draw_classic_letter(data: Dict[str, Any]) -> bytes:
+    """
+    Draw ``letter_template_classic.html`` directly
+
+    Mirrors the template's box model: 25mm page padding, right-aligned
+    sender block and date, Times 12pt justified body at line-height 1.6,
+    with CSS margin collapsing between blocks worked out by hand.
+    """
+    details = data.get("personal_details") or {}
+    name = details.get("full_name") or ""
+    company = data.get("company_name")
+    paragraphs = letter_paragraphs(data.get("cover_letter_body") or "")
+
+    page = _Page(padding=25 * MM)
+
+    # Sender block (right aligned)
+    page.line(name, 14, 1.6, "bold", align="right")
+    page.space(8 * PX)
+    contact = [details.get("phone"), details.get("email"), details.get("location"), details.get("linkedin_url")]
+    contact = [value for value in contact if value]
+    for index, value in enumerate(contact):
+        page.line(value, 11, 1.4, align="right")
+        page.space(20 * PX if index == len(contact) - 1 else 3 * PX)
+
+    page.line(data.get("generation_date") or "", 11, 1.6, align="right")
+    page.space(30 * PX)
+
+    # Recipient
+    recipient = [company, details.get("location") or "Dublin, Ireland"]
+    recipient = [value for value in recipient if value]
+    for index, value in enumerate(recipient):
+        page.line(value, 11, 1.4)
+        page.space(20 * PX if index == len(recipient) - 1 else 2 * PX)
+
+    page.line(f"Dear {company} Hiring Team," if company else "Dear Hiring Manager,", 12, 1.6)
+    page.space(20 * PX)
+
+    # Body
+    for index, text in enumerate(paragraphs):
+        page.paragraph(text, 12, 1.6)
+        if index < len(paragraphs) - 1:
+            page.space(16 * PX)
+    page.space(30 * PX)
+
+    # Closing
+    page.line("Yours sincerely,", 12, 1.6)
+    page.space(20 * PX)
+    page.line(name, 12, 1.6)
+
+    return _write_pdf([page], f"{name} - Cover Letter")
+
+
+# Templates that can be drawn without HTML layout
+DIRECT_TEMPLATES: Dict[str, Callable[[Dict[str, Any]], bytes]] = {
+    "letter_template_classic.html": draw_classic_letter,
+}
+
+
+def render_direct_pdf(template_name: str, template_data: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Draw a supported template straight to PDF
+
+    CPU-bound, so callers on the event loop dispatch it through
+    ``render_pool.run`` rather than calling it inline.
+
+    Returns None when the template or its content needs the full HTML
+    renderer, so the caller can fall back to WeasyPrint.
+    """
+    draw = DIRECT_TEMPLATES.get(template_name)
+    if draw is None:
+        return None
+    try:
+        return draw(template_data)
+    except UnsupportedContent:
+        return None
@@ -19,7 +19,7 @@ try:
     from weasyprint import HTML, CSS
     from weasyprint.text.fonts import FontConfiguration
     HAS_WEASYPRINT = True
-except ImportError:
+except (ImportError, OSError):
     HAS_WEASYPRINT = False
 
 # For DOCX generation
@@ -36,10 +36,13 @@ except ImportError:
 # For HTML templating
 try:
     from jinja2 import Environment, FileSystemLoader, Template
+    from app.services.template_env import export_jinja_env
     HAS_JINJA2 = True
 except ImportError:
     HAS_JINJA2 = False
 
+from app.services.render_pool import render_pool, render_optimized_pdf
+
 logger = logging.getLogger(__name__)
 
 class ExportFormat(Enum):
@@ -55,6 +58,14 @@ class ExportQuality(Enum):
     HIGH = "high"
     PRINT = "print"
 
+# WeasyPrint image downsampling target and JPEG quality per export quality
+QUALITY_RENDER_OPTIONS = {
+    ExportQuality.DRAFT: {"dpi": 96, "jpeg_quality": 60},
+    ExportQuality.STANDARD: {"dpi": 150, "jpeg_quality": 80},
+    ExportQuality.HIGH: {"dpi": 300, "jpeg_quality": 90},
+    ExportQuality.PRINT: {"dpi": 600, "jpeg_quality": 95},
+}
+
 @dataclass
 class ExportSettings:
     format: ExportFormat
@@ -92,14 +103,15 @@ class ExportResult:
 
 class PDFExporter:
     """
-    PDF export using WeasyPrint
+    PDF export using WeasyPrint (rendered in the shared render pool)
     """
     
     def __init__(self):
-        self.font_config = FontConfiguration() if HAS_WEASYPRINT else None
+        # Generated CSS per distinct settings; parsed copies are cached in the render workers
+        self._css_cache: Dict[tuple, str] = {}
     
-    def export(self, cv_data: Dict[str, Any], template_html: str, 
-              settings: ExportSettings) -> ExportResult:
+    async def export(self, cv_data: Dict[str, Any], template_html: str, 
+                     settings: ExportSettings) -> ExportResult:
         """Export CV to PDF format"""
         
         if not HAS_WEASYPRINT:
@@ -112,18 +124,29 @@ class PDFExporter:
             start_time = datetime.now()
             
             # Generate CSS based on settings
-            css_content = self._generate_pdf_css(settings)
-            
-            # Create HTML object
-            html_doc = HTML(string=template_html)
-            css_doc = CSS(string=css_content, font_config=self.font_config)
-            
-            # Generate PDF
-            pdf_buffer = io.BytesIO()
-            html_doc.write_pdf(pdf_buffer, stylesheets=[css_doc], font_config=self.font_config)
+            css_content = self._get_pdf_css(settings)
             
-            pdf_data = pdf_buffer.getvalue()
-            pdf_buffer.close()
+            if settings.quality == ExportQuality.DRAFT:
+                # Preview pipeline: system fonts, no images or watermark, first page only
+                pdf_data = await render_pool.render_draft_pdf(template_html, [css_content])
+                compression = {"enabled": False, "pipeline": "draft"}
+            else:
+                # Generate and post-process the PDF in a worker process
+                render_options, recompress_level = self._get_render_options(settings)
+                rendered = await render_pool.run(
+                    render_optimized_pdf, template_html, [css_content], render_options, recompress_level
+                )
+                pdf_data = rendered["pdf"]
+                compression = {
+                    "enabled": settings.compress,
+                    "pipeline": "full",
+                    "font_subsetting": not render_options.get("full_fonts", False),
+                    "image_dpi": render_options.get("dpi"),
+                    "jpeg_quality": render_options.get("jpeg_quality"),
+                    "rendered_size_bytes": rendered["rendered_bytes"],
+                    "saved_bytes": rendered["rendered_bytes"] - len(pdf_data),
+                    "postprocess_time_ms": rendered["postprocess_ms"]
+                }
             
             generation_time = int((datetime.now() - start_time).total_seconds() * 1000)
             
@@ -141,7 +164,12 @@ class PDFExporter:
                 metadata={
                     "page_count": self._get_pdf_page_count(pdf_data),
                     "template": settings.template,
-                    "quality": settings.quality.value
+                    "quality": settings.quality.value,
+                    "compression": {
+                        **compression,
+                        "output_size_bytes": len(pdf_data),
+                        "processing_time_ms": generation_time
+                    }
                 }
             )
             
@@ -152,6 +180,34 @@ class PDFExporter:
                 error_message=f"PDF generation failed: {str(e)}"
             )
     
+    def _get_render_options(self, settings: ExportSettings) -> tuple:
+        """Map compress/quality settings to WeasyPrint options and a recompression level"""
+        if not settings.compress:
+            # Uncompressed streams with complete fonts (easier to inspect and edit)
+            return {"uncompressed_pdf": True, "full_fonts": True}, None
+        
+        # Compressed streams, subset fonts (WeasyPrint embeds each font file once)
+        # and images downsampled for the requested quality
+        options = {"optimize_images": True, "full_fonts": False}
+        options.update(QUALITY_RENDER_OPTIONS[settings.quality])
+        
+        # Print output keeps WeasyPrint's streams; other levels get a max-deflate pass
+        recompress_level = None if settings.quality == ExportQuality.PRINT else 9
+        return options, recompress_level
+    
+    def _get_pdf_css(self, settings: ExportSettings) -> str:
+        """Get the CSS for these settings, generating it once per distinct combination"""
+        key = (
+            settings.template, settings.quality, settings.page_size,
+            tuple(sorted(settings.margins.items())), settings.font_family,
+            settings.font_size, settings.line_spacing, settings.watermark
+        )
+        css = self._css_cache.get(key)
+        if css is None:
+            css = self._generate_pdf_css(settings)
+            self._css_cache[key] = css
+        return css
+    
     def _generate_pdf_css(self, settings: ExportSettings) -> str:
         """Generate CSS for PDF styling"""
         
@@ -230,8 +286,8 @@ class PDFExporter:
             }
             """
         
-        # Add watermark if specified
-        if settings.watermark:
+        # Add watermark if specified (draft previews skip page backgrounds)
+        if settings.watermark and settings.quality != ExportQuality.DRAFT:
             css += f"""
             @page {{
                 background-image: url("data:image/svg+xml;charset=utf-8,%3Csvg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 400 200'%3E%3Ctext x='50%25' y='50%25' text-anchor='middle' font-size='40' fill='%23f0f0f0' opacity='0.3' transform='rotate(-45 200 100)'%3E{settings.watermark}%3C/text%3E%3C/svg%3E");
@@ -843,12 +899,10 @@ class ExportService:
             ExportFormat.JSON: JSONExporter()
         }
         
-        # Template loader
+        # Template loader: the shared templates, without autoescaping for export templates
         self.template_loader = None
         if HAS_JINJA2:
-            template_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
-            if os.path.exists(template_dir):
-                self.template_loader = Environment(loader=FileSystemLoader(template_dir))
+            self.template_loader = export_jinja_env
     
     async def export_cv(self, cv_data: Dict[str, Any], settings: ExportSettings) -> ExportResult:
         """Export CV in the specified format"""
@@ -872,8 +926,11 @@ class ExportService:
                         error_message=f"Failed to load template: {settings.template}"
                     )
             
-            # Perform export
-            result = exporter.export(cv_data, template_html, settings)
+            # Perform export (PDF rendering is offloaded to the render pool)
+            if settings.format == ExportFormat.PDF:
+                result = await exporter.export(cv_data, template_html, settings)
+            else:
+                result = exporter.export(cv_data, template_html, settings)
             
             # Add common metadata
             if result.success and result.metadata:
@@ -0,0 +1,119 @@
+"""
+CV Fragment Renderer
+Renders cv_template_enhanced.html section by section, caching each fragment by a digest of the data it uses
+"""
+
+import hashlib
+import logging
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from jinja2 import Environment, Template
+from markupsafe import Markup
+
+from app.core.config import settings
+from app.services.render_cache import RenderCache
+
+logger = logging.getLogger(__name__)
+
+# Section name -> (fragment template, template variables the fragment reads)
+CV_SECTIONS = {
+    "header": ("cv_sections/header.html", ["personal_details"]),
+    "summary": ("cv_sections/summary.html", ["professional_summary"]),
+    "key_achievements": ("cv_sections/key_achievements.html", ["key_achievements"]),
+    "skills": ("cv_sections/skills.html", ["skills"]),
+    "education": ("cv_sections/education.html", ["education"]),
+}
+EXPERIENCE_TEMPLATE = "cv_sections/experience.html"
+EXPERIENCE_ENTRY_TEMPLATE = "cv_sections/experience_entry.html"
+
+
+class CVFragmentRenderer:
+    """
+    Fragment-cached renderer for the section-based CV template
+
+    Each section (and each experience entry) is keyed by a digest of only
+    the data it depends on, so editing one achievement re-executes the Jinja
+    for that entry alone; everything else is served from the fragment cache.
+    The digest also covers the fragment template's source, so a template
+    reloaded after an edit (``auto_reload`` in DEBUG) never serves old HTML.
+    """
+
+    def __init__(self, jinja_env: Environment, cache: RenderCache):
+        self.jinja_env = jinja_env
+        self.cache = cache
+        # Source hash per loaded template; a reload yields a new Template object
+        self._versions: "weakref.WeakKeyDictionary[Template, str]" = weakref.WeakKeyDictionary()
+
+    def render_sections(self, template_data: Dict[str, Any]) -> Dict[str, Tuple[str, Markup]]:
+        """Render every CV section, returning ``{section: (digest, html)}``"""
+        sections = {}
+        for name, (template_name, variables) in CV_SECTIONS.items():
+            context = {variable: template_data.get(variable) for variable in variables}
+            sections[name] = self._render_fragment(template_name, context)
+
+        sections["experience"] = self._render_experience(template_data.get("work_experience") or [])
+        return sections
+
+    def render(self, template_name: str, template_data: Dict[str, Any],
+               sections: Optional[Dict[str, Tuple[str, Markup]]] = None,
+               mark_sections: bool = False) -> str:
+        """
+        Render the full CV document from cached section fragments
+
+        With ``mark_sections`` each section is wrapped in a layout-neutral
+        ``<div data-section="...">`` so a browser preview can swap single
+        sections in place.
+        """
+        if sections is None:
+            sections = self.render_sections(template_data)
+
+        section_html = {}
+        for name, (_, html) in sections.items():
+            if mark_sections:
+                html = Markup('<div data-section="{}" style="display: contents">').format(name) + html + Markup("</div>")
+            section_html[name] = html
+
+        return self.jinja_env.get_template(template_name).render(**template_data, sections=section_html)
+
+    def _template(self, template_name: str) -> Tuple[Template, str]:
+        """Get a fragment template and a name that changes whenever its source does"""
+        template = self.jinja_env.get_template(template_name)
+        version = self._versions.get(template)
+        if version is None:
+            source, _, _ = self.jinja_env.loader.get_source(self.jinja_env, template_name)
+            version = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+            self._versions[template] = version
+        return template, f"{template_name}@{version}"
+
+    def _render_fragment(self, template_name: str, context: Dict[str, Any]) -> Tuple[str, Markup]:
+        template, versioned_name = self._template(template_name)
+        digest = self.cache.make_key(versioned_name, None, context, [])
+        cached = self.cache.get(digest)
+        if cached is not None:
+            return digest, Markup(cached.decode("utf-8"))
+
+        html = template.render(**context)
+        self.cache.put(digest, html.encode("utf-8"))
+        return digest, Markup(html)
+
+    def _render_experience(self, work_experience: List[Dict[str, Any]]) -> Tuple[str, Markup]:
+        entries = [
+            self._render_fragment(EXPERIENCE_ENTRY_TEMPLATE, {"experience": experience})
+            for experience in work_experience
+        ]
+
+        # The section digest follows its entries, so it only changes when one of them (or the template) does
+        template, versioned_name = self._template(EXPERIENCE_TEMPLATE)
+        digest = self.cache.make_key(versioned_name, None, [entry_digest for entry_digest, _ in entries], [])
+        html = template.render(
+            work_experience=work_experience,
+            experience_entries=[entry_html for _, entry_html in entries]
+        )
+        return digest, Markup(html)
+
+
+# Shared fragment cache (memory only; fragments are cheap to rebuild)
+fragment_cache = RenderCache(
+    memory_budget_bytes=settings.FRAGMENT_CACHE_MEMORY_MB * 1024 * 1024
+)
@@ -0,0 +1,146 @@
+"""
+Gemini HTTP Client
+One long-lived, pooled HTTP/2 connection set to the Gemini API, shared by every LLM call
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (HTTP/2 support for httpx)
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com"
+
+
+class ConnectionMetrics:
+    """Counts requests against new TCP connections and TLS handshakes to show pool reuse"""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.connect_failures = 0
+        self.http_versions: Dict[str, int] = {}
+
+    async def trace(self, event_name: str, info: Dict[str, Any]):
+        """httpcore trace hook, called for every connection and request event"""
+        if event_name == "connection.connect_tcp.complete":
+            self.new_connections += 1
+        elif event_name == "connection.connect_tcp.failed":
+            self.connect_failures += 1
+        elif event_name == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    def record_response(self, response: httpx.Response):
+        self.requests += 1
+        self.http_versions[response.http_version] = self.http_versions.get(response.http_version, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        reused = max(0, self.requests - self.new_connections)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "tls_handshakes": self.tls_handshakes,
+            "connect_failures": self.connect_failures,
+            "reused_connections": reused,
+            "reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0,
+            "http_versions": dict(self.http_versions),
+        }
+
+
+class GeminiClient:
+    """
+    Lifespan-managed httpx client for the Gemini API
+
+    The client is created (and a connection pre-opened) at startup and
+    closed at shutdown, so generation requests reuse warm HTTP/2
+    connections instead of paying DNS, TCP and TLS setup on every call.
+    It is also created lazily on first use for scripts that skip the
+    app lifespan.
+    """
+
+    def __init__(self, base_url: str = GEMINI_BASE_URL):
+        self.base_url = base_url
+        self.http2 = settings.GEMINI_HTTP2 and HAS_H2
+        self.metrics = ConnectionMetrics()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    def _create_client(self) -> httpx.AsyncClient:
+        if settings.GEMINI_HTTP2 and not HAS_H2:
+            logger.warning("HTTP/2 requested for Gemini but h2 is not installed; using HTTP/1.1")
+
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=self.http2,
+            timeout=httpx.Timeout(settings.GEMINI_TIMEOUT, connect=settings.GEMINI_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.GEMINI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GEMINI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.GEMINI_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    async def start(self, preconnect: bool = True):
+        """Create the client and open the first connection before traffic arrives"""
+        client = self.client
+        if not preconnect:
+            return
+
+        try:
+            # Any response will do: this only pays for DNS, TCP and TLS up front
+            response = await client.head("/", extensions={"trace": self.metrics.trace})
+            # Counted like any request, so reuse reflects the connection it opened
+            self.metrics.record_response(response)
+            logger.info(f"Gemini connection ready ({response.http_version})")
+        except httpx.HTTPError as e:
+            logger.warning(f"Gemini pre-connect failed, connecting on first call: {type(e).__name__}: {e}")
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """POST through the shared pool, counting connection reuse"""
+        response = await self.client.post(url, extensions={"trace": self.metrics.trace}, **kwargs)
+        self.metrics.record_response(response)
+        return response
+
+    @asynccontextmanager
+    async def stream(self, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """POST through the shared pool and read the response body incrementally"""
+        async with self.client.stream("POST", url, extensions={"trace": self.metrics.trace}, **kwargs) as response:
+            self.metrics.record_response(response)
+            yield response
+
+    async def aclose(self):
+        """Close every pooled connection"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool configuration and connection reuse counters"""
+        return {
+            "http2": self.http2,
+            "max_connections": settings.GEMINI_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.GEMINI_MAX_KEEPALIVE_CONNECTIONS,
+            "keepalive_expiry_seconds": settings.GEMINI_KEEPALIVE_EXPIRY,
+            "open": self._client is not None and not self._client.is_closed,
+            **self.metrics.snapshot(),
+        }
+
+
+# Global Gemini client (started and closed by the app lifespan)
+gemini_client = GeminiClient()
@@ -3,8 +3,15 @@ Core CV generation service using Google Gemini AI
 """
 
 import json
+import copy
 import base64
-from typing import Dict, Any
+import asyncio
+import hashlib
+import logging
+import random
+import time
+import zipfile
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple, Union
 from datetime import datetime
 from io import BytesIO
 
@@ -17,14 +24,100 @@ try:
     from docx import Document
 except ImportError:
     Document = None
-from jinja2 import Environment, FileSystemLoader
 try:
     from weasyprint import HTML, CSS
-except ImportError:
+except (ImportError, OSError):
     HTML = None
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
 
 from app.core.config import settings
-from app.schemas.models import CVFormData, PDFResponse
+from app.schemas.models import ArtifactPDFResponse, CVFormData, PDFResponse
+from app.services.artifact_store import artifact_store
+from app.services.direct_renderer import DIRECT_TEMPLATES, render_direct_pdf
+from app.services.fragment_renderer import CVFragmentRenderer, fragment_cache
+from app.services.gemini_client import gemini_client
+from app.services.llm_cache import llm_cache
+from app.services.llm_limiter import LLMQueueFullError, estimate_tokens, llm_limiter
+from app.services.llm_retry import gemini_retry
+from app.services.page_fit import FIT_LEVELS, FIT_STYLESHEETS, estimate_fit_level
+from app.services.render_cache import render_cache
+from app.services.export_service import ExportQuality
+from app.services.render_pool import (
+    render_pool, render_html_to_pdf, RenderError, RenderQueueFullError, RenderTimeoutError, DRAFT_CSS
+)
+from app.services.stage_graph import Stage, StageGraph, stage_executor
+from app.services.template_env import jinja_env, precompile_templates, template_version
+
+logger = logging.getLogger(__name__)
+
+# Document templates
+CV_TEMPLATE = 'cv_template_enhanced.html'
+LETTER_THEME_TEMPLATES = {
+    'classic': 'letter_template_classic.html',
+    'modern': 'letter_template_modern.html', 
+    'academic': 'letter_template_academic.html'
+}
+
+# Throwaway document used to warm render workers at startup
+WARMUP_CV_DATA = {
+    "personal_details": {
+        "full_name": "Warmup Candidate",
+        "email": "warmup@example.com",
+        "phone": "+353 1 234 5678",
+        "location": "Dublin, Ireland"
+    },
+    "professional_summary": "Software engineer with 5 years of experience delivering reliable web services.",
+    "work_experience": [{
+        "job_title": "Software Engineer",
+        "company": "Example Ltd",
+        "start_date": "2020",
+        "end_date": "2024",
+        "achievements": ["Reduced page load time by 40% for 10,000 users"]
+    }],
+    "education": [{
+        "degree": "BSc Computer Science",
+        "institution": "Trinity College Dublin",
+        "start_date": "2016",
+        "end_date": "2020"
+    }],
+    "skills": {"technical": ["Python", "SQL"], "soft": ["Communication"]},
+    "company_name": "Example Ltd",
+    "job_title": "Software Engineer",
+    "cover_letter_body": "<p>My background aligns with this role.</p>"
+}
+
+# Custom CSS for A4 PDF generation
+PDF_PAGE_CSS = """
+    @page {
+        size: A4 portrait;
+        margin: 0;                 /* Sıfır margin - template'te padding kullanıyoruz */
+    }
+    
+    @media print {
+        body {
+            margin: 0;
+            padding: 0;
+            print-color-adjust: exact;
+            -webkit-print-color-adjust: exact;
+        }
+    }
+"""
+
+
+# Sampling settings for every Gemini call (part of the response cache key)
+GEMINI_GENERATION_CONFIG = {
+    "temperature": 0.3,
+    "topK": 1,
+    "topP": 1,
+    "maxOutputTokens": 4096,
+}
+
+# Backoff (seconds) for batch items resubmitted while the render queue is full
+BATCH_QUEUE_FULL_BASE_DELAY = 0.25
+BATCH_QUEUE_FULL_MAX_DELAY = 5.0
 
 
 class CVGeneratorService:
@@ -33,108 +126,277 @@ class CVGeneratorService:
     def __init__(self):
         self.gemini_api_key = settings.GEMINI_API_KEY
         self.gemini_url = f"https://generativelanguage.googleapis.com/v1beta/models/{settings.GEMINI_MODEL}:generateContent"
+        self.gemini_stream_url = f"https://generativelanguage.googleapis.com/v1beta/models/{settings.GEMINI_MODEL}:streamGenerateContent"
         
-        # Initialize Jinja2 environment
-        self.jinja_env = Environment(
-            loader=FileSystemLoader('app/templates'),
-            autoescape=True
-        )
+        # Shared Jinja2 environment (bytecode-cached, no auto-reload outside DEBUG)
+        self.jinja_env = jinja_env
+        
+        # Section-level fragment caching for the CV template
+        self.fragment_renderer = CVFragmentRenderer(self.jinja_env, fragment_cache)
     
-    async def generate_cv_only(self, form_data: CVFormData) -> dict:
+    async def generate_cv_only(self, form_data: CVFormData, use_cache: bool = True) -> dict:
         """Generate only CV content from form data"""
         try:
             # Create CV-only prompt
             cv_prompt = self._create_cv_only_prompt(form_data)
             
             # Get AI response for CV
-            ai_response = await self._call_gemini(cv_prompt)
+            ai_response = await self._call_gemini(cv_prompt, use_cache)
             
             # Parse CV response
             cv_data = self._parse_cv_only_response(ai_response)
             
             return cv_data
             
+        except LLMQueueFullError:
+            raise
         except Exception as e:
             raise Exception(f"CV generation failed: {str(e)}")
     
-    async def generate_cover_letter_only(self, cv_data: dict, job_description: str, company_name: str = "") -> dict:
+    async def generate_cover_letter_only(self, cv_data: dict, job_description: str, company_name: str = "",
+                                         use_cache: bool = True) -> dict:
         """Generate only cover letter using CV context"""
         try:
             # Create cover letter prompt with CV context
             cl_prompt = self._create_cover_letter_only_prompt(cv_data, job_description, company_name)
             
             # Get AI response for cover letter
-            ai_response = await self._call_gemini(cl_prompt)
+            ai_response = await self._call_gemini(cl_prompt, use_cache)
             
             # Parse cover letter response
             cl_data = self._parse_cover_letter_response(ai_response)
             
             return cl_data
             
+        except LLMQueueFullError:
+            raise
         except Exception as e:
             raise Exception(f"Cover letter generation failed: {str(e)}")
 
-    async def generate_from_form(self, form_data: CVFormData) -> PDFResponse:
-        """Generate CV from form data (Creator flow) - Two-step process"""
+    async def stream_cover_letter_only(self, cv_data: dict, job_description: str, company_name: str = "",
+                                       use_cache: bool = True) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate a cover letter, yielding (event, data) pairs as Gemini writes it
+        
+        Emits ``start`` straight away, a ``token`` per streamed chunk, then
+        either ``result`` with the parsed cover letter (the same dict as
+        ``generate_cover_letter_only``) or ``error``.
+        """
+        yield "start", {"model": settings.GEMINI_MODEL}
         try:
-            # Step 1: Generate CV content only
-            cv_data = await self.generate_cv_only(form_data)
-            
-            # Step 2: Generate cover letter using CV context
-            cover_letter_data = await self.generate_cover_letter_only(
-                cv_data, 
-                form_data.job_description or "",
-                cv_data.get('company_name', '')
-            )
-            
-            # Combine data
-            complete_data = {**cv_data, **cover_letter_data, "theme": form_data.theme or "classic"}
+            cl_prompt = self._create_cover_letter_only_prompt(cv_data, job_description, company_name)
             
-            # Generate PDFs with selected theme
-            cv_pdf, cover_letter_pdf = await self._generate_pdfs(complete_data, form_data.theme or "classic")
+            chunks = []
+            async for chunk in self._stream_gemini(cl_prompt, use_cache):
+                chunks.append(chunk)
+                yield "token", {"text": chunk}
             
-            return PDFResponse(
-                cv_pdf_base64=base64.b64encode(cv_pdf).decode(),
-                cover_letter_pdf_base64=base64.b64encode(cover_letter_pdf).decode(),
-                filename_cv=f"cv_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                filename_cover_letter=f"cover_letter_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                generation_timestamp=datetime.now(),
-                cv_data=complete_data
+            cl_data = await asyncio.to_thread(self._parse_cover_letter_response, "".join(chunks))
+        except Exception as e:
+            logger.warning(f"Streaming cover letter generation failed: {type(e).__name__}: {e}")
+            yield "error", {"detail": f"Cover letter generation failed: {str(e)}"}
+            return
+        
+        yield "result", cl_data
+    
+    def _form_pipeline(self, theme: str = "classic", delivery: str = None) -> StageGraph:
+        """
+        Creator flow: CV prompt -> Gemini -> parse, then the cover letter from the parsed CV
+        
+        The CV PDF only depends on the parsed CV, so it renders while the
+        cover letter is still being written by Gemini.
+        """
+        stages = [
+            Stage("cv_prompt", self._create_cv_only_prompt, ("form_data",)),
+            Stage("cv_response", self._call_gemini, ("cv_prompt", "use_cache"), executor="async"),
+            Stage("cv_data", self._parse_cv_only_response, ("cv_response",), executor="thread"),
+            Stage("cover_letter_prompt",
+                  lambda cv_data, job_description: self._create_cover_letter_only_prompt(
+                      cv_data, job_description, cv_data.get('company_name', '')
+                  ),
+                  ("cv_data", "job_description")),
+            Stage("cover_letter_response", self._call_gemini, ("cover_letter_prompt", "use_cache"), executor="async"),
+            Stage("cover_letter_data", self._parse_cover_letter_response, ("cover_letter_response",), executor="thread"),
+            Stage("complete_data",
+                  lambda cv_data, cover_letter_data: {**cv_data, **cover_letter_data, "theme": theme},
+                  ("cv_data", "cover_letter_data")),
+        ]
+        stages += self._pdf_stages("cv_data", "complete_data", theme)
+        stages += self._response_stages("complete_data", delivery)
+        return StageGraph("form", stages)
+    
+    def _upload_pipeline(self, theme: str = "classic", delivery: str = None) -> StageGraph:
+        """Updater flow: one update prompt -> Gemini -> parse, then both PDFs"""
+        stages = [
+            Stage("cv_prompt", self._create_update_prompt, ("cv_content", "job_description")),
+            Stage("cv_response", self._call_gemini, ("cv_prompt", "use_cache"), executor="async"),
+            Stage("cv_data",
+                  lambda cv_response: {**self._parse_ai_response(cv_response), "theme": theme},
+                  ("cv_response",), executor="thread"),
+        ]
+        stages += self._pdf_stages("cv_data", "cv_data", theme)
+        stages += self._response_stages("cv_data", delivery, cv_prefix="updated_cv")
+        return StageGraph("upload", stages)
+    
+    def _pdf_stages(self, cv_source: str, letter_source: str, theme: str = "classic",
+                    quality: ExportQuality = ExportQuality.STANDARD) -> List[Stage]:
+        """
+        Template data and PDF stages for the CV (from ``cv_source``) and cover letter (from ``letter_source``)
+        
+        Both documents render concurrently on separate workers, or in one
+        worker pass when ``PDF_BUNDLE_RENDER`` is on.
+        """
+        if HTML is None:
+            raise Exception("PDF generation library not available. Please install weasyprint")
+        
+        letter_template_name = LETTER_THEME_TEMPLATES.get(theme, LETTER_THEME_TEMPLATES['classic'])
+        stages = [Stage("template_data", self._prepare_template_data, (letter_source,), executor="thread")]
+        
+        if (settings.PDF_BUNDLE_RENDER and quality != ExportQuality.DRAFT
+                and not self._direct_renderable(letter_template_name, theme)):
+            # One worker pass for both documents: less CPU, no parallelism
+            stages.append(Stage("pdfs", lambda template_data: self._render_bundle(template_data, theme),
+                                ("template_data",), outputs=("cv_pdf", "cover_letter_pdf"), executor="async"))
+            return stages
+        
+        cv_template_data = "template_data"
+        if cv_source != letter_source:
+            cv_template_data = "cv_template_data"
+            stages.append(Stage("cv_template_data", self._prepare_template_data, (cv_source,), executor="thread"))
+        
+        stages += [
+            Stage("cv_pdf", lambda template_data: self._render_document(CV_TEMPLATE, template_data, quality=quality),
+                  (cv_template_data,), executor="async"),
+            Stage("cover_letter_pdf",
+                  lambda template_data: self._render_document(letter_template_name, template_data, theme, quality),
+                  ("template_data",), executor="async"),
+        ]
+        return stages
+    
+    def _response_stages(self, data_source: str, delivery: str = None, cv_prefix: str = "cv") -> List[Stage]:
+        """Final base64 (or artifact upload) stage, when the caller wants a JSON response model"""
+        if delivery is None:
+            return []
+        return [Stage(
+            "response",
+            lambda cv_pdf, cover_letter_pdf, cv_data: self._build_pdf_response(
+                cv_pdf, cover_letter_pdf, cv_data, cv_prefix=cv_prefix, delivery=delivery
+            ),
+            ("cv_pdf", "cover_letter_pdf", data_source), executor="thread"
+        )]
+    
+    async def _run_form_pipeline(self, form_data: CVFormData, delivery: str = None,
+                                 use_cache: bool = True) -> Dict[str, Any]:
+        theme = form_data.theme or "classic"
+        try:
+            return await stage_executor.run(
+                self._form_pipeline(theme, delivery),
+                {"form_data": form_data, "job_description": form_data.job_description or "", "use_cache": use_cache}
             )
-            
+        except (RenderError, LLMQueueFullError):
+            raise
         except Exception as e:
             raise Exception(f"CV generation failed: {str(e)}")
     
-    async def generate_from_upload(self, cv_content: str, job_description: str, theme: str = "classic") -> PDFResponse:
-        """Generate CV from uploaded file (Updater flow)"""
+    async def generate_documents_from_form(self, form_data: CVFormData,
+                                           use_cache: bool = True) -> Tuple[bytes, bytes, Dict[str, Any]]:
+        """Generate CV and cover letter PDFs from form data (Creator flow) - Two-step process"""
+        values = await self._run_form_pipeline(form_data, use_cache=use_cache)
+        return values["cv_pdf"], values["cover_letter_pdf"], values["complete_data"]
+    
+    async def generate_from_form(self, form_data: CVFormData, delivery: str = "inline",
+                                 use_cache: bool = True) -> Union[PDFResponse, ArtifactPDFResponse]:
+        """Generate CV from form data (Creator flow) as a base64 (or download URL) JSON response"""
+        values = await self._run_form_pipeline(form_data, delivery, use_cache)
+        return values["response"]
+    
+    async def prerender_other_themes(self, cv_data: Dict[str, Any], rendered_theme: str = "classic"):
+        """
+        Speculatively render the cover letter in the themes the user didn't pick
+        
+        Runs after the response has been sent, at low priority in the render
+        pool, storing results in the render cache so a theme switch is
+        served instantly. Remaining themes are skipped as soon as the pool
+        is under load.
+        """
+        if not (settings.SPECULATIVE_THEME_RENDER and settings.RENDER_CACHE_ENABLED) or HTML is None:
+            return
+        
         try:
-            # Create AI prompt for CV update
-            prompt = self._create_update_prompt(cv_content, job_description)
-            
-            # Get AI response
-            ai_response = await self._call_gemini(prompt)
-            
-            # Parse AI response
-            cv_data = self._parse_ai_response(ai_response)
-            
-            # Add theme to cv_data
-            cv_data["theme"] = theme
-            
-            # Generate PDFs
-            cv_pdf, cover_letter_pdf = await self._generate_pdfs(cv_data, theme)
-            
-            return PDFResponse(
-                cv_pdf_base64=base64.b64encode(cv_pdf).decode(),
-                cover_letter_pdf_base64=base64.b64encode(cover_letter_pdf).decode(),
-                filename_cv=f"updated_cv_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                filename_cover_letter=f"cover_letter_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                generation_timestamp=datetime.now(),
-                cv_data=cv_data
+            template_data = self._prepare_template_data(cv_data)
+            for theme, template_name in LETTER_THEME_TEMPLATES.items():
+                if theme == rendered_theme or self._direct_renderable(template_name, theme):
+                    continue
+                
+                cache_key = self._cache_key(template_name, template_data, theme)
+                if await render_cache.acontains(cache_key):
+                    continue
+                
+                html = self._render_html(template_name, template_data)
+                pdf = await render_pool.run_speculative(render_html_to_pdf, html, [PDF_PAGE_CSS])
+                if pdf is None:
+                    logger.info("Speculative theme renders cancelled: render pool under load")
+                    return
+                await render_cache.aput(cache_key, pdf)
+        except Exception as e:
+            logger.warning(f"Speculative theme render failed: {type(e).__name__}: {e}")
+    
+    async def _run_upload_pipeline(self, cv_content: str, job_description: str, theme: str = "classic",
+                                   delivery: str = None, use_cache: bool = True) -> Dict[str, Any]:
+        try:
+            return await stage_executor.run(
+                self._upload_pipeline(theme, delivery),
+                {"cv_content": cv_content, "job_description": job_description, "use_cache": use_cache}
             )
-            
+        except (RenderError, LLMQueueFullError):
+            raise
         except Exception as e:
             raise Exception(f"CV update failed: {str(e)}")
     
+    async def generate_documents_from_upload(self, cv_content: str, job_description: str, theme: str = "classic",
+                                             use_cache: bool = True) -> Tuple[bytes, bytes, Dict[str, Any]]:
+        """Generate updated CV and cover letter PDFs from an uploaded file (Updater flow)"""
+        values = await self._run_upload_pipeline(cv_content, job_description, theme, use_cache=use_cache)
+        return values["cv_pdf"], values["cover_letter_pdf"], values["cv_data"]
+    
+    async def generate_from_upload(self, cv_content: str, job_description: str, theme: str = "classic",
+                                   delivery: str = "inline",
+                                   use_cache: bool = True) -> Union[PDFResponse, ArtifactPDFResponse]:
+        """Generate CV from uploaded file (Updater flow) as a base64 (or download URL) JSON response"""
+        values = await self._run_upload_pipeline(cv_content, job_description, theme, delivery, use_cache)
+        return values["response"]
+    
+    def document_filenames(self, cv_prefix: str = "cv") -> Tuple[str, str]:
+        """Get timestamped download filenames for the CV and cover letter"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f"{cv_prefix}_{timestamp}.pdf", f"cover_letter_{timestamp}.pdf"
+    
+    def _build_pdf_response(self, cv_pdf: bytes, cover_letter_pdf: bytes, cv_data: Dict[str, Any],
+                            cv_prefix: str = "cv",
+                            delivery: str = "inline") -> Union[PDFResponse, ArtifactPDFResponse]:
+        """
+        Wrap generated PDFs in the JSON response model
+        
+        ``delivery="url"`` stores the PDFs in the artifact store and returns
+        signed download URLs instead of inline base64.
+        """
+        filename_cv, filename_cover_letter = self.document_filenames(cv_prefix)
+        if delivery == "url":
+            return ArtifactPDFResponse(
+                cv_pdf=artifact_store.publish(cv_pdf, filename_cv),
+                cover_letter_pdf=artifact_store.publish(cover_letter_pdf, filename_cover_letter),
+                generation_timestamp=datetime.now(),
+                cv_data=cv_data
+            )
+        return PDFResponse(
+            cv_pdf_base64=base64.b64encode(cv_pdf).decode(),
+            cover_letter_pdf_base64=base64.b64encode(cover_letter_pdf).decode(),
+            filename_cv=filename_cv,
+            filename_cover_letter=filename_cover_letter,
+            generation_timestamp=datetime.now(),
+            cv_data=cv_data
+        )
+    
     def extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
         """Extract text from PDF file"""
         if PdfReader is None:
@@ -163,9 +425,8 @@ class CVGeneratorService:
         except Exception as e:
             raise Exception(f"DOCX text extraction failed: {str(e)}")
     
-    async def _call_gemini(self, prompt: str) -> str:
-        """Make API call to Google Gemini"""
-        # Check if API key is properly configured
+    def _check_gemini_key(self):
+        """Fail fast with setup instructions when no API key is configured"""
         if not self.gemini_api_key or self.gemini_api_key == "your_gemini_api_key_here":
             raise Exception(
                 "Gemini API key not configured. Please:\n"
@@ -174,61 +435,165 @@ class CVGeneratorService:
                 "3. Set GEMINI_API_KEY in your .env file\n"
                 "4. Restart the backend server"
             )
-        
-        try:
-            headers = {
+    
+    def _gemini_request(self, prompt: str) -> Dict[str, Any]:
+        """Headers and JSON body for a Gemini generate (or stream) call"""
+        return {
+            "headers": {
                 "Content-Type": "application/json",
-            }
-            
-            data = {
+            },
+            "json": {
                 "contents": [{
                     "parts": [{
                         "text": prompt
                     }]
                 }],
-                "generationConfig": {
-                    "temperature": 0.3,
-                    "topK": 1,
-                    "topP": 1,
-                    "maxOutputTokens": 4096,
-                }
+                "generationConfig": GEMINI_GENERATION_CONFIG
             }
-            
-            async with httpx.AsyncClient(timeout=180.0) as client:
-                response = await client.post(
-                    f"{self.gemini_url}?key={self.gemini_api_key}",
-                    headers=headers,
-                    json=data
+        }
+    
+    async def _cached_gemini_response(self, prompt: str, use_cache: bool) -> Tuple[str, Optional[str]]:
+        """Get (cache key, cached text); the key is empty when the cache is off or bypassed"""
+        if not settings.LLM_CACHE_ENABLED:
+            return "", None
+        if not use_cache:
+            llm_cache.record_bypass()
+            return "", None
+        
+        cache_key = llm_cache.make_key(settings.GEMINI_MODEL, GEMINI_GENERATION_CONFIG, prompt)
+        return cache_key, await llm_cache.get(cache_key)
+    
+    def _gemini_token_estimate(self, prompt: str) -> int:
+        """Upper bound on a call's tokens, reserved from the rate budget until usage is known"""
+        return estimate_tokens(prompt) + GEMINI_GENERATION_CONFIG["maxOutputTokens"]
+    
+    def _check_gemini_status(self, response: httpx.Response):
+        """Turn Gemini error statuses into actionable messages (the body must already be read)"""
+        if response.status_code == 400:
+            error_detail = response.text
+            if "API_KEY_INVALID" in error_detail or "API key not valid" in error_detail:
+                raise Exception(
+                    "Invalid Gemini API key. Please:\n"
+                    "1. Check your API key at https://aistudio.google.com/app/apikey\n"
+                    "2. Ensure the key is correctly set in your .env file\n"
+                    "3. Restart the backend server"
                 )
+            else:
+                raise Exception(f"Gemini API request error: {error_detail}")
+        
+        response.raise_for_status()
+    
+    def _gemini_error(self, error: Exception) -> Exception:
+        """Wrap transport and unexpected errors the way callers expect"""
+        if isinstance(error, LLMQueueFullError):
+            return error
+        if isinstance(error, httpx.TimeoutException):
+            return Exception("Gemini API request timed out. Please try again.")
+        if isinstance(error, httpx.RequestError):
+            return Exception(f"Network error calling Gemini API: {str(error)}")
+        if "Gemini API" in str(error):
+            return error
+        return Exception(f"Gemini API call failed: {str(error)}")
+    
+    async def _gemini_attempt(self, prompt: str, timeout: float) -> Dict[str, Any]:
+        """One Gemini generateContent request within ``timeout`` seconds, returning the decoded response"""
+        queued_at = time.monotonic()
+        # Queue behind the process-wide concurrency and token-rate limits
+        async with llm_limiter.slot(self._gemini_token_estimate(prompt)) as permit:
+            # Time spent queueing comes out of this attempt's timeout
+            timeout = max(0.1, timeout - (time.monotonic() - queued_at))
+            # Shared pooled HTTP/2 client: no per-call DNS, TCP or TLS setup
+            response = await gemini_client.post(
+                f"{self.gemini_url}?key={self.gemini_api_key}",
+                timeout=httpx.Timeout(timeout, connect=min(timeout, settings.GEMINI_CONNECT_TIMEOUT)),
+                **self._gemini_request(prompt)
+            )
+            self._check_gemini_status(response)
+            result = response.json()
+            permit.used_tokens = result.get("usageMetadata", {}).get("totalTokenCount")
+        return result
+    
+    async def _call_gemini(self, prompt: str, use_cache: bool = True) -> str:
+        """
+        Make API call to Google Gemini
+        
+        Identical requests (same model, generation config and normalized
+        prompt) are answered from the LLM response cache unless
+        ``use_cache`` is False.
+        """
+        # Check if API key is properly configured
+        self._check_gemini_key()
+        
+        cache_key, cached = await self._cached_gemini_response(prompt, use_cache)
+        if cached is not None:
+            return cached
+        
+        try:
+            # Retried with backoff on throttling/server errors, hedged past p95 when enabled
+            result = await gemini_retry.call(lambda timeout: self._gemini_attempt(prompt, timeout))
+            
+            if "candidates" not in result or not result["candidates"]:
+                raise Exception("No response generated from Gemini API")
+            
+            candidate = result["candidates"][0]
+            text = candidate["content"]["parts"][0]["text"]
+            # Truncated or filtered answers are not worth replaying
+            if cache_key and candidate.get("finishReason", "STOP") == "STOP":
+                await llm_cache.put(cache_key, text, settings.GEMINI_MODEL)
+            return text
                 
-                if response.status_code == 400:
-                    error_detail = response.text
-                    if "API_KEY_INVALID" in error_detail or "API key not valid" in error_detail:
-                        raise Exception(
-                            "Invalid Gemini API key. Please:\n"
-                            "1. Check your API key at https://aistudio.google.com/app/apikey\n"
-                            "2. Ensure the key is correctly set in your .env file\n"
-                            "3. Restart the backend server"
-                        )
-                    else:
-                        raise Exception(f"Gemini API request error: {error_detail}")
-                
-                response.raise_for_status()
-                
-                result = response.json()
-                if "candidates" not in result or not result["candidates"]:
-                    raise Exception("No response generated from Gemini API")
-                
-                return result["candidates"][0]["content"]["parts"][0]["text"]
+        except Exception as e:
+            raise self._gemini_error(e)
+    
+    async def _stream_gemini(self, prompt: str, use_cache: bool = True) -> AsyncIterator[str]:
+        """
+        Stream Google Gemini output as text chunks as they are generated
+        
+        Uses the ``streamGenerateContent`` SSE endpoint. A cached response
+        is yielded as a single chunk; a completed stream is cached like a
+        regular call. Streams are not retried or hedged: forwarded tokens
+        cannot be taken back.
+        """
+        self._check_gemini_key()
+        
+        cache_key, cached = await self._cached_gemini_response(prompt, use_cache)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        finish_reason = None
+        try:
+            async with llm_limiter.slot(self._gemini_token_estimate(prompt)) as permit, gemini_client.stream(
+                f"{self.gemini_stream_url}?alt=sse&key={self.gemini_api_key}",
+                **self._gemini_request(prompt)
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                self._check_gemini_status(response)
                 
-        except httpx.TimeoutException:
-            raise Exception("Gemini API request timed out. Please try again.")
-        except httpx.RequestError as e:
-            raise Exception(f"Network error calling Gemini API: {str(e)}")
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    
+                    chunk = json.loads(line[len("data:"):])
+                    # Usage arrives with the last chunk
+                    permit.used_tokens = chunk.get("usageMetadata", {}).get("totalTokenCount", permit.used_tokens)
+                    candidates = chunk.get("candidates") or []
+                    if not candidates:
+                        continue
+                    finish_reason = candidates[0].get("finishReason", finish_reason)
+                    for part in candidates[0].get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            chunks.append(part["text"])
+                            yield part["text"]
         except Exception as e:
-            if "Gemini API" in str(e):
-                raise e
-            raise Exception(f"Gemini API call failed: {str(e)}")
+            raise self._gemini_error(e)
+        
+        if not chunks:
+            raise Exception("No response generated from Gemini API")
+        if cache_key and finish_reason in (None, "STOP"):
+            await llm_cache.put(cache_key, "".join(chunks), settings.GEMINI_MODEL)
     
     def _create_cv_only_prompt(self, form_data: CVFormData) -> str:
         """Create AI prompt for CV generation only"""
@@ -1531,72 +1896,359 @@ GENERAL SECTOR REQUIREMENTS:
         # Users should explicitly specify their work authorization status if needed
         return "I am authorized to work in Ireland and available to discuss my employment status during the interview process."
     
-    async def _generate_pdfs(self, cv_data: Dict[str, Any], theme: str = "classic") -> tuple[bytes, bytes]:
-        """Generate CV and cover letter PDFs"""
+    async def warmup(self):
+        """Compile templates and pre-start render workers with one document per theme"""
+        precompile_templates(self.jinja_env)
+        template_data = self._prepare_template_data(WARMUP_CV_DATA)
+        template_names = [CV_TEMPLATE] + list(LETTER_THEME_TEMPLATES.values())
+        warm_documents = [
+            (self._render_html(name, template_data), [PDF_PAGE_CSS])
+            for name in template_names
+        ]
+        await render_pool.warmup(warm_documents)
+    
+    def _prepare_template_data(self, cv_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the template context shared by the CV and cover letter templates"""
+        # Deep copy so highlighting never leaks back into the caller's cv_data
+        template_data = copy.deepcopy(cv_data)
+        
+        # Add current date for cover letter
+        template_data['generation_date'] = datetime.now().strftime("%B %d, %Y")
+        
+        # Process work experience to highlight metrics
+        if 'work_experience' in template_data:
+            for exp in template_data['work_experience']:
+                if 'achievements' in exp:
+                    # Highlight metrics in each achievement
+                    exp['achievements'] = [
+                        self._highlight_metrics_in_text(achievement) 
+                        for achievement in exp['achievements']
+                    ]
+        
+        # Extract key achievements for summary box
+        template_data['key_achievements'] = self._extract_key_achievements(
+            template_data.get('work_experience', [])
+        )
+        
+        return template_data
+    
+    def _render_html(self, template_name: str, template_data: Dict[str, Any]) -> str:
+        """Render a document template to HTML, reusing cached CV section fragments"""
+        if template_name == CV_TEMPLATE:
+            return self.fragment_renderer.render(template_name, template_data)
+        return self.jinja_env.get_template(template_name).render(**template_data)
+    
+    def _direct_renderable(self, template_name: str, theme: str = None) -> bool:
+        """Whether this theme is configured for the direct renderer and the template supports it"""
+        direct_themes = [name.strip() for name in settings.DIRECT_RENDER_THEMES.split(",") if name.strip()]
+        return theme in direct_themes and template_name in DIRECT_TEMPLATES
+    
+    def _cache_key(self, template_name: str, template_data: Dict[str, Any], theme: str = None,
+                   stylesheets: List[str] = None, sources: List[str] = None) -> str:
+        """
+        Render cache key for one template rendered with this data
+
+        ``sources`` are the templates whose source (with everything they
+        include) the output depends on, defaulting to ``template_name``. The
+        disk tier outlives deploys, so a template edit must change the key.
+        """
+        # The theme only selects the template, so keep it out of the data digest
+        key_data = {k: v for k, v in template_data.items() if k != 'theme'}
+        version = template_version(*(sources or [template_name]), env=self.jinja_env)
+        return render_cache.make_key(f"{template_name}@{version}", theme, key_data,
+                                     stylesheets or [PDF_PAGE_CSS])
+    
+    async def _render_bundle(self, template_data: Dict[str, Any], theme: str = "classic",
+                             combined: bool = False) -> List[bytes]:
+        """
+        Lay out the CV and cover letter together in one worker pass
+        
+        Both documents share the worker's fonts and parsed stylesheets.
+        Returns ``[cv_pdf, letter_pdf]``, or ``[bundle_pdf]`` with ``combined``.
+        """
+        letter_template_name = LETTER_THEME_TEMPLATES.get(theme, LETTER_THEME_TEMPLATES['classic'])
+        if combined:
+            cache_keys = [self._cache_key(f"bundle:{letter_template_name}", template_data, theme,
+                                          sources=[CV_TEMPLATE, letter_template_name])]
+        else:
+            # Same keys as single-document renders, so either path can serve the other
+            cache_keys = [
+                self._cache_key(CV_TEMPLATE, template_data),
+                self._cache_key(letter_template_name, template_data, theme)
+            ]
+        
+        if settings.RENDER_CACHE_ENABLED:
+            cached = [await render_cache.aget(key) for key in cache_keys]
+            if all(pdf is not None for pdf in cached):
+                return cached
+        
+        documents = [
+            (self._render_html(template_name, template_data), [PDF_PAGE_CSS])
+            for template_name in (CV_TEMPLATE, letter_template_name)
+        ]
+        pdfs = await render_pool.render_bundle(documents, combined)
+        
+        if settings.RENDER_CACHE_ENABLED:
+            for key, pdf in zip(cache_keys, pdfs):
+                await render_cache.aput(key, pdf)
+        return pdfs
+    
+    async def generate_bundle(self, cv_data: Dict[str, Any], theme: str = "classic",
+                              combined: bool = True) -> List[bytes]:
+        """Render the CV and cover letter in one pass, as one combined PDF or two split PDFs"""
         if HTML is None:
             raise Exception("PDF generation library not available. Please install weasyprint")
+        return await self._render_bundle(self._prepare_template_data(cv_data), theme, combined)
+    
+    async def _render_document(self, template_name: str, template_data: Dict[str, Any],
+                               theme: str = None,
+                               quality: ExportQuality = ExportQuality.STANDARD) -> bytes:
+        """Render one template to PDF, serving repeat requests from the render cache"""
+        draft = quality == ExportQuality.DRAFT
+        stylesheets = [PDF_PAGE_CSS, DRAFT_CSS] if draft else [PDF_PAGE_CSS]
+        
+        if not draft and self._direct_renderable(template_name, theme):
+            # Drawn without HTML layout in about a millisecond, so no cache needed; the
+            # pool still runs it so the drawing never blocks the event loop
+            pdf = await render_pool.run(render_direct_pdf, template_name, template_data)
+            if pdf is not None:
+                return pdf
+        
+        cache_key = None
+        if settings.RENDER_CACHE_ENABLED:
+            cache_key = self._cache_key(template_name, template_data, theme, stylesheets)
+            cached_pdf = await render_cache.aget(cache_key)
+            if cached_pdf is not None:
+                return cached_pdf
+        
+        html = self._render_html(template_name, template_data)
+        if draft:
+            pdf = await render_pool.render_draft_pdf(html, [PDF_PAGE_CSS])
+        else:
+            pdf = await render_pool.render_pdf(html, [PDF_PAGE_CSS])
+        
+        if cache_key:
+            await render_cache.aput(cache_key, pdf)
+        return pdf
+    
+    async def render_batch(self, documents: List[Dict[str, Any]], theme: str = "classic",
+                           document: str = "cv", concurrency: int = 1) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Render many CVs (and/or cover letters) across the render pool
+        
+        Yields ``{"index", "cv_pdf", "cover_letter_pdf", "error", "render_ms"}``
+        for each input in completion order, as soon as it finishes. At most
+        ``concurrency`` documents are in the pool at once so a large batch
+        never crowds interactive requests out of the render queue.
+        
+        A full render queue is backpressure, not a failed document: the item
+        backs off and is resubmitted for up to ``BATCH_RENDER_QUEUE_WAIT_SECONDS``.
+        A render timeout is retried once on a fresh worker. Only errors that
+        persist are reported per item.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def render(cv_data: Dict[str, Any]) -> Tuple[Optional[bytes], Optional[bytes]]:
+            if document == "both":
+                return await self._generate_pdfs(cv_data, theme)
+            pdf = await self._render_single(self._prepare_template_data(cv_data), theme, document)
+            return (None, pdf) if document == "cover_letter" else (pdf, None)
+        
+        async def render_one(index: int, cv_data: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                start = time.perf_counter()
+                result = {"index": index, "cv_pdf": None, "cover_letter_pdf": None, "error": None}
+                queue_full_attempts = 0
+                timeouts = 0
+                while True:
+                    try:
+                        result["cv_pdf"], result["cover_letter_pdf"] = await render(cv_data)
+                        break
+                    except RenderQueueFullError as e:
+                        # Interactive renders hold the pool: wait for room with jittered backoff
+                        delay = min(BATCH_QUEUE_FULL_MAX_DELAY, BATCH_QUEUE_FULL_BASE_DELAY * 2 ** queue_full_attempts)
+                        delay *= random.uniform(0.5, 1.0)
+                        if time.perf_counter() - start + delay > settings.BATCH_RENDER_QUEUE_WAIT_SECONDS:
+                            result["error"] = f"{type(e).__name__}: {e}"
+                            break
+                        queue_full_attempts += 1
+                        await asyncio.sleep(delay)
+                    except RenderTimeoutError as e:
+                        # The worker was replaced; a second timeout means the document itself is too slow
+                        timeouts += 1
+                        if timeouts > 1:
+                            result["error"] = f"{type(e).__name__}: {e}"
+                            break
+                    except Exception as e:
+                        result["error"] = f"{type(e).__name__}: {e}"
+                        break
+                result["render_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                return result
+        
+        tasks = [asyncio.ensure_future(render_one(index, cv_data)) for index, cv_data in enumerate(documents)]
         try:
-            # Load templates (use enhanced template for better formatting)
-            cv_template = self.jinja_env.get_template('cv_template_enhanced.html')
-            
-            # Select cover letter template based on theme
-            theme_templates = {
-                'classic': 'letter_template_classic.html',
-                'modern': 'letter_template_modern.html', 
-                'academic': 'letter_template_academic.html'
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # Client went away: stop rendering the rest of the batch
+            for task in tasks:
+                task.cancel()
+    
+    async def render_document(self, cv_data: Dict[str, Any], theme: str = "classic",
+                              document: str = "cv") -> bytes:
+        """Render only the CV or only the cover letter in the given theme (one render-pool slot)"""
+        if HTML is None:
+            raise Exception("PDF generation library not available. Please install weasyprint")
+        values = await stage_executor.run(StageGraph("document", [
+            Stage("template_data", self._prepare_template_data, ("cv_data",), executor="thread"),
+            Stage(f"{document}_pdf",
+                  lambda template_data: self._render_single(template_data, theme, document),
+                  ("template_data",), executor="async"),
+        ]), {"cv_data": cv_data})
+        return values[f"{document}_pdf"]
+    
+    async def fit_cv_to_pages(self, cv_data: Dict[str, Any], max_pages: int = 2) -> Dict[str, Any]:
+        """
+        Render the CV scaled down just enough to fit in ``max_pages`` pages
+        
+        The layout service's height estimate picks the first fit level to
+        try, then real layouts confirm it in one worker pass. Returns the
+        PDF, the font size / line spacing / margins chosen and how many
+        layouts it took. ``fitted`` is False when even the tightest level
+        overflows.
+        """
+        if HTML is None:
+            raise Exception("PDF generation library not available. Please install weasyprint")
+        
+        template_data = self._prepare_template_data(cv_data)
+        seed, estimate = estimate_fit_level(cv_data, max_pages)
+        html = self._render_html(CV_TEMPLATE, template_data)
+        
+        start = time.perf_counter()
+        result = await render_pool.render_fitted(html, [PDF_PAGE_CSS], FIT_STYLESHEETS, max_pages, seed)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"Fitted CV to {result['pages']}/{max_pages} pages at level {result['level']} "
+            f"(seed {seed}, {result['renders']} layouts, {elapsed_ms:.0f}ms)"
+        )
+        
+        return {
+            "pdf": result["pdf"],
+            "fitted": result["fitted"],
+            "pages": result["pages"],
+            "max_pages": max_pages,
+            "parameters": FIT_LEVELS[result["level"]].describe(),
+            "seed_level": seed,
+            "renders": result["renders"],
+            "estimate": estimate,
+        }
+    
+    def render_html_preview(self, cv_data: Dict[str, Any], theme: str = "classic", document: str = "cv",
+                            known_sections: Dict[str, str] = None) -> Dict[str, Any]:
+        """
+        Render the document as HTML (styles inlined) for a live browser preview
+        
+        The CV is built from cached section fragments and comes back with a
+        digest per section. When the client sends the digests it already
+        has in ``known_sections``, only the sections whose digest changed
+        are returned instead of the whole document.
+        """
+        template_data = self._prepare_template_data(cv_data)
+        if document == "cover_letter":
+            template_name = LETTER_THEME_TEMPLATES.get(theme, LETTER_THEME_TEMPLATES['classic'])
+            return {"document": document, "html": self._render_html(template_name, template_data)}
+        
+        sections = self.fragment_renderer.render_sections(template_data)
+        digests = {name: digest for name, (digest, _) in sections.items()}
+        if known_sections is not None:
+            return {
+                "document": document,
+                "sections": digests,
+                "changed": {
+                    name: str(html) for name, (digest, html) in sections.items()
+                    if known_sections.get(name) != digest
+                }
             }
-            
-            template_name = theme_templates.get(theme, 'letter_template_classic.html')
-            letter_template = self.jinja_env.get_template(template_name)
-            
-            # Add current date for cover letter
-            template_data = cv_data.copy()
-            template_data['generation_date'] = datetime.now().strftime("%B %d, %Y")
-            
-            # Process work experience to highlight metrics
-            if 'work_experience' in template_data:
-                for exp in template_data['work_experience']:
-                    if 'achievements' in exp:
-                        # Highlight metrics in each achievement
-                        exp['achievements'] = [
-                            self._highlight_metrics_in_text(achievement) 
-                            for achievement in exp['achievements']
-                        ]
-            
-            # Extract key achievements for summary box
-            template_data['key_achievements'] = self._extract_key_achievements(
-                template_data.get('work_experience', [])
+        
+        return {
+            "document": document,
+            "sections": digests,
+            "html": self.fragment_renderer.render(CV_TEMPLATE, template_data, sections, mark_sections=True)
+        }
+    
+    async def render_preview(self, cv_data: Dict[str, Any], theme: str = "classic",
+                             document: str = "cv") -> bytes:
+        """Render a draft-quality first page of the CV or cover letter for live preview"""
+        if HTML is None:
+            raise Exception("PDF generation library not available. Please install weasyprint")
+        
+        template_data = self._prepare_template_data(cv_data)
+        return await self._render_single(template_data, theme, document, ExportQuality.DRAFT)
+    
+    async def render_thumbnails(self, cv_data: Dict[str, Any], theme: str = "classic",
+                                document: str = "cv", all_pages: bool = False,
+                                dpi: int = 72, image_format: str = "png") -> Tuple[str, bytes]:
+        """
+        Rasterise the CV or cover letter into page thumbnails
+        
+        Returns the thumbnails' content hash and either the page 1 image or,
+        with ``all_pages``, a zip of every page. Thumbnails are cached by the
+        hash of the rendered PDF, so an unchanged document is never
+        rasterised twice.
+        """
+        if pypdfium2 is None:
+            raise Exception("Thumbnail rendering not available. Please install pypdfium2")
+        
+        template_data = self._prepare_template_data(cv_data)
+        pdf = await self._render_single(template_data, theme, document)
+        
+        digest = render_cache.make_key(
+            "thumbnail", None,
+            {"pdf": hashlib.sha256(pdf).hexdigest(), "all_pages": all_pages, "dpi": dpi, "format": image_format},
+            []
+        )
+        cached = await render_cache.aget(digest) if settings.RENDER_CACHE_ENABLED else None
+        if cached is not None:
+            return digest, cached
+        
+        images = await render_pool.rasterize(pdf, not all_pages, dpi, image_format)
+        if all_pages:
+            buffer = BytesIO()
+            # Images are already compressed, so store them as-is
+            with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+                for page_number, image in enumerate(images, start=1):
+                    archive.writestr(f"{document}_page_{page_number}.{image_format}", image)
+            content = buffer.getvalue()
+        else:
+            content = images[0]
+        
+        if settings.RENDER_CACHE_ENABLED:
+            await render_cache.aput(digest, content)
+        return digest, content
+    
+    async def _render_single(self, template_data: Dict[str, Any], theme: str = "classic",
+                             document: str = "cv",
+                             quality: ExportQuality = ExportQuality.STANDARD) -> bytes:
+        """Render just the CV or just the themed cover letter"""
+        if document == "cover_letter":
+            template_name = LETTER_THEME_TEMPLATES.get(theme, LETTER_THEME_TEMPLATES['classic'])
+            return await self._render_document(template_name, template_data, theme, quality)
+        return await self._render_document(CV_TEMPLATE, template_data, quality=quality)
+    
+    async def _generate_pdfs(self, cv_data: Dict[str, Any], theme: str = "classic",
+                             quality: ExportQuality = ExportQuality.STANDARD) -> tuple[bytes, bytes]:
+        """Generate CV and cover letter PDFs (DRAFT quality uses the fast preview pipeline)"""
+        if HTML is None:
+            raise Exception("PDF generation library not available. Please install weasyprint")
+        try:
+            values = await stage_executor.run(
+                StageGraph("pdfs", self._pdf_stages("cv_data", "cv_data", theme, quality)),
+                {"cv_data": cv_data}
             )
+            return values["cv_pdf"], values["cover_letter_pdf"]
             
-            # Render HTML
-            cv_html = cv_template.render(**template_data)
-            letter_html = letter_template.render(**template_data)
-            
-            # Generate PDFs with custom options for A4 format
-            from weasyprint import CSS
-            
-            # Custom CSS for PDF generation
-            pdf_css = CSS(string="""
-                @page {
-                    size: A4 portrait;
-                    margin: 0;                 /* Sıfır margin - template'te padding kullanıyoruz */
-                }
-                
-                @media print {
-                    body {
-                        margin: 0;
-                        padding: 0;
-                        print-color-adjust: exact;
-                        -webkit-print-color-adjust: exact;
-                    }
-                }
-            """)
-            
-            cv_pdf = HTML(string=cv_html).write_pdf(stylesheets=[pdf_css])
-            letter_pdf = HTML(string=letter_html).write_pdf(stylesheets=[pdf_css])
-            
-            return cv_pdf, letter_pdf
-            
+        except RenderError:
+            raise
         except Exception as e:
             # Log error without exposing sensitive data
             error_msg = f"PDF generation failed: {type(e).__name__}"
@@ -671,6 +671,23 @@ class ResponsiveLayoutService:
         
         return result
     
+    def estimate_content_height(self, cv_data: Dict[str, Any],
+                                page_constraints: PageConstraints = None) -> Tuple[float, float]:
+        """
+        Estimate the single-column content height of a CV
+
+        Returns ``(content_height_mm, page_content_height_mm)`` so callers can
+        tell roughly how many pages the content needs before rendering it.
+        """
+        if page_constraints is None:
+            page_constraints = self._get_format_constraints("pdf")
+        
+        sections = self.optimizer.analyzer.analyze_cv_sections(
+            cv_data, page_constraints, LayoutType.SINGLE_COLUMN
+        )
+        content_height = sum(section.preferred_height_mm for section in sections)
+        return content_height, page_constraints.content_height_mm
+    
     def _choose_optimal_layout_type(self, cv_data: Dict[str, Any], 
                                   experience_level: str, industry: str) -> LayoutType:
         """Choose optimal layout type based on content analysis"""
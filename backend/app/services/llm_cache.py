@@ -0,0 +1,294 @@
+"""
+LLM Response Cache
+Gemini responses keyed by model, generation config and normalized prompt, in an in-memory LRU backed by SQLite
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How often a store may trigger a purge of expired rows
+PURGE_INTERVAL_SECONDS = 300
+
+_TRAILING_SPACE = re.compile(r"[ \t]+\n")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache for generated text
+
+    Recent responses live in an in-process LRU bounded by a byte budget;
+    every stored response is also written to a size-capped SQLite database
+    shared by all workers and kept across restarts. Entries expire
+    ``ttl_seconds`` after they were generated, whichever tier they are read
+    from, and the least recently read rows are evicted first once the
+    database grows past ``db_budget_bytes``. Database reads and writes run
+    in a worker thread so a busy database never stalls the event loop.
+    """
+
+    def __init__(self, memory_budget_bytes: int, ttl_seconds: int,
+                 db_path: Optional[str] = None, db_budget_bytes: int = 0):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.db_budget_bytes = db_budget_bytes
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_bytes: Optional[int] = None
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+
+        # Counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Drop whitespace differences that don't change what the model is asked"""
+        text = prompt.replace("\r\n", "\n").strip()
+        text = _TRAILING_SPACE.sub("\n", text)
+        return _BLANK_LINES.sub("\n\n", text)
+
+    @classmethod
+    def make_key(cls, model: str, generation_config: Dict[str, Any], prompt: str) -> str:
+        """Build a stable hash for a generation request"""
+        payload = json.dumps(
+            {
+                "model": model,
+                "config": generation_config,
+                "prompt": cls.normalize_prompt(prompt),
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a live response by key"""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            text, created_at = entry
+            if now - created_at <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return text
+            self._drop_memory(key)
+            if not self._db_enabled():
+                self.expirations += 1
+
+        row = await asyncio.to_thread(self._read_db, key, now) if self._db_enabled() else None
+        if row is not None:
+            text, created_at = row
+            self.disk_hits += 1
+            self._store_memory(key, text, created_at)
+            return text
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, text: str, model: str = ""):
+        """Store a response under key in both tiers"""
+        now = time.time()
+        self.stores += 1
+        self._store_memory(key, text, now)
+        if self._db_enabled():
+            await asyncio.to_thread(self._write_db, key, text, model, now)
+
+    def record_bypass(self):
+        """Count a call that skipped the cache at the caller's request"""
+        self.bypassed += 1
+
+    def clear(self):
+        """Drop all memory and database entries"""
+        self._memory.clear()
+        self._memory_bytes = 0
+        db = self._connection()
+        if db is None:
+            return
+        try:
+            with self._lock:
+                db.execute("DELETE FROM llm_responses")
+            self._db_bytes = 0
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache clear failed: {e}")
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "db_bytes": self._db_bytes or 0,
+            "db_budget_bytes": self.db_budget_bytes if self._db_enabled() else 0,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def _store_memory(self, key: str, text: str, created_at: float):
+        size = len(text.encode("utf-8"))
+        if size > self.memory_budget_bytes:
+            return
+
+        self._drop_memory(key)
+        self._memory[key] = (text, created_at)
+        self._memory_bytes += size
+
+        # The database still holds evicted entries
+        while self._memory_bytes > self.memory_budget_bytes:
+            old_key, _ = next(iter(self._memory.items()))
+            self._drop_memory(old_key)
+            self.evictions += 1
+
+    def _drop_memory(self, key: str):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[0].encode("utf-8"))
+
+    def _db_enabled(self) -> bool:
+        return bool(self.db_path) and self.db_budget_bytes > 0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._db is not None or not self._db_enabled():
+            return self._db
+
+        # Reads and writes run in worker threads; only one of them may open the database
+        with self._lock:
+            if self._db is None and self._db_enabled():
+                self._db = self._open_db()
+        return self._db
+
+    def _open_db(self) -> Optional[sqlite3.Connection]:
+        try:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.db_path, timeout=5, isolation_level=None, check_same_thread=False)
+            # WAL lets every worker process read while one writes
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, model TEXT, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS llm_responses_accessed ON llm_responses (accessed_at)")
+            self._db_bytes = self._db_size(db)
+            return db
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"LLM cache database unavailable, using memory only: {e}")
+            self.db_budget_bytes = 0
+            return None
+
+    def _read_db(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        db = self._connection()
+        if db is None:
+            return None
+
+        try:
+            with self._lock:
+                row = db.execute(
+                    "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if now - row[1] > self.ttl_seconds:
+                    db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    self.expirations += 1
+                    return None
+                db.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0], row[1]
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+
+    def _write_db(self, key: str, text: str, model: str, now: float):
+        db = self._connection()
+        size = len(text.encode("utf-8"))
+        if db is None or size > self.db_budget_bytes:
+            return
+
+        try:
+            with self._lock:
+                db.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, response, model, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, text, model, size, now, now)
+                )
+
+                if now - self._last_purge > PURGE_INTERVAL_SECONDS:
+                    self._purge_expired(db, now)
+                # Other workers write to the same database, so measure it rather than keep a running total
+                self._db_bytes = self._db_size(db)
+                if self._db_bytes > self.db_budget_bytes:
+                    self._evict_db(db)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def _purge_expired(self, db: sqlite3.Connection, now: float):
+        self._last_purge = now
+        cursor = db.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        self.expirations += max(0, cursor.rowcount)
+
+    @staticmethod
+    def _db_size(db: sqlite3.Connection) -> int:
+        return db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+
+    def _evict_db(self, db: sqlite3.Connection):
+        """Delete least recently read rows until the database fits its budget"""
+        total = self._db_bytes
+        target = int(self.db_budget_bytes * 0.9)
+        victims = []
+        for key, size in db.execute("SELECT key, size FROM llm_responses ORDER BY accessed_at"):
+            if total <= target:
+                break
+            victims.append((key,))
+            total -= size
+
+        db.executemany("DELETE FROM llm_responses WHERE key = ?", victims)
+        self.evictions += len(victims)
+        self._db_bytes = total
+
+
+# Global LLM response cache instance
+llm_cache = LLMResponseCache(
+    memory_budget_bytes=settings.LLM_CACHE_MEMORY_MB * 1024 * 1024,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    db_path=settings.LLM_CACHE_DB_PATH,
+    db_budget_bytes=settings.LLM_CACHE_DB_MB * 1024 * 1024
+)
@@ -0,0 +1,264 @@
+"""
+LLM Limiter
+Process-wide concurrency and token-rate limits for Gemini calls, with a priority queue and backpressure
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Priority classes: lower values are admitted first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+# Retry-After hint sent with 503s when the queue is full
+LLM_RETRY_AFTER_SECONDS = 5
+
+# Priority of LLM calls made by the current request or task
+_current_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "llm_priority", default=PRIORITY_INTERACTIVE
+)
+
+
+class LLMLimiterError(Exception):
+    """Base error for LLM limiter failures"""
+
+
+class LLMQueueFullError(LLMLimiterError):
+    """Raised when too many LLM calls are already waiting"""
+
+
+@dataclass
+class LLMPermit:
+    """
+    A granted LLM call slot
+
+    ``reserved_tokens`` were taken from the token bucket on admission; set
+    ``used_tokens`` from the response's usage metadata so the difference is
+    refunded (or charged) on release.
+    """
+    priority: int
+    reserved_tokens: int
+    wait_ms: float
+    used_tokens: Optional[int] = None
+
+
+class LLMLimiter:
+    """
+    Admission control for outbound LLM calls
+
+    At most ``max_concurrency`` calls run at once, and a token bucket
+    refilled at ``tokens_per_minute`` caps throughput (0 disables the rate
+    cap). Waiting calls are admitted strictly by priority, then arrival
+    order, so interactive requests overtake queued background jobs. A call
+    arriving when the queue already holds ``max_queue_depth`` waiters (or
+    ``background_queue_depth`` for background calls, keeping headroom for
+    interactive traffic) is rejected with LLMQueueFullError.
+    """
+
+    def __init__(self, max_concurrency: int, tokens_per_minute: int, max_queue_depth: int,
+                 background_queue_depth: int, sample_size: int = 500):
+        self.max_concurrency = max(1, max_concurrency)
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queue_depth = max_queue_depth
+        self.background_queue_depth = min(background_queue_depth, max_queue_depth)
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+        self._active = 0
+        self._queue: List[Any] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        # Counters
+        self.admitted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.rejected = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.max_depth_seen = 0
+        self.wait_ms: Dict[str, Deque[float]] = {
+            name: deque(maxlen=sample_size) for name in PRIORITY_NAMES.values()
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, _, future in self._queue if not future.done())
+
+    def accepting(self, priority: int = PRIORITY_INTERACTIVE) -> bool:
+        """Check whether a call at ``priority`` would be queued rather than rejected"""
+        return self.queue_depth < self._depth_limit(priority)
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int, priority: Optional[int] = None) -> AsyncIterator[LLMPermit]:
+        """Wait for a call slot and enough token budget, then hold them for the block"""
+        permit = await self.acquire(estimated_tokens, priority)
+        try:
+            yield permit
+        finally:
+            self.release(permit)
+
+    async def acquire(self, estimated_tokens: int, priority: Optional[int] = None) -> LLMPermit:
+        """Wait for admission; the returned permit must be passed to ``release``"""
+        priority = _current_priority.get() if priority is None else priority
+        name = PRIORITY_NAMES.get(priority, "background")
+        tokens = self._clamp_tokens(estimated_tokens)
+        started = time.perf_counter()
+
+        if self.queue_depth == 0 and self._can_admit(tokens):
+            permit = self._admit(priority, tokens)
+            self.wait_ms[name].append(0.0)
+            return permit
+
+        if not self.accepting(priority):
+            self.rejected[name] += 1
+            raise LLMQueueFullError(
+                "AI generation is at capacity. Please try again shortly."
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), tokens, future))
+        self.max_depth_seen = max(self.max_depth_seen, self.queue_depth)
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted at the same moment we were cancelled: hand the slot back
+                self.release(future.result())
+            raise
+
+        permit = future.result()
+        permit.wait_ms = (time.perf_counter() - started) * 1000
+        self.wait_ms[name].append(permit.wait_ms)
+        return permit
+
+    def release(self, permit: LLMPermit):
+        """Free the permit's slot and settle its token reservation against actual usage"""
+        self._active -= 1
+        if self.tokens_per_minute > 0 and permit.used_tokens is not None:
+            self._refill()
+            self._tokens += permit.reserved_tokens - permit.used_tokens
+            self._tokens = min(self._tokens, float(self.tokens_per_minute))
+        self._dispatch()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, wait times and admission counters"""
+        waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, _, future in self._queue:
+            if not future.done():
+                waiting[PRIORITY_NAMES.get(priority, "background")] += 1
+
+        if self.tokens_per_minute > 0:
+            self._refill()
+
+        wait_ms = {}
+        for name, samples in self.wait_ms.items():
+            ordered = sorted(samples)
+            wait_ms[name] = {
+                "samples": len(ordered),
+                "p50_ms": round(ordered[len(ordered) // 2], 2) if ordered else 0.0,
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2) if ordered else 0.0,
+                "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+            }
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "queue_depth": sum(waiting.values()),
+            "queue_depth_by_priority": waiting,
+            "max_queue_depth": self.max_queue_depth,
+            "background_queue_depth": self.background_queue_depth,
+            "max_depth_seen": self.max_depth_seen,
+            "tokens_per_minute": self.tokens_per_minute,
+            "tokens_available": int(self._tokens) if self.tokens_per_minute > 0 else None,
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+            "wait_ms": wait_ms,
+        }
+
+    def _depth_limit(self, priority: int) -> int:
+        return self.max_queue_depth if priority <= PRIORITY_INTERACTIVE else self.background_queue_depth
+
+    def _clamp_tokens(self, tokens: int) -> int:
+        # A call bigger than the whole bucket would never be admitted
+        if self.tokens_per_minute > 0:
+            return max(0, min(tokens, self.tokens_per_minute))
+        return 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.tokens_per_minute),
+            self._tokens + (now - self._refilled_at) * self.tokens_per_minute / 60
+        )
+        self._refilled_at = now
+
+    def _can_admit(self, tokens: int) -> bool:
+        if self._active >= self.max_concurrency:
+            return False
+        if self.tokens_per_minute > 0:
+            self._refill()
+            return self._tokens >= tokens
+        return True
+
+    def _admit(self, priority: int, tokens: int) -> LLMPermit:
+        self._active += 1
+        self._tokens -= tokens
+        self.admitted[PRIORITY_NAMES.get(priority, "background")] += 1
+        return LLMPermit(priority=priority, reserved_tokens=tokens, wait_ms=0.0)
+
+    def _dispatch(self):
+        """Admit waiters in priority order while a slot and token budget are available"""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        while self._queue:
+            priority, _, tokens, future = self._queue[0]
+            if future.done():
+                heapq.heappop(self._queue)
+                continue
+            if not self._can_admit(tokens):
+                break
+            heapq.heappop(self._queue)
+            future.set_result(self._admit(priority, tokens))
+
+        # Head of the queue is short of tokens but a slot is free: retry once the bucket refills
+        if self._queue and self._active < self.max_concurrency and self.tokens_per_minute > 0:
+            shortfall = self._queue[0][2] - self._tokens
+            delay = max(0.01, shortfall * 60 / self.tokens_per_minute)
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+
+@contextmanager
+def llm_priority(priority: int) -> Iterator[None]:
+    """Run LLM calls made inside the block (and tasks it starts) at ``priority``"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for rate budgeting (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+# Global LLM limiter instance
+llm_limiter = LLMLimiter(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+    max_queue_depth=settings.LLM_MAX_QUEUE_DEPTH,
+    background_queue_depth=settings.LLM_BACKGROUND_QUEUE_DEPTH
+)
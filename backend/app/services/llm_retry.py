@@ -0,0 +1,264 @@
+"""
+LLM Retry Policy
+Budgeted retries with jittered exponential backoff, and optional p95-triggered hedged requests, for Gemini calls
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upstream statuses worth another attempt: overload, throttling and gateway errors
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Window over which the retry budget compares retries with requests
+BUDGET_WINDOW_SECONDS = 60
+
+# An attempt with less time than this before the call's deadline is not worth starting
+MIN_ATTEMPT_SECONDS = 5.0
+
+
+class RetryBudget:
+    """
+    Caps extra attempts (retries and hedges) to a share of recent traffic
+
+    Within a sliding window, extra attempts may not exceed ``min_per_window``
+    plus ``ratio`` times the number of calls, so a struggling upstream sees
+    at most ``1 + ratio`` times normal load instead of a retry storm.
+    """
+
+    def __init__(self, ratio: float, min_per_window: int, window_seconds: float = BUDGET_WINDOW_SECONDS):
+        self.ratio = ratio
+        self.min_per_window = min_per_window
+        self.window_seconds = window_seconds
+        self._calls: Deque[float] = deque()
+        self._extra: Deque[float] = deque()
+        self.exhausted = 0
+
+    def record_call(self):
+        self._calls.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        """Take one extra attempt from the budget, if any is left"""
+        now = time.monotonic()
+        for samples in (self._calls, self._extra):
+            while samples and now - samples[0] > self.window_seconds:
+                samples.popleft()
+
+        if len(self._extra) >= self.min_per_window + self.ratio * len(self._calls):
+            self.exhausted += 1
+            return False
+        self._extra.append(now)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "ratio": self.ratio,
+            "min_per_window": self.min_per_window,
+            "window_seconds": self.window_seconds,
+            "calls_in_window": len(self._calls),
+            "extra_attempts_in_window": len(self._extra),
+            "exhausted": self.exhausted,
+        }
+
+
+class LatencyTracker:
+    """Rolling latencies of successful attempts, used as the hedging trigger"""
+
+    def __init__(self, sample_size: int = 500, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=sample_size)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """The ``fraction`` latency in seconds, or None until enough samples exist"""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transport failures and throttling/server statuses are retried; request errors are not"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUSES
+    return isinstance(error, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError))
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    try:
+        return float(error.response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+class RetryPolicy:
+    """
+    Runs an attempt function with retries and, optionally, a hedged duplicate
+
+    Retryable failures back off exponentially with full jitter (a random
+    delay up to ``base_delay * 2**n``, capped at ``max_delay``) and honour
+    ``Retry-After`` when the server asks for a wait we are willing to make.
+    With hedging on, an attempt still running after the observed p95
+    latency gets a second, concurrent attempt and the first success wins;
+    the loser is cancelled. Retries and hedges both draw on one budget.
+
+    A call and all its attempts share one ``deadline`` (seconds). Each
+    attempt is passed the time left as its timeout, and no retry starts
+    with less than ``MIN_ATTEMPT_SECONDS`` to go, so an attempt that used
+    the full timeout is not retried and a call never holds its slot much
+    past the deadline.
+    """
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float, budget: RetryBudget,
+                 deadline: float, hedging: bool = False, hedge_min_delay: float = 1.0,
+                 latency: Optional[LatencyTracker] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.deadline = deadline
+        self.hedging = hedging
+        self.hedge_min_delay = hedge_min_delay
+        self.latency = latency or LatencyTracker()
+
+        # Counters
+        self.calls = 0
+        self.attempts = 0
+        self.retries: Dict[str, int] = {}
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+        self.deadline_exceeded = 0
+
+    async def call(self, attempt: Callable[[float], Awaitable[T]]) -> T:
+        """
+        Await ``attempt(timeout)`` until it succeeds, fails permanently, or the budget or deadline runs out
+
+        ``timeout`` is the number of seconds the attempt may take.
+        """
+        self.calls += 1
+        self.budget.record_call()
+        deadline = time.monotonic() + self.deadline
+
+        for number in range(self.max_attempts):
+            try:
+                return await self._attempt(attempt, deadline)
+            except Exception as e:
+                if not is_retryable(e) or number + 1 >= self.max_attempts:
+                    self.failures += 1
+                    raise
+
+                delay = self.backoff(number)
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    if retry_after > self.max_delay:
+                        self.failures += 1
+                        raise
+                    delay = max(delay, retry_after)
+
+                if deadline - time.monotonic() - delay < MIN_ATTEMPT_SECONDS:
+                    self.failures += 1
+                    self.deadline_exceeded += 1
+                    raise
+
+                if not self.budget.try_spend():
+                    self.failures += 1
+                    raise
+
+                reason = str(e.response.status_code) if isinstance(e, httpx.HTTPStatusError) else type(e).__name__
+                self.retries[reason] = self.retries.get(reason, 0) + 1
+                logger.info(f"Retrying Gemini call in {delay:.2f}s after {reason} (attempt {number + 2})")
+                await asyncio.sleep(delay)
+
+    def backoff(self, number: int) -> float:
+        """Full-jitter delay before retry ``number + 1``"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** number)))
+
+    def hedge_delay(self) -> Optional[float]:
+        """How long to wait before hedging, or None when hedging is off or unwarmed"""
+        if not self.hedging:
+            return None
+        p95 = self.latency.percentile(0.95)
+        return None if p95 is None else max(self.hedge_min_delay, p95)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get retry/hedge counters, budget usage and the current hedge trigger"""
+        p95 = self.latency.percentile(0.95)
+        return {
+            "max_attempts": self.max_attempts,
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": dict(self.retries),
+            "failures": self.failures,
+            "deadline_seconds": self.deadline,
+            "deadline_exceeded": self.deadline_exceeded,
+            "hedging": self.hedging,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "latency_p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            "budget": self.budget.get_stats(),
+        }
+
+    async def _timed(self, attempt: Callable[[float], Awaitable[T]], deadline: float) -> T:
+        self.attempts += 1
+        started = time.perf_counter()
+        result = await attempt(max(0.0, deadline - time.monotonic()))
+        self.latency.record(time.perf_counter() - started)
+        return result
+
+    async def _attempt(self, attempt: Callable[[float], Awaitable[T]], deadline: float) -> T:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._timed(attempt, deadline)
+
+        primary = asyncio.create_task(self._timed(attempt, deadline))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and deadline - time.monotonic() >= MIN_ATTEMPT_SECONDS and self.budget.try_spend():
+                self.hedges += 1
+                tasks.add(asyncio.create_task(self._timed(attempt, deadline)))
+
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The slower attempt (or both, if we were cancelled) is abandoned
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+
+# Global retry policy for Gemini calls
+gemini_retry = RetryPolicy(
+    max_attempts=settings.GEMINI_MAX_ATTEMPTS,
+    base_delay=settings.GEMINI_RETRY_BASE_DELAY,
+    max_delay=settings.GEMINI_RETRY_MAX_DELAY,
+    budget=RetryBudget(settings.GEMINI_RETRY_BUDGET_RATIO, settings.GEMINI_RETRY_BUDGET_MIN),
+    deadline=settings.GEMINI_RETRY_DEADLINE,
+    hedging=settings.GEMINI_HEDGING,
+    hedge_min_delay=settings.GEMINI_HEDGE_MIN_DELAY
+)
@@ -0,0 +1,145 @@
+"""
+CV Page Fitting
+Tightens the CV template's type and spacing in small steps so the document fits a target page count
+"""
+
+import logging
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Tuple
+
+from app.services.layout_service import PageConstraints, layout_service
+
+logger = logging.getLogger(__name__)
+
+PX_TO_MM = 25.4 / 96
+
+# cv_template_enhanced.html sizing: selector -> (font-size px, line-height, vertical spacing px, horizontal page margin px)
+CV_TEMPLATE_METRICS = {
+    "body": (15, 1.4, {}, {}),
+    ".header-holder": (None, None, {"padding-top": 20, "padding-bottom": 10, "margin-bottom": 4},
+                       {"padding-left": 20, "padding-right": 20}),
+    ".header-name": (28, 1.5, {"margin-bottom": 4}, {}),
+    ".header-title": (20, 1.35, {"margin-bottom": 8}, {}),
+    ".contact-info-container": (14, 1.35, {}, {}),
+    ".resume-content": (None, None, {"padding-bottom": 20}, {"padding-left": 20, "padding-right": 20}),
+    ".section": (None, None, {"margin-bottom": 20}, {}),
+    ".section-name": (20, 1.5, {"padding-bottom": 4, "margin-bottom": 10}, {}),
+    ".summary-text": (15, 1.5, {}, {}),
+    ".section-item": (None, None, {"margin-bottom": 16}, {}),
+    ".item-header": (None, None, {"margin-bottom": 6}, {}),
+    ".item-position": (16, 1.4, {"margin-bottom": 2}, {}),
+    ".item-company": (16, 1.4, {}, {}),
+    ".item-dates": (16, 1.4, {}, {}),
+    ".item-location": (16, 1.4, {}, {}),
+    ".achievements": (None, None, {"margin-top": 6}, {}),
+    ".achievements li": (15, 1.5, {"margin-bottom": 4}, {}),
+    ".skills-container": (None, None, {"margin-top": 10}, {}),
+    ".skill-row": (None, None, {"margin-bottom": 8}, {}),
+    ".skill-category": (15, None, {}, {}),
+    ".skill-tag": (15, 1.3, {}, {}),
+    ".key-achievements": (None, None, {"padding-top": 8, "padding-bottom": 8, "margin-top": 8, "margin-bottom": 8}, {}),
+    ".key-achievements .achievement-title": (14, None, {"margin-bottom": 4}, {}),
+    ".key-achievements .achievement-item": (13, None, {"margin-bottom": 2}, {}),
+}
+BASE_BODY_FONT_PX = 15
+BASE_MARGIN_PX = 20
+
+# Level 0 is the template as designed; each level tightens everything a little more
+FIT_STEPS = 9
+MIN_FONT_SCALE = 0.8
+MIN_LINE_HEIGHT_SCALE = 0.88
+MIN_SPACING_SCALE = 0.5
+MIN_MARGIN_SCALE = 0.5
+
+
+@dataclass
+class FitParameters:
+    level: int
+    font_scale: float
+    line_height_scale: float
+    spacing_scale: float
+    margin_scale: float
+
+    @property
+    def height_factor(self) -> float:
+        """Rough share of the original height the content takes at this level"""
+        return self.font_scale * self.line_height_scale
+
+    def describe(self) -> Dict[str, Any]:
+        """Parameters as reported to API clients"""
+        return {
+            **asdict(self),
+            "body_font_size_px": round(BASE_BODY_FONT_PX * self.font_scale, 2),
+            "margin_px": round(BASE_MARGIN_PX * self.margin_scale, 2),
+        }
+
+
+def _interpolate(minimum: float, step: int) -> float:
+    return round(1 - (1 - minimum) * step / (FIT_STEPS - 1), 4)
+
+
+FIT_LEVELS = [
+    FitParameters(
+        level=step,
+        font_scale=_interpolate(MIN_FONT_SCALE, step),
+        line_height_scale=_interpolate(MIN_LINE_HEIGHT_SCALE, step),
+        spacing_scale=_interpolate(MIN_SPACING_SCALE, step),
+        margin_scale=_interpolate(MIN_MARGIN_SCALE, step),
+    )
+    for step in range(FIT_STEPS)
+]
+
+
+def fit_stylesheet(parameters: FitParameters) -> str:
+    """CSS overriding the CV template's sizes for one fit level (empty for level 0)"""
+    if parameters.level == 0:
+        return ""
+
+    # Passed as a user stylesheet, so it needs !important to beat the template's own <style>
+
+    rules = []
+    for selector, (font_size, line_height, spacing, margins) in CV_TEMPLATE_METRICS.items():
+        declarations = []
+        if font_size is not None:
+            declarations.append(f"font-size: {font_size * parameters.font_scale:.2f}px")
+        if line_height is not None:
+            declarations.append(f"line-height: {line_height * parameters.line_height_scale:.3f}")
+        for prop, value in spacing.items():
+            declarations.append(f"{prop}: {value * parameters.spacing_scale:.2f}px")
+        for prop, value in margins.items():
+            declarations.append(f"{prop}: {value * parameters.margin_scale:.2f}px")
+        rules.append(f"{selector} {{ {' !important; '.join(declarations)} !important }}")
+    return "\n".join(rules)
+
+
+# Override CSS for every fit level, indexed by level
+FIT_STYLESHEETS = [fit_stylesheet(parameters) for parameters in FIT_LEVELS]
+
+
+def estimate_fit_level(cv_data: Dict[str, Any], max_pages: int) -> Tuple[int, Dict[str, float]]:
+    """
+    Pick the fit level to try first from the layout service's height estimate
+
+    Returns the seed level and the estimate it was based on.
+    """
+    margin_mm = BASE_MARGIN_PX * PX_TO_MM
+    constraints = PageConstraints(
+        margin_top_mm=margin_mm, margin_bottom_mm=margin_mm,
+        margin_left_mm=margin_mm, margin_right_mm=margin_mm
+    )
+    try:
+        content_height, page_height = layout_service.estimate_content_height(cv_data, constraints)
+    except Exception as e:
+        # The estimate only seeds the search, so a malformed section just means starting at level 0
+        logger.warning(f"Page fit estimate failed: {e}")
+        return 0, {"content_height_mm": 0.0, "available_height_mm": 0.0}
+
+    available = page_height * max_pages
+    seed = FIT_LEVELS[-1].level
+    for parameters in FIT_LEVELS:
+        if content_height * parameters.height_factor <= available:
+            seed = parameters.level
+            break
+
+    return seed, {"content_height_mm": round(content_height, 1), "available_height_mm": round(available, 1)}
+
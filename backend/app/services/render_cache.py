@@ -0,0 +1,275 @@
+"""
+Render Cache
+Content-addressed cache for rendered documents with an in-memory LRU and an on-disk spill tier
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCache:
+    """
+    Two-tier cache for rendered PDF bytes
+
+    Entries live in an in-process LRU bounded by a byte budget. Entries
+    evicted from memory spill to a size-capped directory on disk and are
+    promoted back to memory when they are hit again.
+
+    ``get``/``put``/``contains`` block on disk I/O and are meant for worker
+    threads and memory-only caches. On the event loop use ``aget``/``aput``/
+    ``acontains``, which serve the memory tier inline and run disk reads,
+    writes and evictions in a thread.
+    """
+
+    def __init__(self, memory_budget_bytes: int, disk_dir: Optional[str] = None,
+                 disk_budget_bytes: int = 0):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_dir = disk_dir
+        self.disk_budget_bytes = disk_budget_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self._disk_lock = threading.Lock()
+
+        # Counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(template_name: str, theme: Optional[str], data: Dict[str, Any],
+                 stylesheets: List[str]) -> str:
+        """Build a stable content hash for a render request"""
+        payload = json.dumps(
+            {
+                "template": template_name,
+                "theme": theme,
+                "data": data,
+                "css": stylesheets,
+            },
+            sort_keys=True,
+            default=str,
+            ensure_ascii=False,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Look up rendered bytes by key"""
+        value = self._get_memory(key)
+        if value is None:
+            value = self._read_disk(key)
+            if value is not None:
+                self._write_disk_entries(self._promote(key, value))
+        if value is None:
+            self.misses += 1
+        return value
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        """Look up rendered bytes by key without blocking the event loop"""
+        value = self._get_memory(key)
+        if value is None and self._disk_enabled():
+            value = await asyncio.to_thread(self._read_disk, key)
+            if value is not None:
+                spilled = self._promote(key, value)
+                if spilled:
+                    await asyncio.to_thread(self._write_disk_entries, spilled)
+        if value is None:
+            self.misses += 1
+        return value
+
+    def contains(self, key: str) -> bool:
+        """Check for a key without counting a hit or miss"""
+        return key in self._memory or (self._disk_enabled() and os.path.exists(self._disk_path(key)))
+
+    async def acontains(self, key: str) -> bool:
+        """Check for a key without counting a hit or miss, or blocking the event loop"""
+        if key in self._memory:
+            return True
+        return self._disk_enabled() and await asyncio.to_thread(os.path.exists, self._disk_path(key))
+
+    def put(self, key: str, value: bytes):
+        """Store rendered bytes under key"""
+        self.stores += 1
+        self._write_disk_entries(self._store_memory(key, value))
+
+    async def aput(self, key: str, value: bytes):
+        """Store rendered bytes under key, spilling to disk in a thread"""
+        self.stores += 1
+        spilled = self._store_memory(key, value)
+        if spilled and self._disk_enabled():
+            await asyncio.to_thread(self._write_disk_entries, spilled)
+
+    def clear(self):
+        """Drop all memory and disk entries"""
+        self._memory.clear()
+        self._memory_bytes = 0
+        if self._disk_enabled():
+            with self._disk_lock:
+                for name in os.listdir(self.disk_dir):
+                    if name.endswith(".bin"):
+                        self._remove_file(os.path.join(self.disk_dir, name))
+                self._disk_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "disk_bytes": self._disk_bytes or 0,
+            "disk_budget_bytes": self.disk_budget_bytes if self._disk_enabled() else 0,
+        }
+
+    def _get_memory(self, key: str) -> Optional[bytes]:
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+        return value
+
+    def _promote(self, key: str, value: bytes) -> List[Tuple[str, bytes]]:
+        self.disk_hits += 1
+        return self._store_memory(key, value)
+
+    def _store_memory(self, key: str, value: bytes) -> List[Tuple[str, bytes]]:
+        """Keep an entry in memory, returning the entries that belong on disk instead"""
+        if len(value) > self.memory_budget_bytes:
+            return [(key, value)]
+
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+
+        self._memory[key] = value
+        self._memory_bytes += len(value)
+
+        # Spill least recently used entries to disk
+        spilled = []
+        while self._memory_bytes > self.memory_budget_bytes:
+            old_key, old_value = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old_value)
+            self.evictions += 1
+            spilled.append((old_key, old_value))
+        return spilled
+
+    def _disk_enabled(self) -> bool:
+        return bool(self.disk_dir) and self.disk_budget_bytes > 0
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.bin")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self._disk_enabled():
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = f.read()
+            os.utime(path)  # Mark as recently used
+            return value
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Render cache disk read failed: {e}")
+            return None
+
+    def _write_disk_entries(self, entries: List[Tuple[str, bytes]]):
+        # Writes from several threads share the byte count and eviction pass
+        with self._disk_lock:
+            for key, value in entries:
+                self._write_disk(key, value)
+
+    def _write_disk(self, key: str, value: bytes):
+        if not self._disk_enabled() or len(value) > self.disk_budget_bytes:
+            return
+
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                os.utime(path)
+                return
+
+            # Write atomically so concurrent readers never see partial files
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+            self._disk_bytes += len(value)
+
+            if self._disk_bytes > self.disk_budget_bytes:
+                self._evict_disk()
+        except OSError as e:
+            logger.warning(f"Render cache disk write failed: {e}")
+
+    def _scan_disk_bytes(self) -> int:
+        total = 0
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".bin"):
+                try:
+                    total += os.path.getsize(os.path.join(self.disk_dir, name))
+                except OSError:
+                    pass
+        return total
+
+    def _evict_disk(self):
+        """Remove least recently used files until the disk tier fits its budget"""
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".bin"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.disk_budget_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._remove_file(path)
+            total -= size
+            self.evictions += 1
+        self._disk_bytes = total
+
+    def _remove_file(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# Global render cache instance
+render_cache = RenderCache(
+    memory_budget_bytes=settings.RENDER_CACHE_MEMORY_MB * 1024 * 1024,
+    disk_dir=settings.RENDER_CACHE_DIR,
+    disk_budget_bytes=settings.RENDER_CACHE_DISK_MB * 1024 * 1024
+)
@@ -0,0 +1,697 @@
+"""
+PDF Render Pool
+Runs CPU-heavy WeasyPrint renders in a bounded process pool so the event loop stays responsive
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RenderError(Exception):
+    """Base error for render pool failures"""
+
+
+class RenderQueueFullError(RenderError):
+    """Raised when the render queue is at capacity"""
+
+
+class RenderTimeoutError(RenderError):
+    """Raised when a render overruns its deadline"""
+
+
+class RenderPreemptedError(RenderError):
+    """Raised when a speculative render is killed to free its worker for an interactive one"""
+
+
+# Per-process render resources. Each worker builds these once and reuses
+# them for every render instead of re-parsing the shared stylesheets and
+# re-querying fontconfig. A template's own <style> blocks stay in its HTML:
+# WeasyPrint applies ``stylesheets=`` at user origin, so moving them there
+# would change the cascade and the rendered output.
+_font_config = None
+_draft_font_config = None
+_stylesheets: "OrderedDict[str, Any]" = OrderedDict()
+_STYLESHEET_CACHE_SIZE = 64
+
+
+# Draft previews: hide images and page/element backgrounds (watermarks included)
+DRAFT_CSS = """
+    img, svg, picture, video, object { display: none !important; }
+    * { background-image: none !important; }
+    @page { background: none !important; }
+"""
+
+
+def _draft_url_fetcher(url: str, timeout: int = 10, ssl_context=None):
+    """Refuse every external resource so draft renders use system fonts and skip images"""
+    raise ValueError(f"Draft render does not fetch {url[:80]}")
+
+
+def get_font_config(draft: bool = False):
+    """Get the worker's shared font configuration (a separate, web-font-free one for drafts)"""
+    global _font_config, _draft_font_config
+    from weasyprint.text.fonts import FontConfiguration
+    if draft:
+        if _draft_font_config is None:
+            _draft_font_config = FontConfiguration()
+        return _draft_font_config
+    if _font_config is None:
+        _font_config = FontConfiguration()
+    return _font_config
+
+
+def get_stylesheet(css_text: str, draft: bool = False):
+    """Get a parsed stylesheet, parsing it only the first time it is seen"""
+    key = hashlib.sha256(css_text.encode("utf-8")).hexdigest()
+    if draft:
+        key = f"draft:{key}"
+    stylesheet = _stylesheets.get(key)
+    if stylesheet is not None:
+        _stylesheets.move_to_end(key)
+        return stylesheet
+
+    from weasyprint import CSS
+    if draft:
+        # @import / @font-face URLs are refused, leaving text in system fonts
+        stylesheet = CSS(string=css_text, font_config=get_font_config(draft=True),
+                         url_fetcher=_draft_url_fetcher)
+    else:
+        stylesheet = CSS(string=css_text, font_config=get_font_config())
+    _stylesheets[key] = stylesheet
+    if len(_stylesheets) > _STYLESHEET_CACHE_SIZE:
+        _stylesheets.popitem(last=False)
+    return stylesheet
+
+
+def layout_document(html: str, stylesheets: List[str], options: Optional[Dict[str, Any]] = None):
+    """Lay out an HTML document with the worker's shared fonts and stylesheets"""
+    from weasyprint import HTML
+
+    css = [get_stylesheet(stylesheet) for stylesheet in stylesheets]
+    return HTML(string=html).render(stylesheets=css, font_config=get_font_config(), **(options or {}))
+
+
+def render_html_to_pdf(html: str, stylesheets: List[str], options: Optional[Dict[str, Any]] = None) -> bytes:
+    """Render an HTML document to PDF bytes (runs inside a worker process)"""
+    return layout_document(html, stylesheets, options).write_pdf(**(options or {}))
+
+
+def render_bundle_pdfs(documents: List[Tuple[str, List[str]]], combined: bool = False) -> List[bytes]:
+    """
+    Lay out several HTML documents in one worker pass (runs inside a worker process)
+
+    Every document shares the worker's font configuration and parsed
+    stylesheets. With ``combined`` all pages are written as a single PDF,
+    embedding each font once; otherwise one PDF is written per document.
+    """
+    rendered = [layout_document(html, stylesheets) for html, stylesheets in documents]
+    if combined:
+        pages = [page for document in rendered for page in document.pages]
+        return [rendered[0].copy(pages).write_pdf()]
+    return [document.write_pdf() for document in rendered]
+
+
+def render_draft_pdf(html: str, stylesheets: List[str], max_pages: Optional[int] = 1) -> bytes:
+    """
+    Render a fast, low-fidelity preview PDF (runs inside a worker process)
+
+    No external resources are fetched (system fonts only, no images),
+    backgrounds are dropped and only the first ``max_pages`` pages are
+    written out.
+    """
+    from weasyprint import HTML
+
+    css = [get_stylesheet(stylesheet, draft=True) for stylesheet in list(stylesheets) + [DRAFT_CSS]]
+    document = HTML(string=html, url_fetcher=_draft_url_fetcher).render(
+        stylesheets=css, font_config=get_font_config(draft=True)
+    )
+    if max_pages and len(document.pages) > max_pages:
+        document = document.copy(document.pages[:max_pages])
+    return document.write_pdf()
+
+
+def recompress_pdf(pdf: bytes, level: int = 9) -> bytes:
+    """Re-deflate page content streams at a higher zlib level, keeping whichever output is smaller"""
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        return pdf
+
+    try:
+        writer = PdfWriter(clone_from=PdfReader(io.BytesIO(pdf)))
+        for page in writer.pages:
+            page.compress_content_streams(level=level)
+        output = io.BytesIO()
+        writer.write(output)
+        recompressed = output.getvalue()
+    except Exception as e:
+        logger.warning(f"PDF recompression skipped: {type(e).__name__}: {e}")
+        return pdf
+
+    return recompressed if len(recompressed) < len(pdf) else pdf
+
+
+def render_optimized_pdf(html: str, stylesheets: List[str], options: Dict[str, Any],
+                         recompress_level: Optional[int] = None) -> Dict[str, Any]:
+    """Render to PDF, then run the size post-processing stage (runs inside a worker process)"""
+    pdf = render_html_to_pdf(html, stylesheets, options)
+    rendered_bytes = len(pdf)
+
+    start = time.perf_counter()
+    if recompress_level is not None:
+        pdf = recompress_pdf(pdf, recompress_level)
+
+    return {
+        "pdf": pdf,
+        "rendered_bytes": rendered_bytes,
+        "postprocess_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def render_fitted_pdf(html: str, stylesheets: List[str], level_stylesheets: List[str],
+                      max_pages: int, seed: int) -> Dict[str, Any]:
+    """
+    Find the loosest fit level whose layout stays within ``max_pages`` (runs inside a worker process)
+
+    ``level_stylesheets`` override the document's sizes, tighter with each
+    level. The search gallops outwards from the ``seed`` level and then
+    bisects, so a good seed settles in two or three layouts. Only the
+    chosen layout is written to PDF.
+    """
+    layouts = {}
+
+    def page_count(level: int) -> int:
+        override = [level_stylesheets[level]] if level_stylesheets[level] else []
+        layouts[level] = layout_document(html, list(stylesheets) + override)
+        return len(layouts[level].pages)
+
+    # Every level <= failing is known too long, every level >= fitting is known to fit
+    failing, fitting = -1, len(level_stylesheets)
+    level, step = seed, 1
+    while fitting - failing > 1:
+        if page_count(level) <= max_pages:
+            fitting = level
+        else:
+            failing = level
+
+        if failing == -1:
+            level = max(0, fitting - step)
+        elif fitting == len(level_stylesheets):
+            level = min(len(level_stylesheets) - 1, failing + step)
+        else:
+            level = (failing + fitting) // 2
+        step *= 2
+
+    fitted = fitting < len(level_stylesheets)
+    chosen = fitting if fitted else len(level_stylesheets) - 1
+    return {
+        "pdf": layouts[chosen].write_pdf(),
+        "level": chosen,
+        "fitted": fitted,
+        "pages": len(layouts[chosen].pages),
+        "renders": len(layouts),
+    }
+
+
+def rasterize_pdf(pdf: bytes, first_page_only: bool, dpi: int, image_format: str) -> List[bytes]:
+    """Rasterise PDF pages to PNG or WebP images (runs inside a worker process)"""
+    import pypdfium2 as pdfium
+
+    document = pdfium.PdfDocument(pdf)
+    try:
+        page_count = 1 if first_page_only else len(document)
+        images = []
+        for index in range(min(page_count, len(document))):
+            page = document[index]
+            image = page.render(scale=dpi / 72).to_pil()
+            page.close()
+
+            output = io.BytesIO()
+            if image_format == "webp":
+                image.save(output, format="WEBP", quality=80, method=4)
+            else:
+                image.save(output, format="PNG", optimize=True)
+            images.append(output.getvalue())
+        return images
+    finally:
+        document.close()
+
+
+def _init_worker(warm_documents: List[Tuple[str, List[str]]]):
+    """Warm a freshly started worker: import WeasyPrint, load fonts and parse template CSS"""
+    try:
+        get_font_config()
+        for html, stylesheets in warm_documents:
+            render_html_to_pdf(html, stylesheets)
+            render_draft_pdf(html, stylesheets)
+    except Exception as e:
+        # A cold worker is still usable; the first real render just pays the cost
+        logger.warning(f"Render worker warmup failed: {type(e).__name__}: {e}")
+
+
+def _worker_pid() -> int:
+    """Report the worker's process id (used to confirm every worker has started)"""
+    return os.getpid()
+
+
+def _run_timed(fn: Callable, submitted_at: float, *args) -> Dict[str, Any]:
+    """Run a task in the worker and report when it started, how long it took and its CPU time"""
+    started_at = time.time()
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    result = fn(*args)
+    return {
+        "result": result,
+        "queue_wait_ms": max(0.0, (started_at - submitted_at) * 1000),
+        "render_ms": (time.perf_counter() - start) * 1000,
+        "cpu_ms": (time.thread_time() - cpu_start) * 1000,
+    }
+
+
+def _worker_main(conn, warm_documents: List[Tuple[str, List[str]]]):
+    """Worker process loop: warm up, report ready, then run tasks sent over the pipe"""
+    # Shutdown is driven by the parent; don't die on the terminal's Ctrl+C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _init_worker(warm_documents)
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+
+        fn, args, submitted_at = message
+        try:
+            reply = ("ok", _run_timed(fn, submitted_at, *args))
+        except Exception as e:
+            reply = ("error", e)
+
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Unpicklable result or exception
+            conn.send(("error", RenderError(f"{type(e).__name__}: {e}")))
+
+
+class _RenderWorker:
+    """A single render process driven over a pipe, so it can be killed on its own"""
+
+    def __init__(self, mp_context, warm_documents: List[Tuple[str, List[str]]]):
+        self._conn, child_conn = mp_context.Pipe()
+        self.process = mp_context.Process(
+            target=_worker_main, args=(child_conn, warm_documents), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.preempted = False
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def call(self, fn: Callable, args: tuple, submitted_at: float,
+             timeout: float, startup_timeout: float) -> Dict[str, Any]:
+        """Run one task and wait for its result (blocking; called from a thread)"""
+        # Warmup runs before the worker reads its first task; it doesn't count
+        # against the render deadline
+        if not self.ready:
+            if not self._conn.poll(startup_timeout):
+                self.kill()
+                raise RenderError("Render worker failed to start")
+            self._recv()
+            self.ready = True
+
+        self._conn.send((fn, args, submitted_at))
+        if not self._conn.poll(timeout):
+            self.kill()
+            raise RenderTimeoutError(f"PDF rendering exceeded the {timeout:g}s time limit")
+
+        status, payload = self._recv()
+        if status == "error":
+            raise payload
+        return payload
+
+    def _recv(self) -> Tuple[str, Any]:
+        try:
+            return self._conn.recv()
+        except (EOFError, OSError):
+            self.kill()
+            raise RenderError("Render worker exited unexpectedly")
+
+    def preempt(self):
+        """Kill the process from the event loop; the thread blocked in ``call`` cleans up"""
+        self.preempted = True
+        if self.process.is_alive():
+            self.process.kill()
+
+    def kill(self):
+        """Terminate the process immediately"""
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self._conn.close()
+
+    def stop(self):
+        """Ask the process to exit once it is idle"""
+        try:
+            self._conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+        self._conn.close()
+
+
+class RenderMetrics:
+    """Rolling counters and timing samples for the render pool"""
+
+    def __init__(self, sample_size: int = 500):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.recycled = 0
+        self.speculative_completed = 0
+        self.speculative_skipped = 0
+        self.speculative_preempted = 0
+        self.sample_size = sample_size
+        self.queue_wait_ms = deque(maxlen=sample_size)
+        self.render_ms = deque(maxlen=sample_size)
+        self.cpu_ms_by_task: Dict[str, deque] = {}
+
+    def record(self, queue_wait_ms: float, render_ms: float, task: str = "", cpu_ms: float = 0.0):
+        """Record a finished render"""
+        self.completed += 1
+        self.queue_wait_ms.append(queue_wait_ms)
+        self.render_ms.append(render_ms)
+        if task:
+            self.cpu_ms_by_task.setdefault(task, deque(maxlen=self.sample_size)).append(cpu_ms)
+
+    def _summarize(self, samples: deque) -> Dict[str, float]:
+        if not samples:
+            return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+
+        ordered = sorted(samples)
+        return {
+            "avg": round(sum(ordered) / len(ordered), 2),
+            "p50": round(ordered[len(ordered) // 2], 2),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+            "max": round(ordered[-1], 2),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a JSON-serialisable view of the metrics"""
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "workers_recycled": self.recycled,
+            "speculative_completed": self.speculative_completed,
+            "speculative_skipped": self.speculative_skipped,
+            "speculative_preempted": self.speculative_preempted,
+            "queue_wait_ms": self._summarize(self.queue_wait_ms),
+            "render_ms": self._summarize(self.render_ms),
+            # Per task type, e.g. two render_html_to_pdf calls vs one render_bundle_pdfs
+            "cpu_ms": {task: self._summarize(samples) for task, samples in self.cpu_ms_by_task.items()},
+        }
+
+
+class RenderPool:
+    """
+    Bounded pool of killable render processes
+
+    At most ``max_workers`` renders run at once and at most ``queue_depth``
+    more may wait; anything beyond that is rejected so callers can shed load.
+    Every render runs under a ``timeout`` deadline: a worker that overruns
+    is killed and replaced, and the caller gets ``RenderTimeoutError``.
+    With ``max_workers`` set to 0 renders run in a thread instead (for
+    platforms that cannot fork, such as serverless runtimes); the deadline
+    is still reported to the caller but the thread cannot be stopped.
+    """
+
+    def __init__(self, max_workers: int, queue_depth: int, start_method: str = "spawn",
+                 timeout: float = 30.0, startup_timeout: float = 120.0):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.start_method = start_method
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.metrics = RenderMetrics()
+        self.warmed = False
+        self._workers: List[_RenderWorker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._warm_documents: List[Tuple[str, List[str]]] = []
+        self._in_flight = 0
+        self._speculative_in_flight = 0
+        self._speculative_workers: List[_RenderWorker] = []
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of renders running or waiting at once"""
+        return max(1, self.max_workers) + self.queue_depth
+
+    @property
+    def in_flight(self) -> int:
+        """Number of renders currently running or waiting"""
+        return self._in_flight
+
+    def _start_worker(self) -> _RenderWorker:
+        worker = _RenderWorker(multiprocessing.get_context(self.start_method), self._warm_documents)
+        self._workers.append(worker)
+        self._idle.put_nowait(worker)
+        return worker
+
+    def _ensure_workers(self):
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.max_workers):
+                self._start_worker()
+
+    def _release(self, worker: _RenderWorker):
+        """Return a worker to the idle queue, replacing it if it was killed"""
+        if worker not in self._workers:
+            # Pool was shut down while this render was running
+            worker.stop()
+            return
+
+        if worker.alive:
+            self._idle.put_nowait(worker)
+            return
+
+        self._workers.remove(worker)
+        self.metrics.recycled += 1
+        logger.warning(f"Recycling render worker {worker.process.pid}")
+        self._start_worker()
+
+    async def _run_in_worker(self, fn: Callable, args: tuple, timeout: float,
+                             speculative: bool = False) -> Dict[str, Any]:
+        self._ensure_workers()
+        if not speculative and self._idle.empty():
+            self._preempt_speculation()
+
+        worker = await self._idle.get()
+        if speculative:
+            self._speculative_workers.append(worker)
+        task = asyncio.ensure_future(asyncio.to_thread(
+            worker.call, fn, args, time.time(), timeout, self.startup_timeout
+        ))
+        # The worker goes back to the pool only once its task has really finished,
+        # even if the awaiting request is cancelled first
+        task.add_done_callback(lambda _: self._finish(worker))
+        try:
+            return await asyncio.shield(task)
+        except RenderError:
+            if worker.preempted:
+                raise RenderPreemptedError("Speculative render preempted by an interactive render")
+            raise
+
+    def _finish(self, worker: _RenderWorker):
+        if worker in self._speculative_workers:
+            self._speculative_workers.remove(worker)
+        self._release(worker)
+
+    def _preempt_speculation(self):
+        """Free a worker for an interactive render by killing a speculative one"""
+        if self._speculative_workers:
+            worker = self._speculative_workers.pop(0)
+            logger.info(f"Preempting speculative render on worker {worker.process.pid}")
+            self.metrics.speculative_preempted += 1
+            worker.preempt()
+
+    async def warmup(self, warm_documents: List[Tuple[str, List[str]]], timeout: float = 120.0):
+        """
+        Start every worker and render the warm documents in each of them
+
+        Workers started later (e.g. replacing a killed one) run the same
+        warmup before taking their first task, so they never serve a
+        request cold.
+        """
+        self._warm_documents = list(warm_documents)
+
+        if self.max_workers <= 0:
+            # Thread mode: warm this process once
+            await asyncio.to_thread(_init_worker, self._warm_documents)
+            self.warmed = True
+            return
+
+        # Restart the workers so they carry the warm documents
+        self.shutdown()
+        self._ensure_workers()
+
+        # Each ping holds its worker until it answers, so every worker gets one
+        results = await asyncio.gather(*[
+            self._run_in_worker(_worker_pid, (), timeout)
+            for _ in range(self.max_workers)
+        ], return_exceptions=True)
+        started = [r for r in results if not isinstance(r, BaseException)]
+
+        self.warmed = True
+        logger.info(f"Render pool warmed with {len(started)}/{self.max_workers} workers")
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run ``fn(*args)`` in the pool and await its result"""
+        if self._in_flight >= self.capacity:
+            self.metrics.rejected += 1
+            raise RenderQueueFullError(
+                "PDF rendering is at capacity. Please try again shortly."
+            )
+
+        self._in_flight += 1
+        self.metrics.submitted += 1
+        try:
+            if self.max_workers > 0:
+                outcome = await self._run_in_worker(fn, args, self.timeout)
+            else:
+                try:
+                    outcome = await asyncio.wait_for(
+                        asyncio.to_thread(_run_timed, fn, time.time(), *args), self.timeout
+                    )
+                except asyncio.TimeoutError:
+                    raise RenderTimeoutError(f"PDF rendering exceeded the {self.timeout:g}s time limit")
+        except RenderTimeoutError:
+            self.metrics.timeouts += 1
+            self.metrics.failed += 1
+            raise
+        except Exception:
+            self.metrics.failed += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+        self.metrics.record(
+            outcome["queue_wait_ms"], outcome["render_ms"], getattr(fn, "__name__", ""), outcome["cpu_ms"]
+        )
+        return outcome["result"]
+
+    @property
+    def idle_for_speculation(self) -> bool:
+        """
+        Whether a low-priority render may start
+
+        Only on the idle half of a process pool with at least two workers, so
+        one worker is always left for interactive renders.
+        """
+        if self.max_workers < 2:
+            return False
+        busy = self._in_flight + self._speculative_in_flight
+        return busy < self.max_workers // 2
+
+    async def run_speculative(self, fn: Callable, *args) -> Optional[Any]:
+        """
+        Run ``fn(*args)`` at low priority
+
+        The task only starts while the pool is mostly idle and is skipped
+        (returning None) under load. It does not count against the
+        interactive queue capacity, and if an interactive render finds no
+        free worker while it runs, its worker is killed and replaced so the
+        interactive render does not wait behind it (also returning None).
+        """
+        if not self.idle_for_speculation:
+            self.metrics.speculative_skipped += 1
+            return None
+
+        self._speculative_in_flight += 1
+        try:
+            outcome = await self._run_in_worker(fn, args, self.timeout, speculative=True)
+        except RenderPreemptedError:
+            return None
+        finally:
+            self._speculative_in_flight -= 1
+
+        self.metrics.speculative_completed += 1
+        return outcome["result"]
+
+    async def render_pdf(self, html: str, stylesheets: List[str],
+                         options: Optional[Dict[str, Any]] = None) -> bytes:
+        """Render HTML to PDF bytes in the pool"""
+        return await self.run(render_html_to_pdf, html, stylesheets, options)
+
+    async def render_draft_pdf(self, html: str, stylesheets: List[str],
+                               max_pages: Optional[int] = 1) -> bytes:
+        """Render a draft-quality preview PDF in the pool"""
+        return await self.run(render_draft_pdf, html, stylesheets, max_pages)
+
+    async def render_bundle(self, documents: List[Tuple[str, List[str]]],
+                            combined: bool = False) -> List[bytes]:
+        """Render several documents in one worker pass"""
+        return await self.run(render_bundle_pdfs, documents, combined)
+
+    async def render_fitted(self, html: str, stylesheets: List[str], level_stylesheets: List[str],
+                            max_pages: int, seed: int) -> Dict[str, Any]:
+        """Search fit levels for a page budget in one worker pass"""
+        return await self.run(render_fitted_pdf, html, stylesheets, level_stylesheets, max_pages, seed)
+
+    async def rasterize(self, pdf: bytes, first_page_only: bool, dpi: int,
+                        image_format: str) -> List[bytes]:
+        """Rasterise PDF pages to images in the pool"""
+        return await self.run(rasterize_pdf, pdf, first_page_only, dpi, image_format)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool configuration, load and timing metrics"""
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "timeout_seconds": self.timeout,
+            "in_flight": self._in_flight,
+            "speculative_in_flight": self._speculative_in_flight,
+            "capacity": self.capacity,
+            "started": bool(self._workers),
+            "live_workers": sum(1 for worker in self._workers if worker.alive),
+            "warmed": self.warmed,
+            **self.metrics.snapshot(),
+        }
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        workers, self._workers, self._idle = self._workers, [], None
+        for worker in workers:
+            worker.stop()
+
+
+# Global render pool instance
+render_pool = RenderPool(
+    max_workers=settings.PDF_RENDER_WORKERS,
+    queue_depth=settings.PDF_RENDER_QUEUE_DEPTH,
+    start_method=settings.PDF_RENDER_START_METHOD,
+    timeout=settings.PDF_TIMEOUT
+)
@@ -0,0 +1,188 @@
+"""
+Stage Graph Executor
+Runs declarative pipelines of named stages concurrently, dispatching each to its executor and timing it
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Where a stage runs: awaited on the event loop, called inline on the loop, or in the default thread pool
+STAGE_EXECUTORS = ("async", "inline", "thread")
+
+# Per-request stage timings, collected while a trace is active
+_current_trace: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "stage_trace", default=None
+)
+
+
+@dataclass
+class Stage:
+    """
+    One step of a pipeline
+
+    ``fn`` is called with the values named in ``inputs`` (earlier stage
+    outputs or initial context keys) as positional arguments. A stage with
+    several ``outputs`` must return a tuple of that length. PDF stages call
+    into the render pool themselves, so they are ``async`` here.
+    """
+    name: str
+    fn: Callable
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    executor: str = "inline"
+
+    def __post_init__(self):
+        if self.executor not in STAGE_EXECUTORS:
+            raise ValueError(f"Unknown executor '{self.executor}' for stage '{self.name}'")
+        if not self.outputs:
+            self.outputs = (self.name,)
+
+
+@dataclass
+class StageGraph:
+    """A named set of stages; the dependency order comes from their inputs and outputs"""
+    name: str
+    stages: List[Stage] = field(default_factory=list)
+
+    def validate(self, context_keys) -> None:
+        """Check every input is produced exactly once, either by the context or a stage"""
+        produced = set(context_keys)
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in produced:
+                    raise ValueError(f"'{output}' is produced twice in pipeline '{self.name}'")
+                produced.add(output)
+
+        for stage in self.stages:
+            missing = [name for name in stage.inputs if name not in produced]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' in pipeline '{self.name}' needs unknown inputs {missing}")
+
+
+class StageMetrics:
+    """Rolling wall-time samples per pipeline stage"""
+
+    def __init__(self, sample_size: int = 500):
+        self.sample_size = sample_size
+        self.runs: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+        self.wall_ms: Dict[str, deque] = {}
+
+    def record(self, key: str, wall_ms: float, failed: bool = False):
+        """Record one stage (or whole-pipeline) run under ``pipeline.stage``"""
+        self.runs[key] = self.runs.get(key, 0) + 1
+        if failed:
+            self.failures[key] = self.failures.get(key, 0) + 1
+        self.wall_ms.setdefault(key, deque(maxlen=self.sample_size)).append(wall_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-stage counters and latency summaries"""
+        stages = {}
+        for key, samples in sorted(self.wall_ms.items()):
+            ordered = sorted(samples)
+            stages[key] = {
+                "runs": self.runs.get(key, 0),
+                "failures": self.failures.get(key, 0),
+                "avg_ms": round(sum(ordered) / len(ordered), 2),
+                "p50_ms": round(ordered[len(ordered) // 2], 2),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+                "max_ms": round(ordered[-1], 2),
+            }
+        return {"stages": stages}
+
+
+async def _call_stage(stage: Stage, args: List[Any]) -> Any:
+    if stage.executor == "async":
+        return await stage.fn(*args)
+    if stage.executor == "thread":
+        return await asyncio.to_thread(stage.fn, *args)
+    return stage.fn(*args)
+
+
+class StageGraphExecutor:
+    """
+    Runs a StageGraph as soon as each stage's inputs are ready
+
+    Independent stages run concurrently. Each stage's wall time is recorded
+    in the shared metrics and in the active request trace, if any. The first
+    failing stage cancels the rest and its exception propagates unchanged.
+    """
+
+    def __init__(self, metrics: Optional[StageMetrics] = None):
+        self.metrics = metrics or StageMetrics()
+
+    async def run(self, graph: StageGraph, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Run every stage of ``graph`` and return all values, including ``context``"""
+        graph.validate(context)
+        values = dict(context)
+        pending = list(graph.stages)
+        running: Dict[asyncio.Task, Stage] = {}
+        trace = _current_trace.get()
+        started = time.perf_counter()
+
+        try:
+            while pending or running:
+                for stage in [stage for stage in pending if all(name in values for name in stage.inputs)]:
+                    pending.remove(stage)
+                    task = asyncio.create_task(self._run_stage(graph, stage, [values[name] for name in stage.inputs]))
+                    running[task] = stage
+                if not running:
+                    raise ValueError(f"Pipeline '{graph.name}' has a dependency cycle: {[stage.name for stage in pending]}")
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    stage = running.pop(task)
+                    result, wall_ms = task.result()
+                    if trace is not None:
+                        trace[stage.name] = trace.get(stage.name, 0.0) + wall_ms
+
+                    if len(stage.outputs) == 1:
+                        values[stage.outputs[0]] = result
+                    else:
+                        values.update(zip(stage.outputs, result))
+        finally:
+            for task in running:
+                task.cancel()
+
+        self.metrics.record(graph.name, (time.perf_counter() - started) * 1000)
+        return values
+
+    async def _run_stage(self, graph: StageGraph, stage: Stage, args: List[Any]) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        try:
+            result = await _call_stage(stage, args)
+        except BaseException:
+            self.metrics.record(f"{graph.name}.{stage.name}", (time.perf_counter() - start) * 1000, failed=True)
+            raise
+
+        wall_ms = (time.perf_counter() - start) * 1000
+        self.metrics.record(f"{graph.name}.{stage.name}", wall_ms)
+        return result, wall_ms
+
+
+@contextmanager
+def stage_trace() -> Iterator[Dict[str, float]]:
+    """Collect the wall time of every stage run inside the block, keyed by stage name"""
+    trace: Dict[str, float] = {}
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def server_timing(trace: Dict[str, float]) -> str:
+    """Format stage timings as a ``Server-Timing`` header value"""
+    return ", ".join(f"{name};dur={wall_ms:.1f}" for name, wall_ms in trace.items())
+
+
+# Global executor shared by every pipeline
+stage_executor = StageGraphExecutor()
@@ -0,0 +1,113 @@
+"""
+Shared Template Environment
+One Jinja2 environment for every service, backed by a persistent bytecode cache
+"""
+
+import hashlib
+import logging
+import os
+from typing import Callable, Dict, List, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, meta
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'templates'))
+
+
+def _create_bytecode_cache(pattern: str = "__jinja2_%s.cache"):
+    """Get the on-disk bytecode cache, or None when it is disabled or not writable"""
+    cache_dir = settings.TEMPLATE_BYTECODE_CACHE_DIR
+    if not cache_dir:
+        return None
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Template bytecode cache disabled: {e}")
+        return None
+
+    if not os.access(cache_dir, os.W_OK):
+        logger.warning(f"Template bytecode cache disabled: {cache_dir} is not writable")
+        return None
+    return FileSystemBytecodeCache(cache_dir, pattern)
+
+
+# Templates only change on deploy, so skip the per-render file stat outside DEBUG
+jinja_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=True,
+    auto_reload=settings.DEBUG,
+    bytecode_cache=_create_bytecode_cache()
+)
+
+# Export templates render without autoescaping. Compiled bytecode bakes the
+# escaping in, but Jinja's cache key is only the name and source checksum,
+# so this environment must not share cache files with the one above.
+export_jinja_env = jinja_env.overlay(
+    autoescape=False,
+    bytecode_cache=_create_bytecode_cache("__jinja2_noescape_%s.cache")
+)
+
+
+# (environment, template name) -> (source digest, loader uptodate checks)
+_versions: Dict[Tuple[Environment, str], Tuple[str, List[Callable[[], bool]]]] = {}
+
+
+def template_version(*names: str, env: Environment = jinja_env) -> str:
+    """
+    Digest of the given templates' sources and every template they extend,
+    include or import
+
+    Persistent caches mix this into their keys so output rendered by an older
+    deploy is never served after a template changes. Digests are memoized and,
+    with ``auto_reload``, recomputed once the loader reports a file changed.
+    """
+    digest = hashlib.sha256()
+    for name in names:
+        digest.update(_source_digest(env, name).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _source_digest(env: Environment, name: str) -> str:
+    cached = _versions.get((env, name))
+    if cached is not None and (not env.auto_reload or all(uptodate() for uptodate in cached[1])):
+        return cached[0]
+
+    digest = hashlib.sha256()
+    uptodate_checks = []
+    pending, seen = [name], set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+
+        source, _, uptodate = env.loader.get_source(env, current)
+        digest.update(current.encode("utf-8"))
+        digest.update(source.encode("utf-8"))
+        if uptodate is not None:
+            uptodate_checks.append(uptodate)
+        # Dynamic references come back as None and cannot be followed
+        pending.extend(ref for ref in meta.find_referenced_templates(env.parse(source)) if ref)
+
+    version = digest.hexdigest()
+    _versions[(env, name)] = (version, uptodate_checks)
+    return version
+
+
+def precompile_templates(env: Environment = jinja_env) -> int:
+    """Load every HTML template so it is compiled (and written to the bytecode cache) up front"""
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+if __name__ == "__main__":
+    # Run at image build time: python -m app.services.template_env
+    count = precompile_templates()
+    precompile_templates(export_jinja_env)
+    print(f"Precompiled {count} templates into {settings.TEMPLATE_BYTECODE_CACHE_DIR or '(no bytecode cache)'}")
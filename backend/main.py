@@ -3,6 +3,8 @@ CVGenius Backend - FastAPI Application Entry Point
 """
 
 import os
+import logging
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -16,10 +18,39 @@ load_dotenv()
 
 from app.api.v1.router import router as api_v1_router
 from app.core.config import settings
+from app.services.gemini_client import gemini_client
+from app.services.generator_service import cv_service
+from app.services.llm_cache import llm_cache
+from app.services.render_pool import render_pool
+
+logger = logging.getLogger(__name__)
 
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage shared resources for the lifetime of the app"""
+    # Open the pooled Gemini connection so the first generation skips the TLS handshake
+    await gemini_client.start(preconnect=settings.GEMINI_PRECONNECT_ON_STARTUP and bool(cv_service.gemini_api_key))
+    
+    # Pre-start and warm PDF render workers before accepting traffic
+    if settings.PDF_WARMUP_ON_STARTUP:
+        try:
+            await cv_service.warmup()
+        except Exception as e:
+            logger.warning(f"Render warmup failed, continuing cold: {type(e).__name__}: {e}")
+            render_pool.warmed = True
+    
+    yield
+    # Stop PDF render workers
+    render_pool.shutdown()
+    # Close pooled Gemini connections
+    await gemini_client.aclose()
+    llm_cache.close()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="CVGenius API",
@@ -27,6 +58,7 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    lifespan=lifespan,
 )
 
 # Add rate limiting
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _weasyprint_available() -> bool:
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError):
+        # OSError: the Python package is installed but pango/cairo are not
+        return False
+    return True
+
+
+requires_weasyprint = pytest.mark.skipif(
+    not _weasyprint_available(), reason="WeasyPrint or its system libraries are not installed"
+)
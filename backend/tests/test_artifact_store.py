@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.artifacts import downloads
+from app.services.artifact_store import ARTIFACT_URL_PREFIX, ArtifactStore
+
+PDF = b"%PDF-1.7\n" + bytes(range(256)) * 40
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(str(tmp_path), max_bytes=1024 * 1024, ttl_seconds=3600,
+                         url_ttl_seconds=600, secret_key="test-secret")
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    monkeypatch.setattr(downloads, "artifact_store", store)
+    app = FastAPI()
+    app.include_router(downloads.router, prefix=ARTIFACT_URL_PREFIX)
+    return TestClient(app)
+
+
+def signed_parts(link):
+    url = urlparse(link["download_url"])
+    return url.path.rsplit("/", 1)[1], {key: values[0] for key, values in parse_qs(url.query).items()}
+
+
+def test_publishing_is_content_addressed(store):
+    first = store.publish(PDF, "cv.pdf")
+    second = store.publish(PDF, "cv-copy.pdf")
+    assert first["artifact_id"] == second["artifact_id"]
+    assert store.get(first["artifact_id"]) == PDF
+    assert store.get_stats()["deduplicated"] == 1
+
+
+def test_signature_covers_id_filename_and_expiry(store):
+    artifact_id, params = signed_parts(store.publish(PDF, "cv.pdf"))
+    expires, signature = int(params["expires"]), params["signature"]
+    assert store.verify(artifact_id, "cv.pdf", expires, signature)
+    assert not store.verify(artifact_id, "other.pdf", expires, signature)
+    assert not store.verify(artifact_id, "cv.pdf", expires + 1, signature)
+    assert not store.verify("0" * 64, "cv.pdf", expires, signature)
+
+    expired = store.sign(artifact_id, "cv.pdf", expires_in=-1)
+    _, params = signed_parts(expired)
+    assert not store.verify(artifact_id, "cv.pdf", int(params["expires"]), params["signature"])
+
+
+def test_oldest_artifacts_are_evicted_over_budget(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=2500, ttl_seconds=3600, url_ttl_seconds=600, secret_key="s")
+    ids = []
+    for index in range(3):
+        ids.append(store.put(bytes([index]) * 1000))
+        path = store.path_for(ids[-1])
+        os.utime(path, (time.time() - 100 + index, time.time() - 100 + index))
+    store.sweep()
+    assert store.get(ids[0]) is None
+    assert store.get(ids[2]) is not None
+
+
+def test_download_full_and_cached(client, store):
+    link = store.publish(PDF, "cv.pdf")
+    response = client.get(link["download_url"])
+    assert response.status_code == 200 and response.content == PDF
+    assert response.headers["content-type"] == "application/pdf"
+
+    cached = client.get(link["download_url"], headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+
+def test_download_ranges(client, store):
+    link = store.publish(PDF, "cv.pdf")
+    partial = client.get(link["download_url"], headers={"Range": "bytes=100-199"})
+    assert partial.status_code == 206
+    assert partial.content == PDF[100:200]
+    assert partial.headers["content-range"] == f"bytes 100-199/{len(PDF)}"
+
+    suffix = client.get(link["download_url"], headers={"Range": "bytes=-10"})
+    assert suffix.content == PDF[-10:]
+
+    # A stale If-Range means the client's partial copy is of something else: send it all
+    stale = client.get(link["download_url"], headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+    assert stale.status_code == 200 and stale.content == PDF
+
+    unsatisfiable = client.get(link["download_url"], headers={"Range": f"bytes={len(PDF)}-"})
+    assert unsatisfiable.status_code == 416
+
+
+def test_download_rejects_tampered_and_missing(client, store):
+    link = store.publish(PDF, "cv.pdf")
+    assert client.get(link["download_url"].replace("cv.pdf", "x.pdf")).status_code == 403
+
+    artifact_id, _ = signed_parts(link)
+    os.remove(store.path_for(artifact_id))
+    assert client.get(link["download_url"]).status_code == 404
+
+
+def test_concurrent_publishes_of_the_same_bytes(store, tmp_path):
+    barrier = threading.Barrier(8)
+
+    def publish(index):
+        barrier.wait()
+        return store.publish(PDF, f"cv-{index}.pdf")["artifact_id"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = set(pool.map(publish, range(8)))
+
+    assert len(ids) == 1
+    assert os.listdir(tmp_path) == [ids.pop()]  # No temp files left behind
+    stats = store.get_stats()
+    assert stats["deduplicated"] == 7
+    assert stats["total_bytes"] == len(PDF)
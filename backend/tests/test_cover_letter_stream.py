@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import generator_service
+from app.services.gemini_client import gemini_client
+from app.services.generator_service import CVGeneratorService
+from app.services.llm_cache import LLMResponseCache
+
+LETTER = json.dumps({"cover_letter_body": "<p>I am applying for the analyst role.</p>", "company_name": "Acme"})
+CHUNKS = [LETTER[:20], LETTER[20:50], LETTER[50:]]
+
+
+def sse_body(chunks, finish_reason="STOP"):
+    lines = []
+    for index, text in enumerate(chunks):
+        candidate = {"content": {"parts": [{"text": text}]}}
+        if index == len(chunks) - 1:
+            candidate["finishReason"] = finish_reason
+        lines.append(f"data: {json.dumps({'candidates': [candidate]})}\n\n")
+    return "".join(lines).encode()
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """Serve Gemini stream requests from ``gemini.responses`` and count them"""
+    state = type("Gemini", (), {"requests": 0, "responses": []})()
+
+    def handler(request):
+        state.requests += 1
+        assert request.url.params["alt"] == "sse"
+        return state.responses.pop(0)
+
+    monkeypatch.setattr(gemini_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(generator_service, "llm_cache", LLMResponseCache(1024 * 1024, 3600))
+    return state
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = CVGeneratorService()
+    monkeypatch.setattr(service, "_check_gemini_key", lambda: None)
+    return service
+
+
+def collect(service, use_cache=True):
+    async def run():
+        return [event async for event in service.stream_cover_letter_only(
+            {"personal_details": {"full_name": "Ada"}}, "Analyst at Acme", "Acme", use_cache
+        )]
+
+    return asyncio.run(run())
+
+
+def test_tokens_stream_before_the_parsed_result(gemini, service):
+    gemini.responses.append(httpx.Response(200, content=sse_body(CHUNKS)))
+    events = collect(service)
+
+    assert [name for name, _ in events] == ["start", "token", "token", "token", "result"]
+    assert "".join(data["text"] for name, data in events if name == "token") == LETTER
+    assert "analyst role" in events[-1][1]["cover_letter_body"]
+
+
+def test_completed_stream_is_replayed_from_cache(gemini, service):
+    gemini.responses.append(httpx.Response(200, content=sse_body(CHUNKS)))
+    collect(service)
+    events = collect(service)
+
+    assert gemini.requests == 1
+    assert [name for name, _ in events] == ["start", "token", "result"]
+
+    gemini.responses.append(httpx.Response(200, content=sse_body(CHUNKS)))
+    collect(service, use_cache=False)
+    assert gemini.requests == 2
+
+
+def test_truncated_stream_is_not_cached(gemini, service):
+    gemini.responses.append(httpx.Response(200, content=sse_body(CHUNKS, finish_reason="MAX_TOKENS")))
+    collect(service)
+    gemini.responses.append(httpx.Response(200, content=sse_body(CHUNKS)))
+    collect(service)
+    assert gemini.requests == 2
+
+
+def test_upstream_failure_ends_with_an_error_event(gemini, service):
+    gemini.responses.append(httpx.Response(500, text="backend error"))
+    events = collect(service)
+
+    assert [name for name, _ in events] == ["start", "error"]
+    assert events[-1][1]["detail"].startswith("Cover letter generation failed")
@@ -0,0 +1,37 @@
+import asyncio
+
+from app.core.config import settings
+from app.services import generator_service
+from app.services.direct_renderer import render_direct_pdf
+from app.services.generator_service import CVGeneratorService
+
+LETTER_DATA = {
+    "personal_details": {"full_name": "Ada Lovelace", "email": "ada@example.com"},
+    "company_name": "Analytical Engines",
+    "cover_letter_body": "<p>I would like to apply.</p><p>My notes describe the first program.</p>",
+    "generation_date": "October 17, 2026",
+}
+
+
+def test_classic_letter_is_drawn_directly():
+    pdf = render_direct_pdf("letter_template_classic.html", LETTER_DATA)
+    assert pdf.startswith(b"%PDF")
+
+
+def test_unsupported_content_falls_back():
+    assert render_direct_pdf("letter_template_modern.html", LETTER_DATA) is None
+    assert render_direct_pdf("letter_template_classic.html", dict(LETTER_DATA, cover_letter_body="<ul><li>x</li></ul>")) is None
+
+
+def test_direct_render_runs_in_the_pool(monkeypatch):
+    submitted = []
+
+    async def run(fn, *args):
+        submitted.append(fn)
+        return fn(*args)
+
+    monkeypatch.setattr(settings, "DIRECT_RENDER_THEMES", "classic")
+    monkeypatch.setattr(generator_service.render_pool, "run", run)
+    pdf = asyncio.run(CVGeneratorService()._render_document("letter_template_classic.html", LETTER_DATA, "classic"))
+    assert pdf.startswith(b"%PDF")
+    assert submitted == [render_direct_pdf]
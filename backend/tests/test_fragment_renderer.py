@@ -0,0 +1,71 @@
+import os
+import shutil
+
+import pytest
+from jinja2 import Environment, FileSystemLoader
+
+from app.services.fragment_renderer import CVFragmentRenderer
+from app.services.render_cache import RenderCache
+from app.services.template_env import TEMPLATE_DIR
+
+CV_DATA = {
+    "personal_details": {"full_name": "Ada Lovelace", "email": "ada@example.com"},
+    "professional_summary": "Analyst of engines.",
+    "work_experience": [
+        {"job_title": "Analyst", "company": "Engines Ltd", "achievements": ["Wrote the first program"]},
+        {"job_title": "Translator", "company": "Menabrea", "achievements": ["Added the notes"]},
+    ],
+}
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    shutil.copytree(os.path.join(TEMPLATE_DIR, "cv_sections"), tmp_path / "cv_sections")
+    return tmp_path
+
+
+@pytest.fixture
+def renderer(template_dir):
+    env = Environment(loader=FileSystemLoader(str(template_dir)), autoescape=True, auto_reload=True)
+    return CVFragmentRenderer(env, RenderCache(memory_budget_bytes=1024 * 1024))
+
+
+def edit_template(path, old, new):
+    path.write_text(path.read_text().replace(old, new, 1))
+    # Make sure auto_reload sees a newer mtime even on coarse-grained filesystems
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+def test_unchanged_sections_come_from_cache(renderer):
+    first = renderer.render_sections(CV_DATA)
+    hits = renderer.cache.memory_hits
+    second = renderer.render_sections(CV_DATA)
+    assert second == first
+    assert renderer.cache.memory_hits > hits
+
+
+def test_data_change_only_rerenders_affected_entry(renderer):
+    first = renderer.render_sections(CV_DATA)
+    changed = dict(CV_DATA, work_experience=[
+        CV_DATA["work_experience"][0],
+        dict(CV_DATA["work_experience"][1], achievements=["Added notes A to G"]),
+    ])
+    second = renderer.render_sections(changed)
+    assert second["summary"] == first["summary"]
+    assert second["experience"][0] != first["experience"][0]
+    assert "Added notes A to G" in second["experience"][1]
+
+
+def test_template_edit_invalidates_fragments(renderer, template_dir):
+    first = renderer.render_sections(CV_DATA)
+
+    edit_template(template_dir / "cv_sections" / "summary.html", "Summary</h2>", "Profile</h2>")
+    edit_template(template_dir / "cv_sections" / "experience_entry.html", "<", "<!-- v2 --><")
+    second = renderer.render_sections(CV_DATA)
+
+    assert second["summary"][0] != first["summary"][0]
+    assert "Profile</h2>" in second["summary"][1]
+    assert second["experience"][0] != first["experience"][0]
+    assert "<!-- v2 -->" in second["experience"][1]
+    assert second["header"] == first["header"]
@@ -0,0 +1,32 @@
+import asyncio
+
+import httpx
+
+from app.services.gemini_client import GeminiClient
+
+
+def test_preconnect_counts_towards_connection_reuse(monkeypatch):
+    gemini = GeminiClient(base_url="https://gemini.test")
+    connected = []
+
+    async def handler(request):
+        # One connection per client, as the pool would open it
+        if not connected:
+            connected.append(request.url.host)
+            await request.extensions["trace"]("connection.connect_tcp.complete", {})
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(gemini, "_create_client", lambda: httpx.AsyncClient(
+        base_url=gemini.base_url, transport=httpx.MockTransport(handler)
+    ))
+
+    async def scenario():
+        await gemini.start()
+        await gemini.post("/models")
+        await gemini.aclose()
+
+    asyncio.run(scenario())
+
+    stats = gemini.metrics.snapshot()
+    assert stats["requests"] == 2 and stats["new_connections"] == 1
+    assert stats["reused_connections"] == 1
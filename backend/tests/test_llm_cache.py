@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+
+from app.services import llm_cache as llm_cache_module
+from app.services.llm_cache import LLMResponseCache
+
+CONFIG = {"temperature": 0.3, "maxOutputTokens": 4096}
+
+
+def make_cache(tmp_path, memory_budget_bytes=1024 * 1024, db_budget_bytes=1024 * 1024, ttl_seconds=3600):
+    return LLMResponseCache(memory_budget_bytes, ttl_seconds, str(tmp_path / "llm.sqlite3"), db_budget_bytes)
+
+
+def test_key_ignores_whitespace_but_not_content():
+    key = LLMResponseCache.make_key("gemini", CONFIG, "Write a CV\r\n\n\n\nfor Ada  \n")
+    assert key == LLMResponseCache.make_key("gemini", CONFIG, "Write a CV\n\nfor Ada")
+    assert key != LLMResponseCache.make_key("gemini", CONFIG, "Write a CV\n\nfor Bob")
+    assert key != LLMResponseCache.make_key("gemini", dict(CONFIG, temperature=0.9), "Write a CV\n\nfor Ada")
+    assert key != LLMResponseCache.make_key("gemini-pro", CONFIG, "Write a CV\n\nfor Ada")
+
+
+def test_memory_then_disk_hits(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path)
+        await cache.put("k", "response", "gemini")
+        assert await cache.get("k") == "response"
+
+        # A fresh instance (another worker, or after a restart) reads the database
+        other = make_cache(tmp_path)
+        assert await other.get("k") == "response"
+        assert await other.get("missing") is None
+        assert (cache.memory_hits, other.disk_hits, other.misses) == (1, 1, 1)
+        cache.close()
+        other.close()
+
+    asyncio.run(scenario())
+
+
+def test_expired_entries_are_not_served(tmp_path, monkeypatch):
+    async def scenario():
+        cache = make_cache(tmp_path, ttl_seconds=60)
+        now = 1_000_000.0
+        monkeypatch.setattr(llm_cache_module.time, "time", lambda: now)
+        await cache.put("k", "response")
+
+        now += 61
+        assert await cache.get("k") is None
+        assert cache.expirations == 1
+        cache.close()
+
+    asyncio.run(scenario())
+
+
+def test_database_runs_off_the_event_loop(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path)
+        loop_thread = threading.get_ident()
+        threads = []
+        read_db, write_db = cache._read_db, cache._write_db
+
+        def tracked(fn):
+            def wrapper(*args):
+                threads.append(threading.get_ident())
+                return fn(*args)
+            return wrapper
+
+        cache._read_db, cache._write_db = tracked(read_db), tracked(write_db)
+        await cache.put("k", "response")
+        cache._memory.clear()
+        assert await cache.get("k") == "response"
+        assert len(threads) == 2 and loop_thread not in threads
+        cache.close()
+
+    asyncio.run(scenario())
+
+
+def test_eviction_sees_rows_written_by_other_workers(tmp_path):
+    async def scenario():
+        first = make_cache(tmp_path, memory_budget_bytes=0, db_budget_bytes=1000)
+        second = make_cache(tmp_path, memory_budget_bytes=0, db_budget_bytes=1000)
+        # Both workers open the database while it is still empty
+        assert await first.get("warmup") is None and await second.get("warmup") is None
+        for index in range(3):
+            await first.put(f"first-{index}", "x" * 200)
+        for index in range(3):
+            await second.put(f"second-{index}", "x" * 200)
+
+        # 1200 bytes in the shared database: trimmed to 90% of the budget, oldest first
+        assert second.get_stats()["db_bytes"] <= 900
+        assert await second.get("first-0") is None
+        assert await second.get("second-2") == "x" * 200
+        first.close()
+        second.close()
+
+    asyncio.run(scenario())
+
+
+def test_memory_only_when_database_disabled(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path, db_budget_bytes=0)
+        await cache.put("k", "response")
+        assert await cache.get("k") == "response"
+        assert not (tmp_path / "llm.sqlite3").exists()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_first_use_opens_one_connection(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path)
+    opened = []
+    connect = llm_cache_module.sqlite3.connect
+
+    def slow_connect(*args, **kwargs):
+        time.sleep(0.05)  # Widen the window between the check and the assignment
+        db = connect(*args, **kwargs)
+        opened.append(db)
+        return db
+
+    monkeypatch.setattr(llm_cache_module.sqlite3, "connect", slow_connect)
+    barrier = threading.Barrier(8)
+
+    def first_use():
+        barrier.wait()
+        return cache._connection()
+
+    threads = [threading.Thread(target=first_use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(opened) == 1 and cache._db is opened[0]
+    cache.close()
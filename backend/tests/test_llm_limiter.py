@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from app.services.llm_limiter import (
+    PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, LLMLimiter, LLMQueueFullError, llm_priority
+)
+
+
+def make_limiter(max_concurrency=1, tokens_per_minute=0, max_queue_depth=10, background_queue_depth=5):
+    return LLMLimiter(max_concurrency, tokens_per_minute, max_queue_depth, background_queue_depth)
+
+
+def test_interactive_calls_overtake_queued_background_calls():
+    async def scenario():
+        limiter = make_limiter()
+        order = []
+        holder = await limiter.acquire(0)
+
+        async def call(name, priority):
+            async with limiter.slot(0, priority):
+                order.append(name)
+
+        tasks = [asyncio.ensure_future(call("background", PRIORITY_BACKGROUND))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(call("interactive", PRIORITY_INTERACTIVE)))
+        await asyncio.sleep(0)
+
+        limiter.release(holder)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["interactive", "background"]
+
+
+def test_background_calls_are_rejected_first():
+    async def scenario():
+        limiter = make_limiter(max_queue_depth=2, background_queue_depth=1)
+        holder = await limiter.acquire(0)
+        waiting = [asyncio.ensure_future(limiter.acquire(0, PRIORITY_BACKGROUND))]
+        await asyncio.sleep(0)
+
+        assert not limiter.accepting(PRIORITY_BACKGROUND)
+        with pytest.raises(LLMQueueFullError):
+            await limiter.acquire(0, PRIORITY_BACKGROUND)
+
+        # Interactive traffic still has headroom
+        waiting.append(asyncio.ensure_future(limiter.acquire(0, PRIORITY_INTERACTIVE)))
+        await asyncio.sleep(0)
+        with pytest.raises(LLMQueueFullError):
+            await limiter.acquire(0, PRIORITY_INTERACTIVE)
+
+        for task in waiting:
+            task.cancel()
+        limiter.release(holder)
+        return limiter.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == {"interactive": 1, "background": 1}
+    assert stats["active"] == 0 and stats["queue_depth"] == 0
+
+
+def test_priority_context_applies_to_calls_inside_it():
+    async def scenario():
+        limiter = make_limiter()
+        with llm_priority(PRIORITY_BACKGROUND):
+            async with limiter.slot(0) as permit:
+                return permit.priority
+
+    assert asyncio.run(scenario()) == PRIORITY_BACKGROUND
+
+
+def test_cancelled_waiter_does_not_leak_its_slot():
+    async def scenario():
+        limiter = make_limiter()
+        holder = await limiter.acquire(0)
+        waiter = asyncio.ensure_future(limiter.acquire(0))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        limiter.release(holder)
+
+        async with limiter.slot(0):
+            pass
+        return limiter.get_stats()["active"]
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_token_budget_waits_for_refill_and_refunds_unused_tokens():
+    async def scenario():
+        limiter = make_limiter(max_concurrency=4, tokens_per_minute=6000)
+        async with limiter.slot(6000) as permit:
+            permit.used_tokens = 1000
+        # 5000 unused tokens went back to the bucket: no wait
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        async with limiter.slot(5000):
+            pass
+        refunded_wait = loop.time() - started
+
+        # The bucket is now (nearly) empty: 100 tokens at 100/s takes about a second
+        started = loop.time()
+        async with limiter.slot(100):
+            pass
+        return refunded_wait, loop.time() - started
+
+    refunded_wait, refill_wait = asyncio.run(scenario())
+    assert refunded_wait < 0.1
+    assert 0.5 < refill_wait < 3
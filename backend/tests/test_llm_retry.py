@@ -0,0 +1,137 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.services import llm_retry
+from app.services.llm_retry import LatencyTracker, RetryBudget, RetryPolicy, is_retryable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    perf_counter = monotonic
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_retry, "time", SimpleNamespace(monotonic=clock.monotonic, perf_counter=clock.perf_counter))
+
+    async def sleep(delay):
+        clock.now += delay
+
+    monkeypatch.setattr(llm_retry.asyncio, "sleep", sleep)
+    return clock
+
+
+def status_error(status, headers=None):
+    request = httpx.Request("POST", "https://example.com")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, headers=headers, request=request))
+
+
+def make_policy(max_attempts=3, deadline=180.0, ratio=1.0, min_per_window=10, **kwargs):
+    return RetryPolicy(max_attempts, base_delay=0.5, max_delay=8.0, budget=RetryBudget(ratio, min_per_window),
+                       deadline=deadline, **kwargs)
+
+
+def scripted(clock, outcomes):
+    """An attempt that takes and returns (seconds, result or error) in turn, recording its timeouts"""
+    timeouts = []
+
+    async def attempt(timeout):
+        timeouts.append(timeout)
+        seconds, outcome = outcomes.pop(0)
+        clock.now += seconds
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return attempt, timeouts
+
+
+def test_retryable_errors():
+    assert is_retryable(status_error(503))
+    assert is_retryable(status_error(429))
+    assert not is_retryable(status_error(400))
+    assert is_retryable(httpx.ReadTimeout("slow"))
+    assert not is_retryable(ValueError("bad json"))
+
+
+def test_retries_server_errors_until_success(clock):
+    policy = make_policy()
+    attempt, timeouts = scripted(clock, [(1, status_error(503)), (1, status_error(502)), (1, "ok")])
+    assert asyncio.run(policy.call(attempt)) == "ok"
+    assert policy.get_stats()["retries"] == {"503": 1, "502": 1}
+
+
+def test_client_errors_are_not_retried(clock):
+    policy = make_policy()
+    attempt, timeouts = scripted(clock, [(1, status_error(400))])
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(policy.call(attempt))
+    assert len(timeouts) == 1 and policy.failures == 1
+
+
+def test_long_retry_after_is_not_waited_for(clock):
+    policy = make_policy()
+    attempt, timeouts = scripted(clock, [(1, status_error(429, {"retry-after": "30"}))])
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(policy.call(attempt))
+    assert len(timeouts) == 1
+
+
+def test_exhausted_budget_stops_retries(clock):
+    policy = make_policy(ratio=0.0, min_per_window=1)
+    first, _ = scripted(clock, [(1, status_error(503)), (1, "ok")])
+    assert asyncio.run(policy.call(first)) == "ok"
+
+    second, timeouts = scripted(clock, [(1, status_error(503))])
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(policy.call(second))
+    assert len(timeouts) == 1 and policy.budget.exhausted == 1
+
+
+def test_timeouts_shrink_toward_the_deadline(clock):
+    policy = make_policy(deadline=180.0)
+    attempt, timeouts = scripted(clock, [(100, status_error(503)), (1, "ok")])
+    assert asyncio.run(policy.call(attempt)) == "ok"
+    assert timeouts[0] == 180.0
+    assert 72.0 <= timeouts[1] <= 80.0
+
+
+def test_full_length_timeout_is_not_retried(clock):
+    policy = make_policy(deadline=180.0)
+    attempt, timeouts = scripted(clock, [(180, httpx.ReadTimeout("slow"))])
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(policy.call(attempt))
+    assert timeouts == [180.0]
+    assert policy.get_stats()["deadline_exceeded"] == 1
+
+
+def test_hedge_wins_and_loser_is_cancelled():
+    latency = LatencyTracker(min_samples=1)
+    latency.record(0.01)
+    policy = make_policy(hedging=True, hedge_min_delay=0.01, latency=latency)
+    cancelled = []
+    calls = 0
+
+    async def attempt(timeout):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        return "hedge"
+
+    assert asyncio.run(policy.call(attempt)) == "hedge"
+    assert policy.hedges == 1 and policy.hedge_wins == 1
+    assert cancelled == [True]
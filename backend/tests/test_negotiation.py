@@ -0,0 +1,109 @@
+import asyncio
+import io
+import threading
+import zipfile
+from typing import Optional
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.api.v1 import negotiation
+from app.api.v1.negotiation import (
+    DOCUMENT_QUERY, FORMAT_QUERY, JSON_MEDIA_TYPE, MULTIPART_MEDIA_TYPE, PDF_MEDIA_TYPE, ZIP_MEDIA_TYPE,
+    artifact_links, document_download, event_stream, negotiate_media_type, sse_event, wants_event_stream
+)
+
+
+def make_request(accept: str = "") -> Request:
+    headers = [(b"accept", accept.encode())] if accept else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("", JSON_MEDIA_TYPE),
+    ("*/*", JSON_MEDIA_TYPE),
+    ("application/pdf", PDF_MEDIA_TYPE),
+    ("application/zip;q=0.5, application/pdf;q=0.9", PDF_MEDIA_TYPE),
+    ("application/pdf;q=0.2, multipart/mixed", MULTIPART_MEDIA_TYPE),
+    ("text/html, application/zip;q=bad", JSON_MEDIA_TYPE),
+])
+def test_accept_header_picks_highest_q(accept, expected):
+    assert negotiate_media_type(make_request(accept)) == expected
+
+
+def test_format_overrides_accept():
+    assert negotiate_media_type(make_request("application/pdf"), "ZIP") == ZIP_MEDIA_TYPE
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        negotiate_media_type(make_request(), "docx")
+    assert error.value.status_code == 400
+
+
+def test_shared_queries_validate_parameters():
+    app = FastAPI()
+
+    @app.get("/")
+    def endpoint(format: Optional[str] = FORMAT_QUERY, document: str = DOCUMENT_QUERY):
+        return {"format": format, "document": document}
+
+    client = TestClient(app)
+    assert client.get("/").json() == {"format": None, "document": "cv"}
+    assert client.get("/?format=pdf&document=cover_letter").json() == {"format": "pdf", "document": "cover_letter"}
+    assert client.get("/?document=resume").status_code == 422
+
+
+def test_pdf_download_returns_requested_document():
+    response = document_download(PDF_MEDIA_TYPE, b"cv", b"letter", "cv.pdf", "letter.pdf", "cover_letter")
+    assert response.body == b"letter"
+    assert response.headers["content-disposition"] == 'attachment; filename="letter.pdf"'
+
+
+def test_zip_bundles_every_generated_document():
+    response = document_download(ZIP_MEDIA_TYPE, b"cv", None, "cv.pdf", "letter.pdf")
+    with zipfile.ZipFile(io.BytesIO(response.body)) as archive:
+        assert archive.namelist() == ["cv.pdf"]
+        assert archive.read("cv.pdf") == b"cv"
+
+
+def test_multipart_parts_carry_their_pdfs():
+    response = document_download(MULTIPART_MEDIA_TYPE, b"cv-bytes", b"letter-bytes", "cv.pdf", "letter.pdf")
+    boundary = response.media_type.split("boundary=")[1]
+    parts = response.body.split(f"--{boundary}".encode())
+    assert parts[-1] == b"--\r\n"
+    assert b'filename="cv.pdf"' in parts[1] and parts[1].endswith(b"cv-bytes\r\n")
+    assert b'filename="letter.pdf"' in parts[2] and parts[2].endswith(b"letter-bytes\r\n")
+
+
+def test_event_stream_formats_events_in_order():
+    async def events():
+        yield "start", {"status": "generating"}
+        yield "token", {"text": "Dear ünïcode"}
+
+    async def collect():
+        response = event_stream(events())
+        return [chunk async for chunk in response.body_iterator]
+
+    assert wants_event_stream(make_request("text/event-stream"))
+    assert not wants_event_stream(make_request("application/json"))
+    chunks = asyncio.run(collect())
+    assert chunks == [sse_event("start", {"status": "generating"}), sse_event("token", {"text": "Dear ünïcode"})]
+    assert chunks[1] == 'event: token\ndata: {"text": "Dear ünïcode"}\n\n'.encode("utf-8")
+
+
+def test_artifact_links_publish_off_the_event_loop(monkeypatch):
+    published = []
+
+    class Store:
+        def publish(self, pdf, filename):
+            published.append((filename, threading.current_thread() is threading.main_thread()))
+            return {"filename": filename}
+
+    monkeypatch.setattr(negotiation, "artifact_store", Store())
+    links = asyncio.run(artifact_links([("cv_pdf", "cv.pdf", b"%PDF"), ("cover_letter_pdf", "cl.pdf", None)]))
+
+    assert links == {"cv_pdf": {"filename": "cv.pdf"}}
+    assert published == [("cv.pdf", False)]
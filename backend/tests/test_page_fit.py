@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import render_pool
+from app.services.page_fit import FIT_LEVELS, FIT_STYLESHEETS, estimate_fit_level
+from app.services.render_pool import render_fitted_pdf
+
+
+def fake_layouts(monkeypatch, pages_by_level):
+    """Make layout_document return ``pages_by_level[level]`` pages for each fit stylesheet"""
+    laid_out = []
+
+    def layout_document(html, stylesheets, options=None):
+        level = FIT_STYLESHEETS.index(stylesheets[-1]) if stylesheets and stylesheets[-1] in FIT_STYLESHEETS else 0
+        laid_out.append(level)
+        return SimpleNamespace(pages=[None] * pages_by_level[level], write_pdf=lambda: f"level {level}".encode())
+
+    monkeypatch.setattr(render_pool, "layout_document", layout_document)
+    return laid_out
+
+
+@pytest.mark.parametrize("seed", range(len(FIT_STYLESHEETS)))
+@pytest.mark.parametrize("first_fitting", range(len(FIT_STYLESHEETS)))
+def test_search_finds_loosest_fitting_level(monkeypatch, seed, first_fitting):
+    pages = [3 if level < first_fitting else 2 for level in range(len(FIT_STYLESHEETS))]
+    laid_out = fake_layouts(monkeypatch, pages)
+
+    result = render_fitted_pdf("<html></html>", ["@page {}"], FIT_STYLESHEETS, 2, seed)
+    assert result["fitted"] and result["level"] == first_fitting
+    assert result["pdf"] == f"level {first_fitting}".encode()
+    assert result["renders"] == len(set(laid_out))
+
+
+def test_good_seed_settles_in_two_layouts(monkeypatch):
+    laid_out = fake_layouts(monkeypatch, [3, 3, 2, 2, 2, 2, 2, 2, 2, 2][:len(FIT_STYLESHEETS)])
+    result = render_fitted_pdf("<html></html>", [], FIT_STYLESHEETS, 2, 2)
+    assert result["level"] == 2
+    assert sorted(laid_out) == [1, 2]
+
+
+def test_overflow_returns_tightest_level(monkeypatch):
+    fake_layouts(monkeypatch, [5] * len(FIT_STYLESHEETS))
+    result = render_fitted_pdf("<html></html>", [], FIT_STYLESHEETS, 2, 0)
+    assert not result["fitted"]
+    assert result["level"] == len(FIT_STYLESHEETS) - 1
+    assert result["pages"] == 5
+
+
+def test_bigger_page_budget_seeds_looser_level():
+    cv_data = {
+        "professional_summary": "Engineer. " * 80,
+        "work_experience": [
+            {"job_title": "Engineer", "company": "Acme", "achievements": ["Shipped things " * 20] * 6}
+        ] * 6,
+    }
+    one_page, _ = estimate_fit_level(cv_data, 1)
+    two_pages, estimate = estimate_fit_level(cv_data, 2)
+    assert two_pages <= one_page
+    assert estimate["available_height_mm"] > 0
+    assert FIT_LEVELS[0].level == 0
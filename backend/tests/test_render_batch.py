@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.api.v1.cv_operations import batch_rendering
+from app.services import generator_service
+from app.services.generator_service import CVGeneratorService
+from app.services.render_pool import RenderQueueFullError, RenderTimeoutError
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(generator_service, "BATCH_QUEUE_FULL_BASE_DELAY", 0.001)
+    return CVGeneratorService()
+
+
+def run_batch(service, documents, monkeypatch, outcomes, document="cv"):
+    """Render a batch where each call to the renderer takes the next outcome for its document"""
+    calls = {}
+
+    async def render_single(template_data, theme="classic", document="cv", quality=None):
+        name = template_data["name"]
+        calls[name] = calls.get(name, 0) + 1
+        outcome = outcomes[name].pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(service, "_render_single", render_single)
+
+    async def collect():
+        return [result async for result in service.render_batch(documents, document=document, concurrency=2)]
+
+    results = sorted(asyncio.run(collect()), key=lambda result: result["index"])
+    return results, calls
+
+
+def test_queue_full_is_retried_not_reported(service, monkeypatch):
+    full = RenderQueueFullError("PDF rendering is at capacity")
+    results, calls = run_batch(service, [{"name": "a"}, {"name": "b"}], monkeypatch, {
+        "a": [full, full, b"pdf-a"],
+        "b": [b"pdf-b"],
+    })
+    assert [result["error"] for result in results] == [None, None]
+    assert results[0]["cv_pdf"] == b"pdf-a"
+    assert calls == {"a": 3, "b": 1}
+
+
+def test_queue_full_gives_up_after_wait_limit(service, monkeypatch):
+    monkeypatch.setattr(generator_service.settings, "BATCH_RENDER_QUEUE_WAIT_SECONDS", 0)
+    results, calls = run_batch(service, [{"name": "a"}], monkeypatch, {
+        "a": [RenderQueueFullError("PDF rendering is at capacity")],
+    })
+    assert results[0]["error"].startswith("RenderQueueFullError")
+    assert calls == {"a": 1}
+
+
+def test_timeout_is_retried_once(service, monkeypatch):
+    timeout = RenderTimeoutError("PDF rendering exceeded the 30s time limit")
+    results, calls = run_batch(service, [{"name": "slow"}, {"name": "stuck"}], monkeypatch, {
+        "slow": [timeout, b"pdf"],
+        "stuck": [timeout, timeout],
+    }, document="cover_letter")
+    assert results[0]["error"] is None and results[0]["cover_letter_pdf"] == b"pdf"
+    assert results[1]["error"].startswith("RenderTimeoutError")
+    assert calls == {"slow": 2, "stuck": 2}
+
+
+def test_render_failure_is_reported_per_item(service, monkeypatch):
+    results, calls = run_batch(service, [{"name": "bad"}, {"name": "good"}], monkeypatch, {
+        "bad": [ValueError("broken template data")],
+        "good": [b"pdf"],
+    })
+    assert results[0]["error"] == "ValueError: broken template data"
+    assert results[1]["error"] is None
+    assert calls == {"bad": 1, "good": 1}
+
+
+@pytest.mark.parametrize("workers, document, expected", [
+    (8, "cv", 4),
+    (8, "both", 2),
+    (2, "both", 1),
+    (1, "cv", 1),
+])
+def test_default_concurrency_leaves_workers_for_interactive_renders(monkeypatch, workers, document, expected):
+    monkeypatch.setattr(batch_rendering.render_pool, "max_workers", workers)
+    assert batch_rendering._default_concurrency(document) == expected
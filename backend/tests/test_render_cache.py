@@ -0,0 +1,134 @@
+import asyncio
+import os
+
+from jinja2 import ChoiceLoader, DictLoader, Environment
+
+from app.core.config import settings
+from app.services import generator_service
+from app.services.generator_service import CV_TEMPLATE, CVGeneratorService, WARMUP_CV_DATA
+from app.services.render_cache import RenderCache
+from app.services.template_env import template_version
+
+
+def test_key_is_stable_and_content_addressed():
+    key = RenderCache.make_key("cv.html", "classic", {"b": 1, "a": [1, 2]}, ["@page {}"])
+    assert key == RenderCache.make_key("cv.html", "classic", {"a": [1, 2], "b": 1}, ["@page {}"])
+    assert key != RenderCache.make_key("cv.html", "modern", {"a": [1, 2], "b": 1}, ["@page {}"])
+    assert key != RenderCache.make_key("cv.html", "classic", {"a": [1, 2], "b": 2}, ["@page {}"])
+    assert key != RenderCache.make_key("cv.html", "classic", {"a": [1, 2], "b": 1}, ["@page { margin: 0 }"])
+
+
+def test_template_version_follows_included_sources():
+    templates = {"page.html": '{% include "part.html" %}', "part.html": "one"}
+    env = Environment(loader=DictLoader(templates), auto_reload=True)
+    frozen = Environment(loader=DictLoader(templates), auto_reload=False)
+
+    before = template_version("page.html", env=env)
+    assert template_version("page.html", env=frozen) == before
+
+    templates["part.html"] = "two"
+    assert template_version("page.html", env=env) != before
+    # Without auto_reload templates only change on deploy, so the digest is memoized
+    assert template_version("page.html", env=frozen) == before
+
+
+def test_cache_key_changes_with_cv_fragment_source():
+    service = CVGeneratorService()
+    template_data = service._prepare_template_data(WARMUP_CV_DATA)
+    key = service._cache_key(CV_TEMPLATE, template_data)
+
+    service.jinja_env = service.jinja_env.overlay(loader=ChoiceLoader([
+        DictLoader({"cv_sections/skills.html": "<section>edited</section>"}),
+        service.jinja_env.loader,
+    ]))
+    assert service._cache_key(CV_TEMPLATE, template_data) != key
+
+
+def test_evicted_entries_spill_to_disk_and_come_back(tmp_path):
+    cache = RenderCache(memory_budget_bytes=10, disk_dir=str(tmp_path), disk_budget_bytes=1000)
+    cache.put("a", b"a" * 6)
+    cache.put("b", b"b" * 6)
+
+    assert os.path.exists(tmp_path / "a.bin")
+    assert cache.get("a") == b"a" * 6
+    assert cache.disk_hits == 1
+    # Promoting "a" pushed "b" out of memory in turn
+    assert cache.get("b") == b"b" * 6 and cache.disk_hits == 2
+
+
+def test_disk_tier_stays_within_budget(tmp_path):
+    cache = RenderCache(memory_budget_bytes=1, disk_dir=str(tmp_path), disk_budget_bytes=25)
+    for name in "abcde":
+        cache.put(name, name.encode() * 10)
+
+    on_disk = sum(path.stat().st_size for path in tmp_path.glob("*.bin"))
+    assert on_disk <= 25
+    assert cache.get("e") == b"e" * 10
+    assert cache.get("a") is None
+
+
+def test_async_api_does_disk_io_in_threads(tmp_path, monkeypatch):
+    cache = RenderCache(memory_budget_bytes=10, disk_dir=str(tmp_path), disk_budget_bytes=1000)
+    offloaded = []
+    to_thread = asyncio.to_thread
+
+    async def record_to_thread(fn, *args):
+        offloaded.append(fn.__name__)
+        return await to_thread(fn, *args)
+
+    monkeypatch.setattr(asyncio, "to_thread", record_to_thread)
+
+    async def scenario():
+        await cache.aput("a", b"a" * 6)
+        assert offloaded == []  # Memory-only store stays on the loop
+        await cache.aput("b", b"b" * 6)
+        assert offloaded == ["_write_disk_entries"]
+        assert await cache.acontains("a")
+        assert await cache.aget("a") == b"a" * 6
+        assert await cache.aget("missing") is None
+
+    asyncio.run(scenario())
+
+    assert cache.disk_hits == 1 and cache.misses == 1
+    assert "_read_disk" in offloaded and "exists" in offloaded
+    assert os.path.exists(tmp_path / "b.bin")
+
+
+def test_repeat_render_is_served_from_cache(monkeypatch):
+    renders = []
+
+    async def render_pdf(html, stylesheets, options=None):
+        renders.append(html)
+        return b"%PDF-cv"
+
+    monkeypatch.setattr(settings, "RENDER_CACHE_ENABLED", True)
+    monkeypatch.setattr(generator_service, "render_cache", RenderCache(memory_budget_bytes=1024 * 1024))
+    monkeypatch.setattr(generator_service.render_pool, "render_pdf", render_pdf)
+
+    service = CVGeneratorService()
+    template_data = service._prepare_template_data(WARMUP_CV_DATA)
+
+    async def scenario():
+        first = await service._render_document(CV_TEMPLATE, template_data)
+        second = await service._render_document(CV_TEMPLATE, template_data)
+        changed = dict(template_data, professional_summary="Something else entirely.")
+        third = await service._render_document(CV_TEMPLATE, changed)
+        return first, second, third
+
+    assert asyncio.run(scenario()) == (b"%PDF-cv",) * 3
+    assert len(renders) == 2
+
+
+def test_render_document_renders_only_the_requested_document(monkeypatch):
+    rendered = []
+
+    async def render_single(template_data, theme="classic", document="cv", quality=None):
+        rendered.append((theme, document))
+        return b"%PDF-" + document.encode()
+
+    monkeypatch.setattr(generator_service, "HTML", object())
+    service = CVGeneratorService()
+    monkeypatch.setattr(service, "_render_single", render_single)
+
+    assert asyncio.run(service.render_document(WARMUP_CV_DATA, "modern", "cv")) == b"%PDF-cv"
+    assert rendered == [("modern", "cv")]
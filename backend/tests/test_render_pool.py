@@ -0,0 +1,185 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from conftest import requires_weasyprint
+
+from app.services.page_fit import FIT_STYLESHEETS
+from app.services.render_pool import RenderPool, RenderQueueFullError, RenderTimeoutError, layout_document
+
+INLINE_STYLED_HTML = """
+<html><head><style>
+    body { font-size: 20px; margin: 0; }
+    p { line-height: 2; margin: 0 0 40px; }
+</style></head>
+<body>""" + "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>" * 60 + "</body></html>"
+
+SHARED_CSS = "@page { size: A4 portrait; margin: 0; } body { font-size: 10px; }"
+
+
+def _boxes(document):
+    """Page sizes and every box's position, as a layout fingerprint"""
+    def walk(box):
+        yield type(box).__name__, round(box.position_x, 2), round(box.position_y, 2), \
+            round(box.width or 0, 2), round(box.height or 0, 2)
+        for child in getattr(box, "children", []):
+            yield from walk(child)
+
+    return [(page.width, page.height, list(walk(page._page_box))) for page in document.pages]
+
+
+def _baseline(html, stylesheets):
+    from weasyprint import CSS, HTML
+    return HTML(string=html).render(stylesheets=[CSS(string=css) for css in stylesheets])
+
+
+@requires_weasyprint
+def test_layout_matches_baseline_render():
+    # The template's <style> must keep winning over shared user stylesheets
+    assert _boxes(layout_document(INLINE_STYLED_HTML, [SHARED_CSS])) == _boxes(
+        _baseline(INLINE_STYLED_HTML, [SHARED_CSS])
+    )
+
+
+@requires_weasyprint
+def test_cv_template_matches_baseline_render():
+    from app.services.generator_service import PDF_PAGE_CSS, WARMUP_CV_DATA, cv_service
+
+    html = cv_service._render_html("cv_template_enhanced.html", cv_service._prepare_template_data(WARMUP_CV_DATA))
+    assert _boxes(layout_document(html, [PDF_PAGE_CSS])) == _boxes(_baseline(html, [PDF_PAGE_CSS]))
+
+
+@requires_weasyprint
+def test_fit_stylesheets_override_template_styles():
+    from app.services.generator_service import PDF_PAGE_CSS, WARMUP_CV_DATA, cv_service
+
+    html = cv_service._render_html("cv_template_enhanced.html", cv_service._prepare_template_data(WARMUP_CV_DATA))
+    plain = layout_document(html, [PDF_PAGE_CSS])
+    fitted = layout_document(html, [PDF_PAGE_CSS, FIT_STYLESHEETS[-1]])
+    assert _boxes(plain) != _boxes(fitted)
+
+
+def test_fit_stylesheets_are_important():
+    for css in FIT_STYLESHEETS[1:]:
+        for declaration in css.replace("}", ";").split(";"):
+            if ":" in declaration:
+                assert declaration.strip().endswith("!important")
+
+
+@pytest.fixture
+def process_pool():
+    pool = RenderPool(max_workers=1, queue_depth=1, timeout=30.0)
+    yield pool
+    pool.shutdown()
+
+
+def test_renders_run_in_a_worker_process(process_pool):
+    async def scenario():
+        return await process_pool.run(os.getpid)
+
+    assert asyncio.run(scenario()) != os.getpid()
+    stats = process_pool.get_stats()
+    assert stats["completed"] == 1 and stats["live_workers"] == 1
+
+
+def test_thread_mode_runs_off_the_event_loop():
+    pool = RenderPool(max_workers=0, queue_depth=1)
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        return loop_thread, await pool.run(threading.get_ident)
+
+    loop_thread, render_thread = asyncio.run(scenario())
+    assert render_thread != loop_thread
+
+
+def test_full_queue_rejects_instead_of_waiting():
+    pool = RenderPool(max_workers=0, queue_depth=1)
+
+    async def scenario():
+        # One running plus one waiting fills max(1, workers) + queue_depth
+        running = [asyncio.ensure_future(pool.run(time.sleep, 0.2)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(RenderQueueFullError):
+            await pool.run(time.sleep, 0)
+        await asyncio.gather(*running)
+
+    asyncio.run(scenario())
+    assert pool.get_stats()["rejected"] == 1
+
+
+def test_overrunning_render_is_killed_and_replaced():
+    pool = RenderPool(max_workers=1, queue_depth=0, timeout=0.5)
+
+    async def scenario():
+        first_pid = await pool.run(os.getpid)
+        with pytest.raises(RenderTimeoutError):
+            await pool.run(time.sleep, 30)
+        # The next render gets a fresh worker instead of waiting out the stuck one
+        return first_pid, await pool.run(os.getpid)
+
+    try:
+        started = time.perf_counter()
+        first_pid, second_pid = asyncio.run(scenario())
+        assert time.perf_counter() - started < 20
+        assert second_pid != first_pid
+        stats = pool.get_stats()
+        assert stats["timeouts"] == 1 and stats["workers_recycled"] == 1 and stats["live_workers"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_thread_mode_reports_timeouts():
+    pool = RenderPool(max_workers=0, queue_depth=0, timeout=0.1)
+
+    async def scenario():
+        with pytest.raises(RenderTimeoutError):
+            await pool.run(time.sleep, 0.5)
+
+    asyncio.run(scenario())
+    assert pool.get_stats()["timeouts"] == 1
+
+
+def test_render_errors_reach_the_caller(process_pool):
+    async def scenario():
+        with pytest.raises(ValueError):
+            await process_pool.run(int, "not a number")
+        # The worker survives an exception and serves the next render
+        return await process_pool.run(int, "42")
+
+    assert asyncio.run(scenario()) == 42
+    assert process_pool.get_stats()["workers_recycled"] == 0
+
+
+def test_speculation_needs_a_spare_worker():
+    assert not RenderPool(max_workers=0, queue_depth=1).idle_for_speculation
+    assert not RenderPool(max_workers=1, queue_depth=1).idle_for_speculation
+    assert RenderPool(max_workers=2, queue_depth=1).idle_for_speculation
+
+
+def test_interactive_render_preempts_speculation():
+    pool = RenderPool(max_workers=2, queue_depth=2, timeout=30.0)
+
+    async def scenario():
+        await pool.warmup([])
+        speculative = asyncio.ensure_future(pool.run_speculative(time.sleep, 30))
+        await asyncio.sleep(0.2)
+        # Speculation never takes the last worker, so this one starts at once
+        busy = asyncio.ensure_future(pool.run(time.sleep, 1))
+        await asyncio.sleep(0.2)
+        # No worker is free now: the speculative render is killed to make room
+        pid = await pool.run(os.getpid)
+        return await speculative, pid, await busy
+
+    try:
+        started = time.perf_counter()
+        speculative, pid, _ = asyncio.run(scenario())
+        assert time.perf_counter() - started < 20
+        assert speculative is None and pid != os.getpid()
+        stats = pool.get_stats()
+        assert stats["speculative_preempted"] == 1 and stats["speculative_completed"] == 0
+        assert stats["live_workers"] == 2
+    finally:
+        pool.shutdown()
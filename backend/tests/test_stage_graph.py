@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.stage_graph import Stage, StageGraph, StageGraphExecutor, server_timing, stage_trace
+
+
+def test_independent_stages_run_concurrently():
+    async def slow(value):
+        await asyncio.sleep(0.2)
+        return value
+
+    graph = StageGraph("demo", [
+        Stage("a", slow, ("x",), executor="async"),
+        Stage("b", slow, ("y",), executor="async"),
+        Stage("sum", lambda a, b: a + b, ("a", "b")),
+    ])
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        values = await StageGraphExecutor().run(graph, {"x": 1, "y": 2})
+        return values, loop.time() - started
+
+    values, elapsed = asyncio.run(scenario())
+    assert values["sum"] == 3
+    assert elapsed < 0.35
+
+
+def test_thread_stages_leave_the_event_loop_and_split_outputs():
+    graph = StageGraph("demo", [
+        Stage("split", lambda: (threading.get_ident(), "second"), outputs=("thread", "other"), executor="thread"),
+    ])
+
+    async def scenario():
+        return threading.get_ident(), await StageGraphExecutor().run(graph, {})
+
+    loop_thread, values = asyncio.run(scenario())
+    assert values["thread"] != loop_thread and values["other"] == "second"
+
+
+def test_failure_cancels_running_stages_and_propagates():
+    cancelled = []
+
+    async def hang():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def fail():
+        raise KeyError("missing")
+
+    graph = StageGraph("demo", [Stage("hang", hang, executor="async"), Stage("fail", fail, executor="async")])
+    with pytest.raises(KeyError):
+        asyncio.run(StageGraphExecutor().run(graph, {}))
+    assert cancelled == [True]
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError):
+        Stage("bad", lambda: None, executor="process")
+    with pytest.raises(ValueError):
+        asyncio.run(StageGraphExecutor().run(StageGraph("demo", [Stage("a", lambda b: b, ("b",))]), {}))
+    with pytest.raises(ValueError):
+        asyncio.run(StageGraphExecutor().run(StageGraph("demo", [Stage("x", lambda: 1)]), {"x": 0}))
+
+
+def test_trace_feeds_server_timing():
+    graph = StageGraph("demo", [Stage("prompt", lambda: "p"), Stage("parse", lambda prompt: prompt, ("prompt",))])
+
+    async def scenario():
+        with stage_trace() as trace:
+            await StageGraphExecutor().run(graph, {})
+        return trace
+
+    trace = asyncio.run(scenario())
+    assert list(trace) == ["prompt", "parse"]
+    assert server_timing(trace).startswith("prompt;dur=")
@@ -0,0 +1,42 @@
+import importlib
+
+import pytest
+from jinja2 import FileSystemLoader
+
+from app.core.config import settings
+from app.services import template_env
+
+BODY = "<p>hi</p>"
+
+
+@pytest.fixture
+def start(tmp_path, monkeypatch):
+    """Build the environments as a fresh process would, sharing one on-disk bytecode cache"""
+    (tmp_path / "templates").mkdir()
+    (tmp_path / "templates" / "letter.html").write_text("<div>{{ body }}</div>")
+    monkeypatch.setattr(settings, "TEMPLATE_BYTECODE_CACHE_DIR", str(tmp_path / "bytecode"))
+
+    def start():
+        module = importlib.reload(template_env)
+        for env in (module.jinja_env, module.export_jinja_env):
+            env.loader = FileSystemLoader(str(tmp_path / "templates"))
+        return module.jinja_env, module.export_jinja_env
+
+    yield start
+    monkeypatch.undo()
+    importlib.reload(template_env)
+
+
+def render(env):
+    return env.get_template("letter.html").render(body=BODY)
+
+
+@pytest.mark.parametrize("compiled_first", ["escaping", "export"])
+def test_escaping_survives_a_shared_bytecode_cache(start, compiled_first):
+    escaping, export = start()
+    template_env.precompile_templates(escaping if compiled_first == "escaping" else export)
+
+    # Next process start: both environments load from the bytecode cache
+    escaping, export = start()
+    assert render(escaping) == "<div>&lt;p&gt;hi&lt;/p&gt;</div>"
+    assert render(export) == "<div><p>hi</p></div>"